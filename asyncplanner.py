@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Planning from asyncio programs, with deadlines and cancellation.
+
+find_plan blocks its thread for the whole horizon search. AsyncPlanner
+runs every query in a worker process of its own instead and waits for
+its messages on the event loop, so the loop stays responsive:
+
+    planner = AsyncPlanner(workers=4)
+    result = await planner.plan(delivery.domain, 30, timeout=2.0)
+
+A query that times out or whose task is cancelled has its worker
+process terminated, so the solver really stops. At most workers
+queries run at a time; the others wait for a free worker. Once
+max_pending queries wait, further ones fail at once with Overloaded,
+so a caller producing queries faster than they are solved notices.
+
+With anytime=True the worker reports every plan and lower bound it
+finds (see planner.improving_plans), and a query that reaches its
+deadline returns the best plan found so far instead of failing.
+
+The latencies of the queries are kept in metrics.Histogram objects,
+one for every outcome ('ok', 'timeout', 'cancelled', 'rejected' for
+Overloaded, 'error') and one for all of them ('all').
+
+The module-level plan() uses one shared AsyncPlanner.
+
+Workers are forked from the process running the event loop, so the
+domains need not be picklable and inherit their compiled templates.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+
+from metrics import Histogram
+from planner import find_plan, improving_plans
+
+
+class Overloaded(Exception):
+    """Too many queries are waiting for a worker."""
+
+
+class Result(object):
+    """Outcome of a query.
+
+    plan is the best plan found (a plan.Plan) or None, horizon its
+    length. No plan is shorter than lower_bound; if the search was
+    complete, the plan is the shortest one (optimal). timed_out tells
+    that the deadline ended the search of an anytime query, latency is
+    the time from the call to the result, in seconds.
+    """
+
+    def __init__(self, plan=None, lower_bound=0, complete=False,
+                 timed_out=False, latency=None):
+        self.plan = plan
+        self.lower_bound = lower_bound
+        self.complete = complete
+        self.timed_out = timed_out
+        self.latency = latency
+
+    @property
+    def horizon(self):
+        return (None if self.plan is None else len(self.plan))
+
+    @property
+    def optimal(self):
+        return (self.plan is not None
+                and (self.complete or self.lower_bound >= len(self.plan)))
+
+    def __repr__(self):
+        return ('Result(horizon=%r, lower_bound=%r, complete=%r, '
+                'timed_out=%r)' % (self.horizon, self.lower_bound,
+                                   self.complete, self.timed_out))
+
+
+def _worker(domain, t_max, anytime, options, connection):
+    """Run a query; send ('plan', t, Plan), ('bound', t, None) and
+    finally ('done', None, None) or ('error', None, message)."""
+    try:
+        if anytime:
+            for t, model in improving_plans(domain, t_max, **options):
+                if model is None:
+                    connection.send(('bound', t, None))
+                else:
+                    connection.send(('plan', t,
+                                     domain.extract_plan(t, model)))
+        else:
+            t, model = find_plan(domain, t_max, decode=False, **options)
+            if t is None:
+                connection.send(('bound', t_max + 1, None))
+            else:
+                connection.send(('plan', t, domain.extract_plan(t, model)))
+        connection.send(('done', None, None))
+    except Exception as e:
+        connection.send(('error', None, '%s: %s' % (type(e).__name__, e)))
+    finally:
+        connection.close()
+
+
+class AsyncPlanner(object):
+    """Solves planning queries in worker processes for asyncio code.
+
+    workers bounds the queries solved at once (default: number of
+    CPUs), max_pending the queries waiting for a worker (default: four
+    times workers).
+    """
+
+    outcomes = ['ok', 'timeout', 'cancelled', 'rejected', 'error']
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = (max_pending if max_pending is not None
+                            else 4 * self.workers)
+        self.running = 0
+        self.pending = 0
+        self.histograms = dict((o, Histogram())
+                               for o in ['all'] + self.outcomes)
+        self._slots = None
+        self._loop = None
+        self._context = multiprocessing.get_context('fork')
+
+    async def plan(self, domain, t_max=50, initial_state=None, goal=None,
+                   timeout=None, anytime=False, **options):
+        """Search the shortest plan of domain up to horizon t_max.
+
+        initial_state and goal replace those of the domain (see
+        Domain.variant). timeout is in seconds and includes the time
+        spent waiting for a worker. Without anytime a query that times
+        out raises asyncio.TimeoutError. The remaining options go to
+        find_plan, or, with anytime, to improving_plans.
+        """
+        start = time.perf_counter()
+        deadline = None if timeout is None else start + timeout
+        if initial_state is not None or goal is not None:
+            domain = domain.variant(initial_state, goal)
+        outcome = 'error'
+        try:
+            result = await self._run(domain, t_max, deadline, anytime,
+                                     options)
+            outcome = 'timeout' if result.timed_out else 'ok'
+            result.latency = time.perf_counter() - start
+            return (result)
+        except asyncio.TimeoutError:
+            outcome = 'timeout'
+            raise
+        except asyncio.CancelledError:
+            outcome = 'cancelled'
+            raise
+        except Overloaded:
+            outcome = 'rejected'
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            self.histograms['all'].add(latency)
+            self.histograms[outcome].add(latency)
+
+    async def _run(self, domain, t_max, deadline, anytime, options):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A semaphore belongs to the loop it is first used in
+            self._slots = asyncio.Semaphore(self.workers)
+            self._loop = loop
+        if self._slots.locked():
+            if self.pending >= self.max_pending:
+                raise Overloaded("%d queries are waiting already"
+                                 % self.pending)
+            self.pending += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(),
+                                       _remaining(deadline))
+            except asyncio.TimeoutError:
+                if not anytime:
+                    raise
+                return (Result(timed_out=True))
+            finally:
+                self.pending -= 1
+        else:
+            await self._slots.acquire()
+        self.running += 1
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker, args=(domain, t_max, anytime, options, sender))
+        process.daemon = True
+        try:
+            process.start()
+            sender.close()
+            return (await self._collect(receiver, deadline, anytime))
+        finally:
+            if process.is_alive():
+                process.terminate()
+            receiver.close()
+            sender.close()
+            if process.pid is not None:
+                await _reap(process)
+            self.running -= 1
+            self._slots.release()
+
+    async def _collect(self, receiver, deadline, anytime):
+        result = Result()
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await asyncio.wait_for(_readable(loop, receiver),
+                                       _remaining(deadline))
+            except asyncio.TimeoutError:
+                if not anytime:
+                    raise
+                result.timed_out = True
+                return (result)
+            while receiver.poll():
+                try:
+                    kind, t, value = receiver.recv()
+                except EOFError:
+                    raise RuntimeError("the worker process died")
+                if kind == 'plan':
+                    result.plan = value
+                elif kind == 'bound':
+                    result.lower_bound = max(result.lower_bound, t)
+                elif kind == 'done':
+                    result.complete = True
+                    if result.plan is not None:
+                        result.lower_bound = len(result.plan)
+                    return (result)
+                else:
+                    raise RuntimeError(value)
+
+    def stats(self):
+        """Queries running and waiting, and the latency histograms as
+        JSON values."""
+        return (dict(running=self.running, pending=self.pending,
+                     latency=dict((o, h.to_dict())
+                                  for (o, h) in self.histograms.items())))
+
+
+def _remaining(deadline):
+    if deadline is None:
+        return (None)
+    return (max(0.0, deadline - time.perf_counter()))
+
+
+def _readable(loop, connection):
+    """Future that is done once connection has data or is closed."""
+    future = loop.create_future()
+    fd = connection.fileno()
+
+    def ready():
+        if not future.done():
+            future.set_result(None)
+    loop.add_reader(fd, ready)
+    future.add_done_callback(lambda _: loop.remove_reader(fd))
+    return (future)
+
+
+async def _reap(process):
+    """Join a finished or terminated process without blocking the
+    loop."""
+    while process.is_alive():
+        await asyncio.sleep(0.001)
+    process.join()
+
+
+_shared = None
+
+
+async def plan(domain, t_max=50, initial_state=None, goal=None,
+               timeout=None, anytime=False, **options):
+    """AsyncPlanner.plan on a planner shared by all callers."""
+    global _shared
+    if _shared is None:
+        _shared = AsyncPlanner()
+    return (await _shared.plan(domain, t_max, initial_state, goal, timeout,
+                               anytime, **options))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Atom table shared by the PicoSAT front ends.
+
+PicoSAT expects atoms as positive integers and negated atoms as
+negative integers. The scripts in this repository write atoms as
+strings such as 'robot_at_ts_3' and negate them with the prefix '~'.
+AtomTable converts between both representations. Lookups go through a
+dict, so converting a formula is linear in its size.
+"""
+
+
+class AtomTable(object):
+    """Bidirectional map between atom names and PicoSAT variables.
+
+    Variables are numbered from 1 in the order in which atoms are first
+    seen. Numbers are never reassigned, so a number handed out once
+    stays valid for the lifetime of the table.
+    """
+
+    def __init__(self, names=()):
+        self.names = []
+        self.numbers = {}
+        for name in names:
+            self.number(name)
+
+    def __len__(self):
+        return (len(self.names))
+
+    def __contains__(self, name):
+        return (name in self.numbers)
+
+    def number(self, name):
+        """Return the variable of atom name, adding the atom if it is new."""
+        n = self.numbers.get(name)
+        if n is None:
+            self.names.append(name)
+            n = len(self.names)
+            self.numbers[name] = n
+        return (n)
+
+    def s2n(self, s):
+        """Convert string representation of atom to number."""
+        if (s[0] == '~'):
+            return (-self.number(s[1:]))
+        return (self.number(s))
+
+    def n2s(self, n):
+        """Convert numeric representation of atom to string."""
+        r = self.names[abs(n) - 1]
+        if (n < 0):
+            r = '~' + r
+        return (r)
+
+    def to_numbers(self, clauses):
+        """Convert a list of clauses from strings to numbers in bulk."""
+        numbers = self.numbers
+        number = self.number
+        result = []
+        for c in clauses:
+            nc = []
+            for s in c:
+                if (s[0] == '~'):
+                    n = numbers.get(s[1:])
+                    nc.append(-(n if n is not None else number(s[1:])))
+                else:
+                    n = numbers.get(s)
+                    nc.append(n if n is not None else number(s))
+            result.append(nc)
+        return (result)
+
+    def to_names(self, literals):
+        """Convert a list of numeric literals (e.g. a model) to strings."""
+        names = self.names
+        return ([names[n - 1] if n > 0 else '~' + names[-n - 1]
+                 for n in literals])
@@ -0,0 +1,9 @@
+"""Benchmarks for the SAT front ends.
+
+Run them from the repository root, e.g.
+
+    python -m benchmarks.bench_atoms
+
+benchmarks.suite runs scalable instances of all domains and writes the
+results to a file to compare with those of other versions.
+"""
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""The asyncio front-end under load.
+
+A ticker task measures how late the event loop wakes it up while
+queries are solved: calling find_plan directly in a coroutine blocks
+the loop for the whole search, AsyncPlanner does not. Further rows
+show the throughput of concurrent delivery queries, how soon a query
+past its deadline returns (its worker is terminated), and what the
+anytime mode returns at several deadlines on a fleet instance that
+takes several seconds to solve to optimality.
+"""
+
+from __future__ import print_function
+import asyncio
+import json
+import random
+import time
+
+import delivery
+from asyncplanner import AsyncPlanner, Overloaded
+from fleet import fleet_delivery, grid_floorplan, random_instance
+from planner import find_plan
+
+rooms = ['main_office', 'mail_drop', 'ts', 'o101', 'o103', 'o105', 'o107',
+         'r101', 'r103', 'r105', 'r107']
+
+
+def fleet(width, k, p, seed=0):
+    floorplan = grid_floorplan(width, width)
+    robots, parcels = random_instance(floorplan, k, p, seed)
+    return (fleet_delivery(robots, parcels, floorplan,
+                           semantics='exists').domain())
+
+
+def queries(count, seed=0):
+    rnd = random.Random(seed)
+    return ([delivery.query(rnd.choice(rooms), rnd.choice(rooms))
+             for _ in range(count)])
+
+
+async def ticker(stop, period=0.005):
+    """Largest delay of the loop in waking the ticker, in seconds."""
+    lag = 0.0
+    while not stop.is_set():
+        before = time.perf_counter()
+        await asyncio.sleep(period)
+        lag = max(lag, time.perf_counter() - before - period)
+    return (lag)
+
+
+async def with_ticker(work):
+    stop = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(stop))
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return (elapsed, await tick)
+
+
+async def blocking(domains):
+    for d in domains:
+        find_plan(d, 30)
+
+
+async def concurrent(planner, domains):
+    await asyncio.gather(*[planner.plan(d, 30) for d in domains])
+
+
+async def main_async(count=40):
+    print("%-40s %9s %9s %9s" % ('run', '[s]', 'queries/s', 'lag [ms]'))
+    domains = queries(count)
+    for d in domains:
+        d.template
+    for name, work in [
+            ('find_plan in a coroutine', lambda: blocking(domains)),
+            ('AsyncPlanner, 1 worker',
+             lambda: concurrent(AsyncPlanner(1, count), domains)),
+            ('AsyncPlanner, 4 workers',
+             lambda: concurrent(AsyncPlanner(4, count), domains))]:
+        elapsed, lag = await with_ticker(work)
+        print("%-40s %9.3f %9.1f %9.1f" % (name, elapsed, count / elapsed,
+                                            1000 * lag))
+
+    hard = fleet(8, 3, 3)
+    hard.template
+    planner = AsyncPlanner(2, max_pending=2)
+    print()
+    print("%-40s %9s %9s" % ('deadline', 'timeout', 'returned'))
+    for timeout in [0.1, 0.5, 1.0]:
+        start = time.perf_counter()
+        try:
+            await planner.plan(hard, 40, timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        print("%-40s %9.2f %9.3f" % ('fleet 8x8, 3 robots, 3 parcels',
+                                      timeout, time.perf_counter() - start))
+    tasks = [asyncio.ensure_future(planner.plan(hard, 40, timeout=0.3))
+             for _ in range(8)]
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    print("8 queries on 2 workers with 2 pending: %d rejected, %d timed out"
+          % (sum(isinstance(o, Overloaded) for o in outcomes),
+             sum(isinstance(o, asyncio.TimeoutError) for o in outcomes)))
+
+    print()
+    print("%-32s %9s %9s %9s %9s" % ('anytime', 'deadline', 'horizon',
+                                     'bound', 'optimal'))
+    for name, domain in [('fleet 6x6, 2 robots, 3 parcels', fleet(6, 2, 3)),
+                         ('fleet 8x8, 3 robots, 3 parcels', hard)]:
+        for timeout in [0.25, 1.0, 4.0, 30.0]:
+            r = await planner.plan(domain, 40, timeout=timeout, anytime=True)
+            print("%-32s %9.2f %9s %9d %9s" % (name, timeout, r.horizon,
+                                               r.lower_bound, r.optimal))
+    print()
+    print("latency histogram of all queries:")
+    print(json.dumps(planner.stats()['latency']['all']))
+
+
+def main():
+    asyncio.run(main_async())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Atom conversion time as a function of the delivery planning horizon.
+
+Compares the AtomTable against the old list based s2n, which looked up
+every literal with atoms_list.index. The time per literal of AtomTable
+should stay flat while the horizon grows; the list lookup grows with
+the number of atoms.
+"""
+
+from __future__ import print_function
+import time
+
+import delivery
+from atoms import AtomTable
+
+
+def list_to_numbers(clauses):
+    """The former s2n: linear search in a growing list."""
+    atoms_list = []
+    result = []
+    for c in clauses:
+        nc = []
+        for s in c:
+            if (s[0] == '~'):
+                inv = -1
+                t = s[1:]
+            else:
+                inv = 1
+                t = s
+            try:
+                n = atoms_list.index(t)
+            except ValueError:
+                atoms_list.append(t)
+                n = len(atoms_list) - 1
+            nc.append((n + 1) * inv)
+        result.append(nc)
+    return (result)
+
+
+def table_to_numbers(clauses):
+    return (AtomTable().to_numbers(clauses))
+
+
+def timed(f, clauses, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f(clauses)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return (best)
+
+
+def main(horizons=(5, 10, 20, 40, 80, 160), list_limit=40):
+    print("%8s %8s %9s %12s %12s %10s %10s" % (
+        'horizon', 'atoms', 'literals', 'table [ms]', 'list [ms]',
+        'ns/lit', 'list ns/lit'))
+    for h in horizons:
+        clauses = []
+        for t in range(h + 1):
+            clauses += delivery.movement_axioms(t)
+        literals = sum(len(c) for c in clauses)
+        n_atoms = len(AtomTable(s.lstrip('~') for c in clauses for s in c))
+        table = timed(table_to_numbers, clauses)
+        if h <= list_limit:
+            lst = timed(list_to_numbers, clauses, repeat=1)
+            lst_ms = '%12.1f' % (lst * 1e3)
+            lst_ns = '%10.0f' % (lst * 1e9 / literals)
+        else:
+            lst_ms = '%12s' % '-'
+            lst_ns = '%10s' % '-'
+        print("%8d %8d %9d %12.1f %s %10.0f %s" % (
+            h, n_atoms, literals, table * 1e3, lst_ms,
+            table * 1e9 / literals, lst_ns))
+
+
+if __name__ == "__main__":
+    main()
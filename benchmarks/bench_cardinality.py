@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""At-most-one encodings on corridor floorplans of growing size.
+
+For every floorplan and encoding the table lists the clauses and
+variables of one time slice of the delivery axioms and the time to find
+the shortest plan that brings the mail from the last room to the main
+office.
+"""
+
+from __future__ import print_function
+import time
+
+import delivery
+from cardinality import encodings
+from planner import find_plan
+
+
+def main(sizes=(4, 8, 16, 32), solve_limit=16):
+    print("%8s %-11s %9s %9s %8s %10s" % ('offices', 'encoding', 'clauses',
+                                          'vars', 'horizon', 'solve [s]'))
+    for n in sizes:
+        for encoding in encodings[:-1]:
+            domain = delivery.corridor_domain(n, encoding=encoding,
+                                              reachable=False)
+            template = domain.template
+            if n <= solve_limit:
+                start = time.perf_counter()
+                t, _ = find_plan(domain, 4 * n + 20)
+                elapsed = '%10.3f' % (time.perf_counter() - start)
+            else:
+                t, elapsed = '-', '%10s' % '-'
+            print("%8d %-11s %9d %9d %8s %s" % (
+                n, encoding, len(template.clauses), template.width, t,
+                elapsed))
+
+
+if __name__ == "__main__":
+    main()
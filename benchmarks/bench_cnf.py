@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Memory and speed of the CNF representations.
+
+For the complete formula of a horizon the table lists the memory held
+by the formula (measured with tracemalloc) in each representation:
+
+    strings    lists of atom names, as the scripts write axioms
+    lists      lists of ints, as AtomTable.to_numbers returns them
+    CNF        cnf.CNF from the atom names (CNF.from_names)
+    template   cnf.CNF from the integer template (Domain.horizon_cnf)
+
+and the time to build the integer forms and to hand them to pycosat.
+The solve columns include the time pycosat takes to read the formula,
+so they compare the lists with the CNF on the same search.
+"""
+
+from __future__ import print_function
+import functools
+import time
+import tracemalloc
+
+import pycosat
+
+import delivery
+import home_wiring
+from atoms import AtomTable
+from cnf import CNF
+from fleet import fleet_delivery
+
+
+def horizon_axioms(domain, t):
+    axioms = []
+    for s in range(0, t + 1):
+        axioms += domain.movement_axioms(s)
+    return (axioms + domain.initial_state + domain.goal(t))
+
+
+def wiring_axioms(n):
+    axioms, components, observations = home_wiring.scaled_circuit(n)
+    return (axioms + [[c] for c in components] + [[o] for o in observations])
+
+
+def instances():
+    """Triples (name, function building the string clauses, domain and
+    horizon or None)."""
+    corridor = delivery.corridor_domain(16, reachable=False,
+                                        name='delivery_16')
+    for domain, t in [(delivery.domain, 20), (corridor, 40),
+                      (fleet_delivery({'robot0': 'main_office',
+                                       'robot1': 'o107'},
+                                      {'mail0': ('r107', 'main_office'),
+                                       'mail1': ('r101', 'o105')},
+                                      semantics='exists').domain(False),
+                       12)]:
+        yield ('%s, %d steps' % (domain.name, t),
+               functools.partial(horizon_axioms, domain, t), (domain, t))
+    yield ('wiring, 2000 lamps', functools.partial(wiring_axioms, 2000),
+           None)
+
+
+def held(build, *args):
+    """The result of build and the memory it holds, in bytes."""
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(*args)
+    return (result, tracemalloc.get_traced_memory()[0] - before)
+
+
+def timed(f, *args):
+    start = time.perf_counter()
+    result = f(*args)
+    return (result, time.perf_counter() - start)
+
+
+def main():
+    print("%-26s %8s %9s %9s %9s %9s %8s %8s %8s %8s" % (
+        'formula', 'literals', 'strings', 'lists', 'CNF', 'template',
+        'to_lists', 'to_CNF', 'lists', 'CNF'))
+    print("%-26s %8s %9s %9s %9s %9s %8s %8s %8s %8s" % (
+        '', '', '[KiB]', '[KiB]', '[KiB]', '[KiB]', '[s]', '[s]',
+        'solve[s]', 'solve[s]'))
+    for name, build, horizon in instances():
+        if horizon is not None:
+            horizon[0].template
+        tracemalloc.start()
+        strings, m_strings = held(build)
+        atoms = AtomTable()
+        atoms.to_numbers(strings)
+        lists, m_lists = held(atoms.to_numbers, strings)
+        cnf, m_cnf = held(CNF.from_names, strings, atoms)
+        m_template = None
+        if horizon is not None:
+            domain, t = horizon
+            _, m_template = held(domain.horizon_cnf, t)
+        tracemalloc.stop()
+        _, to_lists = timed(atoms.to_numbers, strings)
+        _, to_cnf = timed(CNF.from_names, strings, atoms)
+        a, solve_lists = timed(pycosat.solve, lists)
+        b, solve_cnf = timed(pycosat.solve, cnf)
+        if (a == 'UNSAT') != (b == 'UNSAT'):
+            raise AssertionError("different results")
+        print("%-26s %8d %9.0f %9.0f %9.0f %9s %8.3f %8.3f %8.3f %8.3f" % (
+            name, len(cnf.literals), m_strings / 1024.0, m_lists / 1024.0,
+            m_cnf / 1024.0,
+            '-' if m_template is None else '%.0f' % (m_template / 1024.0),
+            to_lists, to_cnf, solve_lists, solve_cnf))
+
+
+if __name__ == "__main__":
+    main()
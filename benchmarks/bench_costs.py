@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Cost-optimal planning: one incremental solver versus re-solving.
+
+For every domain and cost function the table lists the cost and
+horizon of the cheapest plan, the number of solver calls and the time
+of costs.cheapest_plan with the bound tightened by assumptions on one
+solver, and with every horizon and bound encoded from scratch. Both
+results are checked with Optimum.verify, which is not timed.
+"""
+
+from __future__ import print_function
+import time
+
+import delivery
+import wolf_goat_cabbage
+from costs import cheapest_plan
+from planner import Solver
+
+
+def room_distance(here, there):
+    """Moves between an office o1xx and a room r1xx cost 3, all other
+    moves 1."""
+    if set([here[0], there[0]]) == set(['o', 'r']):
+        return (3)
+    return (1)
+
+
+instances = [
+    ('wgc loaded', wolf_goat_cabbage.domain,
+     wolf_goat_cabbage.loaded_crossings, 12),
+    ('delivery unit', delivery.domain, delivery.travel_costs(), 30),
+    ('delivery weighted', delivery.domain,
+     delivery.travel_costs(room_distance), 30),
+]
+
+
+def timed_optimum(domain, costs, t_max, **options):
+    start = time.perf_counter()
+    optimum = cheapest_plan(domain, costs, t_max, **options)
+    elapsed = time.perf_counter() - start
+    optimum.verify(domain, costs)
+    return (optimum, elapsed)
+
+
+def main():
+    modes = [('scratch', dict(incremental=False))]
+    if Solver is not None:
+        modes.append(('pysat', dict(incremental=True)))
+    else:
+        modes.append(('pycosat', dict(incremental=True, solver_name=None)))
+    print("%-18s %5s %8s %-10s" % ('instance', 'cost', 'horizon', 'stopped')
+          + ''.join('%8s %10s' % ('calls', '%s [s]' % m) for m, _ in modes)
+          + '%10s' % 'speedup')
+    for name, domain, costs, t_max in instances:
+        row = []
+        for _, options in modes:
+            optimum, elapsed = timed_optimum(domain, costs, t_max, **options)
+            row.append((optimum, elapsed))
+        optimum = row[-1][0]
+        print("%-18s %5s %8s %-10s" % (name, optimum.cost, optimum.horizon,
+                                       optimum.stopped)
+              + ''.join('%8d %10.3f' % (o.solves, e) for o, e in row)
+              + '%9.1fx' % (row[0][1] / row[-1][1]))
+
+
+if __name__ == "__main__":
+    main()
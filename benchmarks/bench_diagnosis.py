@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Minimal diagnoses of scaled wiring circuits.
+
+'exhaustive' checks every subset of components with a fresh pycosat
+call, the way diagnosis() did with allNegations, and keeps the minimal
+consistent ones. 'hitting sets' is minimal_diagnoses. Exhaustive
+enumeration is skipped once it would need more than 2^16 checks.
+"""
+
+from __future__ import print_function
+import itertools
+import time
+
+import pycosat
+
+import home_wiring
+from atoms import AtomTable
+from diagnosis import Circuit
+
+
+def exhaustive(axioms, components, observations):
+    atoms = AtomTable()
+    base = atoms.to_numbers(axioms + [[o] for o in observations])
+    found = []
+    for k in range(len(components) + 1):
+        for faulty in itertools.combinations(components, k):
+            healthy = [[atoms.s2n(c)] for c in components if c not in faulty]
+            if pycosat.solve(base + healthy) != 'UNSAT':
+                found.append(set(faulty))
+    return ([d for d in found if not any(e < d for e in found)])
+
+
+def main(sizes=(2, 4, 5, 6, 10, 50, 100, 200, 500), exhaustive_limit=16):
+    print("%6s %11s %10s %10s %14s %15s" % (
+        'lamps', 'components', 'diagnoses', 'checks', 'exhaustive [s]',
+        'hitting sets [s]'))
+    for n in sizes:
+        axioms, components, observations = home_wiring.scaled_circuit(n)
+        start = time.perf_counter()
+        circuit = Circuit(axioms, components)
+        diagnoses = list(circuit.diagnoses(observations))
+        fast = time.perf_counter() - start
+        circuit.close()
+        if len(components) <= exhaustive_limit:
+            start = time.perf_counter()
+            reference = exhaustive(axioms, components, observations)
+            slow = '%14.3f' % (time.perf_counter() - start)
+            assert (sorted(sorted(d) for d in reference)
+                    == sorted(sorted(d) for d in diagnoses))
+        else:
+            slow = '%14s' % '-'
+        print("%6d %11d %10d %10d %s %15.3f" % (
+            n, len(components), len(diagnoses), circuit.checks, slow, fast))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Encoding a horizon compared with loading it from the instance cache.
+
+'strings' encodes the formula of one horizon from the string axioms as
+the scripts did originally, 'template' instantiates the SliceTemplate
+and 'cached' reads the DIMACS file written by the InstanceCache.
+"""
+
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import time
+
+import delivery
+import river_crossing
+import wolf_goat_cabbage
+from atoms import AtomTable
+from cnf import CNF
+from dimacs import InstanceCache
+
+
+def timed(f):
+    start = time.perf_counter()
+    f()
+    return (time.perf_counter() - start)
+
+
+def strings(domain, t):
+    axioms = []
+    for s in range(0, t + 1):
+        axioms += domain.movement_axioms(s)
+    axioms += domain.initial_state + domain.goal(t)
+    return (AtomTable().to_numbers(axioms))
+
+
+def main(horizon=50):
+    directory = tempfile.mkdtemp()
+    try:
+        cache = InstanceCache(directory)
+        domains = [wolf_goat_cabbage.domain, delivery.domain,
+                   river_crossing.food_chain(40, 20).domain()]
+        print("horizon %d" % horizon)
+        print("%-20s %9s %9s %12s %12s %12s %12s" % (
+            'domain', 'clauses', 'MB', 'strings [s]', 'template [s]',
+            'write [s]', 'cached [s]'))
+        for domain in domains:
+            encode = timed(lambda: strings(domain, horizon))
+            template = timed(lambda: domain.horizon_clauses(horizon))
+            write = timed(lambda: CNF(cache.clauses(domain, horizon)))
+            load = timed(lambda: CNF(cache.clauses(domain, horizon)))
+            path = cache.path(domain, horizon)
+            print("%-20s %9d %9.1f %12.3f %12.3f %12.3f %12.3f" % (
+                domain.name, len(domain.horizon_clauses(horizon)),
+                os.path.getsize(path) / 1e6, encode, template, write,
+                load))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""The Horn and 2-SAT engines of fastsat against pycosat and PySAT.
+
+The first table compares single calls of fastsat.solve and pycosat.solve
+on Horn formulas (wiring circuits with all components assumed to work)
+and on satisfiable random 2-SAT formulas. The second table enumerates
+all minimal diagnoses of wiring circuits, which takes many consistency
+checks under assumptions, with each of the engines Circuit can use.
+"""
+
+from __future__ import print_function
+import random
+import time
+
+import pycosat
+
+import fastsat
+import home_wiring
+from atoms import AtomTable
+from diagnosis import Circuit
+from planner import Solver
+
+
+def per_call(f, clauses, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        f(clauses)
+    return ((time.perf_counter() - start) / repeat)
+
+
+def wiring(n):
+    if n is None:
+        axioms = home_wiring.axioms
+        components = ['live_outside', 'ok_cb_1', 'ok_cb_2', 'ok_l_1',
+                      'ok_l_2']
+        observations = ['up_s_1', 'up_s_2', '~lit_l_1']
+    else:
+        axioms, components, observations = home_wiring.scaled_circuit(n)
+    return (axioms, components, observations)
+
+
+def horn_formula(n):
+    axioms, components, observations = wiring(n)
+    units = [[x] for x in components + observations]
+    return (AtomTable().to_numbers(axioms + units))
+
+
+def random_2sat(n, ratio=1.5, seed=0):
+    """Random 2-SAT formula with a planted model."""
+    rnd = random.Random(seed)
+    model = [rnd.choice([-1, 1]) * v for v in range(1, n + 1)]
+    clauses = []
+    while len(clauses) < ratio * n:
+        c = [rnd.choice([-1, 1]) * rnd.randint(1, n) for _ in range(2)]
+        if any(l in model for l in c):
+            clauses.append(c)
+    return (clauses)
+
+
+def single_calls(repeat=100):
+    instances = [('wiring example', horn_formula(None))]
+    for n in (10, 100, 1000):
+        instances.append(('wiring, %d lamps' % n, horn_formula(n)))
+    for n in (100, 1000, 10000):
+        instances.append(('random 2-SAT, %d vars' % n, random_2sat(n)))
+    print("%-26s %6s %8s %7s %14s %14s" % (
+        'instance', 'kind', 'clauses', 'result', 'pycosat [us]',
+        'fastsat [us]'))
+    for name, clauses in instances:
+        kind = 'horn' if fastsat.is_horn(clauses) else '2-SAT'
+        result = 'UNSAT' if fastsat.solve(clauses) == 'UNSAT' else 'SAT'
+        assert result == ('UNSAT' if pycosat.solve(clauses) == 'UNSAT'
+                          else 'SAT')
+        slow = per_call(pycosat.solve, clauses, repeat)
+        fast = per_call(fastsat.solve, clauses, repeat)
+        print("%-26s %6s %8d %7s %14.1f %14.1f" % (
+            name, kind, len(clauses), result, slow * 1e6, fast * 1e6))
+
+
+def diagnoses(sizes=(None, 10, 100, 500)):
+    engines = ['pycosat', 'horn']
+    if Solver is not None:
+        engines.append('minisat22')
+    print("\n%-26s" % 'all minimal diagnoses'
+          + ''.join('%16s' % ('%s [ms]' % e) for e in engines)
+          + '%16s' % 'checks')
+    for n in sizes:
+        axioms, components, observations = wiring(n)
+        row = []
+        checks = []
+        for engine in engines:
+            circuit = Circuit(axioms, components, engine)
+            start = time.perf_counter()
+            list(circuit.diagnoses(observations))
+            row.append(time.perf_counter() - start)
+            checks.append(str(circuit.checks))
+            circuit.close()
+        print("%-26s" % ('wiring example' if n is None
+                         else 'wiring, %d lamps' % n)
+              + ''.join('%16.2f' % (e * 1e3) for e in row)
+              + '%16s' % '/'.join(checks))
+
+
+def main():
+    single_calls()
+    diagnoses()
+
+
+if __name__ == "__main__":
+    main()
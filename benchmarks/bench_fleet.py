@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Size and solve time of fleet deliveries of growing size.
+
+The first table shows how one time step of the encoding grows with the
+number of robots K and parcels P on a 4 x 4 grid. The second solves
+random instances on grids and corridors with exists-step semantics;
+every plan is executed and checked against goal and capacity.
+"""
+
+from __future__ import print_function
+import time
+
+import delivery
+from fleet import (capacity_check, fleet_delivery, grid_floorplan,
+                   random_instance)
+from planner import find_plan
+
+
+def size(floorplan, k, p, capacity):
+    robots, parcels = random_instance(floorplan, k, p)
+    problem = fleet_delivery(robots, parcels, floorplan, 'exists', capacity)
+    template = problem.domain().template
+    return (template.width, len(template.clauses))
+
+
+def main(t_max=40):
+    grid = grid_floorplan(4, 4)
+    print("one step on a 4 x 4 grid, capacity 2")
+    print("%4s %4s %10s %10s" % ('K', 'P', 'atoms', 'clauses'))
+    for k, p in [(1, 4), (2, 4), (4, 4), (8, 4),
+                 (2, 1), (2, 2), (2, 8), (2, 16)]:
+        atoms, clauses = size(grid, k, p, 2)
+        print("%4d %4d %10d %10d" % (k, p, atoms, clauses))
+    print()
+    print("%-14s %3s %3s %3s %8s %8s %10s" % (
+        'floorplan', 'K', 'P', 'C', 'horizon', 'actions', 'solve [s]'))
+    floorplans = [('grid 3x3', grid_floorplan(3, 3)),
+                  ('grid 4x4', grid),
+                  ('corridor 6', delivery.corridor_floorplan(6))]
+    for name, floorplan in floorplans:
+        for k, p, capacity in [(2, 3, 1), (2, 3, 3), (3, 4, 2)]:
+            robots, parcels = random_instance(floorplan, k, p, seed=1)
+            problem = fleet_delivery(robots, parcels, floorplan, 'exists',
+                                     capacity)
+            domain = problem.domain()
+            start = time.perf_counter()
+            t, model = find_plan(domain, t_max, decode=False)
+            elapsed = time.perf_counter() - start
+            sequence = problem.linearize(domain.extract_plan(t, model))
+            check = capacity_check(robots, parcels, capacity)
+            if not problem.achieves_goal(problem.simulate(sequence, check)):
+                raise RuntimeError("invalid plan on %s" % name)
+            print("%-14s %3d %3d %3d %8d %8d %10.3f" % (
+                name, k, p, capacity, t, len(sequence), elapsed))
+
+
+if __name__ == "__main__":
+    main()
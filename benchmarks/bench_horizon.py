@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Horizon search strategies on corridor floorplans.
+
+The parallel strategy only pays off with several CPUs; pass the number
+of workers as first argument (default: number of CPUs).
+"""
+
+from __future__ import print_function
+import os
+import sys
+import time
+
+from benchmarks.bench_cardinality import corridor_domain
+from planner import find_plan
+
+
+def main(sizes=(4, 8, 12, 16), workers=None):
+    workers = workers or os.cpu_count() or 1
+    modes = [('scratch', dict(incremental=False)),
+             ('incremental', dict()),
+             ('exponential', dict(strategy='exponential')),
+             ('parallel/%d' % workers, dict(strategy='parallel',
+                                            workers=workers))]
+    print("%8s %8s" % ('offices', 'horizon')
+          + ''.join('%15s' % m for m, _ in modes) + '   [s]')
+    for n in sizes:
+        row = []
+        for _, options in modes:
+            domain = corridor_domain(n)
+            start = time.perf_counter()
+            t, _ = find_plan(domain, 4 * n + 20, **options)
+            row.append(time.perf_counter() - start)
+        print("%8d %8d" % (n, t) + ''.join('%15.3f' % e for e in row))
+
+
+if __name__ == "__main__":
+    main(workers=int(sys.argv[1]) if len(sys.argv) > 1 else None)
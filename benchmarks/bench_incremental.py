@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Incremental versus from-scratch horizon search on delivery queries.
+
+Each query moves the mail between two rooms of the delivery floorplan
+and requires the robot to end up at a given place, which makes the
+horizons longer than in delivery.py itself. Every run starts from a
+fresh atom table.
+"""
+
+from __future__ import print_function
+import time
+
+import delivery
+from atoms import AtomTable
+from planner import Domain, Solver, find_plan
+
+queries = [
+    # mail from, mail to, robot end
+    ('r107', 'main_office', 'main_office'),
+    ('r101', 'r107', 'main_office'),
+    ('r107', 'r101', 'r107'),
+    ('main_office', 'r105', 'r101'),
+]
+
+
+def delivery_domain(mail_from, mail_to, robot_end):
+    def goal(t):
+        return ([['mail_at_%s_%d' % (mail_to, t)],
+                 ['~robot_carries_mail_%d' % t],
+                 ['robot_at_%s_%d' % (robot_end, t)]])
+    initial_state = [['robot_at_main_office_0'],
+                     ['~robot_carries_mail_0'],
+                     ['mail_at_%s_0' % mail_from]]
+    return (Domain('delivery', delivery.movement_axioms, initial_state, goal,
+                   delivery.actions, AtomTable()))
+
+
+def timed_plan(query, t_max, **options):
+    start = time.perf_counter()
+    t, solution = find_plan(delivery_domain(*query), t_max, **options)
+    return (t, time.perf_counter() - start)
+
+
+def main(t_max=40):
+    modes = [('scratch', dict(incremental=False)),
+             ('pycosat', dict(incremental=True, solver_name=None))]
+    if Solver is not None:
+        modes.append(('pysat', dict(incremental=True)))
+    print("%-36s %8s" % ('query', 'horizon')
+          + ''.join('%12s' % ('%s [s]' % m) for m, _ in modes)
+          + '%10s' % 'speedup')
+    for q in queries:
+        times = []
+        for _, options in modes:
+            t, elapsed = timed_plan(q, t_max, **options)
+            times.append(elapsed)
+        print("%-36s %8s" % (' -> '.join(q), t)
+              + ''.join('%12.3f' % e for e in times)
+              + '%9.1fx' % (times[0] / min(times[1:])))
+
+
+if __name__ == "__main__":
+    main()
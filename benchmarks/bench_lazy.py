@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Eager against lazily generated mutex axioms on corridor floorplans.
+
+The delivery domain with the mail in the last room, without
+reachability pruning, so that all robot and mail locations stay open.
+For the shortest horizon the table lists the clauses of the mutex
+families in the eager encoding (and pairwise), the clauses lazy mode
+added instead, the solver calls it took and the time of linear search
+in both modes.
+"""
+
+from __future__ import print_function
+import time
+
+import delivery
+from lazy import LazyMutexes
+from planner import find_plan
+
+
+def timed(f, *args, **kwargs):
+    start = time.perf_counter()
+    result = f(*args, **kwargs)
+    return (result, time.perf_counter() - start)
+
+
+def main(sizes=(4, 8, 16, 32), solver_name='minisat22'):
+    print("%8s %8s %8s %9s %6s %7s %10s %9s" % (
+        'offices', 'horizon', 'eager', 'pairwise', 'lazy', 'calls',
+        'eager [s]', 'lazy [s]'))
+    for n in sizes:
+        domain = delivery.corridor_domain(n, reachable=False)
+        (t, _), eager = timed(find_plan, domain, 4 * n + 20,
+                              solver_name=solver_name)
+        stats = LazyMutexes()
+        (t_lazy, _), lazy = timed(find_plan, domain, 4 * n + 20,
+                                  solver_name=solver_name, lazy=stats)
+        if t != t_lazy:
+            raise AssertionError("lazy mode changed the horizon")
+        print("%8d %8d %8d %9d %6d %7d %10.3f %9.3f" % (
+            n, t, stats.eager, stats.pairwise, stats.lazy, stats.rounds,
+            eager, lazy))
+
+
+if __name__ == "__main__":
+    main()
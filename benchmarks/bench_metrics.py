@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Overhead of the instrumentation in find_plan.
+
+Every domain is planned repeatedly without a recorder, with the
+disabled recorder, with a recorder that keeps its records in memory and
+with one that also traces memory.
+"""
+
+from __future__ import print_function
+import time
+
+import delivery
+import wolf_goat_cabbage
+from metrics import Recorder, disabled
+from planner import find_plan
+
+
+def timed(domain, t_max, make_recorder, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        recorder = make_recorder()
+        if recorder is None:
+            find_plan(domain, t_max)
+            continue
+        with recorder:
+            find_plan(domain, t_max, recorder=recorder)
+    return ((time.perf_counter() - start) / repeat)
+
+
+def main(repeat=50):
+    variants = [('none', lambda: None),
+                ('disabled', lambda: disabled),
+                ('records', lambda: Recorder()),
+                ('memory', lambda: Recorder(memory=True))]
+    print("%-20s %s" % ('domain', ' '.join('%12s' % ('%s [ms]' % v)
+                                          for v, _ in variants)))
+    for domain, t_max in [(wolf_goat_cabbage.domain, 10),
+                          (delivery.domain, 20)]:
+        times = [timed(domain, t_max, make, repeat) for _, make in variants]
+        print("%-20s %s" % (domain.name,
+                            ' '.join('%12.2f' % (1e3 * x) for x in times)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Sequential against parallel step semantics on fleet deliveries.
+
+For every instance and semantics the table lists the clauses of one
+time step, the horizon of the shortest plan, the number of actions of
+the linearized plan and the time to find it. Every linearized plan is
+executed from the initial state and checked to reach the goal.
+
+Sequential plans take minutes already for two robots with three
+parcels, so the sequential semantics is only solved for instances with
+at most sequential_limit robots times parcels.
+"""
+
+from __future__ import print_function
+import time
+
+import delivery
+from fleet import fleet_delivery
+from planner import find_plan
+from strips import step_semantics
+
+
+def instances():
+    office = delivery.floorplan
+    corridor = delivery.corridor_floorplan(6)
+    yield ('2 robots, 2 parcels', office,
+           {'robot0': 'main_office', 'robot1': 'o107'},
+           {'mail0': ('r107', 'main_office'), 'mail1': ('r101', 'o105')})
+    yield ('3 robots, 3 parcels', office,
+           {'robot0': 'main_office', 'robot1': 'o107', 'robot2': 'r103'},
+           {'mail0': ('r107', 'main_office'), 'mail1': ('r101', 'o105'),
+            'mail2': ('r105', 'mail_drop')})
+    yield ('3 robots, 3 parcels, 6 offices', corridor,
+           {'robot0': 'main_office', 'robot1': 'o111', 'robot2': 'o105'},
+           {'mail0': ('r111', 'main_office'), 'mail1': ('r101', 'o109'),
+            'mail2': ('r107', 'ts')})
+
+
+def main(t_max=60, sequential_limit=4):
+    print("%-32s %-11s %8s %8s %8s %10s" % (
+        'instance', 'semantics', 'clauses', 'horizon', 'actions',
+        'solve [s]'))
+    for name, floorplan, robots, parcels in instances():
+        for semantics in step_semantics:
+            if (semantics == 'sequential'
+                    and len(robots) * len(parcels) > sequential_limit):
+                print("%-32s %-11s %8s %8s %8s %10s" % (
+                    name, semantics, '', '', '', 'skipped'))
+                continue
+            problem = fleet_delivery(robots, parcels, floorplan, semantics)
+            domain = problem.domain()
+            start = time.perf_counter()
+            t, model = find_plan(domain, t_max, decode=False)
+            elapsed = time.perf_counter() - start
+            sequence = problem.linearize(domain.extract_plan(t, model))
+            if not problem.achieves_goal(problem.simulate(sequence)):
+                raise RuntimeError("invalid plan for %s" % name)
+            print("%-32s %-11s %8d %8d %8d %10.3f" % (
+                name, semantics, len(domain.template.clauses), t,
+                len(sequence), elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Decoding plans from models of growing horizon.
+
+'scan' converts the whole model to strings and tests every literal
+against every action name, as print_actions_in used to; 'extract' reads
+the action and fluent variables with Domain.extract_plan.
+"""
+
+from __future__ import print_function
+import time
+
+import pycosat
+
+import delivery
+import river_crossing
+
+
+def scan(domain, model):
+    action_trace = []
+    for c in domain.template.to_names(model):
+        for a in domain.actions:
+            if (c.find(a) == 0):
+                action_trace += [c]
+    return (action_trace[:-1])
+
+
+def timed(f, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        f()
+    return ((time.perf_counter() - start) / repeat)
+
+
+def main(horizons=(20, 100, 500)):
+    domains = [delivery.domain, river_crossing.food_chain(40, 20).domain()]
+    print("%-20s %8s %10s %12s %12s %8s" % (
+        'domain', 'horizon', 'variables', 'scan [ms]', 'extract [ms]',
+        'speedup'))
+    for domain in domains:
+        for t in horizons:
+            model = pycosat.solve(domain.horizon_clauses(t))
+            slow = timed(lambda: scan(domain, model))
+            fast = timed(lambda: domain.extract_plan(t, model))
+            print("%-20s %8d %10d %12.2f %12.2f %7.1fx" % (
+                domain.name, t, len(model), slow * 1e3, fast * 1e3,
+                slow / fast))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Delivery queries answered by search and by the plan cache.
+
+Every query brings the mail from one room to another. The first round
+fills an empty PlanCache, the second is answered from it; the last
+column repeats the second round with a larger t_max for the queries
+that had no plan, which starts at the stored lower bound.
+"""
+
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import time
+
+import delivery
+from plancache import PlanCache
+
+
+def run(cache, queries, t_max):
+    start = time.perf_counter()
+    for source, target in queries:
+        cache.find_plan(delivery.query(source, target), t_max)
+    return (time.perf_counter() - start)
+
+
+def main(t_max=12):
+    locations = [l[0] for l in delivery.floorplan]
+    queries = [(s, t) for s in locations for t in locations if s != t]
+    directory = tempfile.mkdtemp()
+    try:
+        with PlanCache(os.path.join(directory, 'plans.sqlite')) as cache:
+            cold = run(cache, queries, t_max)
+            warm = run(cache, queries, t_max)
+            hits, misses = cache.hits, cache.misses
+            deeper = run(cache, queries, t_max + 8)
+            print("%d queries, t_max %d" % (len(queries), t_max))
+            print("%12s %12s %16s %8s %8s" % (
+                'cold [s]', 'warm [s]', 't_max+8 [s]', 'hits', 'misses'))
+            print("%12.3f %12.3f %16.3f %8d %8d" % (
+                cold, warm, deeper, hits, misses))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Enumeration of all shortest plans with planner.iter_plans.
+
+The robot of the delivery domain starts in the north west corner of an
+n x n grid of rooms and brings the mail from the south east corner
+back. Every shortest plan walks a monotone path there and back, so
+there are binomial(2(n-1), n-1) squared of them. For every grid and
+solver the table lists the plans found, the time taken and the memory
+traced by tracemalloc after the first plan and its maximum after any
+later plan, which shows that the memory held stays flat while the
+plans stream past (the solver's own memory is not traced).
+"""
+
+from __future__ import print_function
+import functools
+import time
+import tracemalloc
+
+import delivery
+from fleet import grid_floorplan
+from planner import Domain, iter_plans
+
+
+def binomial(n, k):
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return (result)
+
+
+def grid(n):
+    plan = grid_floorplan(n, n)
+    far = 'x%d_y%d' % (n - 1, n - 1)
+
+    def goal(t):
+        return ([['mail_at_x0_y0_%d' % t], ['~robot_carries_mail_%d' % t]])
+    return (Domain('delivery_grid_%d' % n,
+                   functools.partial(delivery.movement_axioms,
+                                     floorplan=plan),
+                   [['robot_at_x0_y0_0'], ['~robot_carries_mail_0'],
+                    ['mail_at_%s_0' % far]],
+                   goal, delivery.actions))
+
+
+def main():
+    print("%-10s %-10s %7s %8s %9s %8s %10s %10s" % (
+        'grid', 'solver', 'horizon', 'plans', 'expected', '[s]',
+        'first[KiB]', 'max[KiB]'))
+    for n, solvers in [(3, ['minisat22', None]), (4, ['minisat22', None]),
+                       (5, ['minisat22'])]:
+        expected = binomial(2 * (n - 1), n - 1) ** 2
+        for solver_name in solvers:
+            domain = grid(n)
+            domain.template
+            count = 0
+            first = plan = None
+            most = 0
+            tracemalloc.start()
+            start = time.perf_counter()
+            for plan in iter_plans(domain, 40, solver_name=solver_name):
+                count += 1
+                held = tracemalloc.get_traced_memory()[0]
+                if first is None:
+                    first = held
+                most = max(most, held)
+            elapsed = time.perf_counter() - start
+            tracemalloc.stop()
+            print("%-10s %-10s %7d %8d %9d %8.2f %10.0f %10.0f" % (
+                '%dx%d' % (n, n), solver_name or 'pycosat', len(plan),
+                count, expected, elapsed, first / 1024.0, most / 1024.0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Which ordering strategy solves the formulas of our domains fastest.
+
+For every domain the formulas of the two hardest horizons, the longest
+unsatisfiable one and the shortest satisfiable one, are solved by every
+strategy of the default portfolio on its own, and then by the race of
+all of them. The last table counts how often each strategy was
+fastest. On a machine with fewer CPUs than strategies the race shares
+the CPUs, so it cannot beat the fastest strategy alone there.
+"""
+
+from __future__ import print_function
+import time
+
+import delivery
+import river_crossing
+import wolf_goat_cabbage
+from fleet import fleet_delivery
+from planner import find_plan
+from portfolio import Portfolio, default_strategies
+
+
+def domains():
+    """Pairs (domain, horizons); None for the hardest two."""
+    robots = {'robot0': 'main_office', 'robot1': 'o107'}
+    parcels = {'mail0': ('r107', 'main_office'), 'mail1': ('r101', 'o105')}
+    yield (wolf_goat_cabbage.domain, None)
+    yield (delivery.domain, None)
+    yield (river_crossing.jealous_couples(6, 4).domain(), None)
+    yield (river_crossing.food_chain(40, 20).domain(), None)
+    yield (fleet_delivery(robots, parcels, semantics='forall').domain(),
+           None)
+    # The shortest sequential plan has 19 steps; searching for it takes
+    # a minute, so the horizons are given.
+    yield (fleet_delivery(robots, parcels, semantics='sequential').domain(),
+           [18, 19])
+
+
+def timed(f, *args):
+    start = time.perf_counter()
+    result = f(*args)
+    return (result, time.perf_counter() - start)
+
+
+def main(n=4, t_max=40):
+    strategies = default_strategies(n)
+    portfolio = Portfolio(strategies)
+    fastest = dict((s.name, 0) for s in strategies)
+    print("%-28s %4s %6s %s %10s %-10s" % (
+        'domain', 't', 'result',
+        ' '.join('%10s' % s.name for s in strategies), 'race', 'winner'))
+    for domain, horizons in domains():
+        if horizons is None:
+            t, _ = find_plan(domain, t_max)
+            horizons = [h for h in [t - 1, t] if h >= 0]
+        for h in horizons:
+            clauses = domain.horizon_clauses(h)
+            times = []
+            for s in strategies:
+                solution, elapsed = timed(s.solve, clauses)
+                times.append(elapsed)
+            best = min(range(len(strategies)), key=lambda i: times[i])
+            fastest[strategies[best].name] += 1
+            _, race = timed(portfolio.solve, clauses)
+            print("%-28s %4d %6s %s %10.3f %-10s" % (
+                domain.name, h, 'UNSAT' if solution == 'UNSAT' else 'SAT',
+                ' '.join('%10.3f' % x for x in times), race,
+                portfolio.winner))
+    print()
+    print("%-10s %8s %8s" % ('strategy', 'fastest', 'won race'))
+    for s in strategies:
+        print("%-10s %8d %8d" % (s.name, fastest[s.name],
+                                 portfolio.wins[s.name]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""How much preprocessing shrinks the formulas and what it saves.
+
+For the two hardest horizons of every domain the first table lists the
+clauses before and after preprocess(), the fraction removed, the time
+preprocessing took and the time pycosat needed for the original and
+the simplified formula. saved is the solving time of the original
+formula minus preprocessing and solving of the simplified one, so it
+is negative where preprocessing costs more than it saves. The second
+table times whole searches with find_plan(preprocess=...).
+"""
+
+from __future__ import print_function
+import time
+
+import pycosat
+
+import delivery
+import river_crossing
+import wolf_goat_cabbage
+from fleet import fleet_delivery
+from planner import find_plan
+from preprocess import preprocess
+
+
+def domains():
+    """Pairs (domain, horizons); None for the hardest two."""
+    robots = {'robot0': 'main_office', 'robot1': 'o107'}
+    parcels = {'mail0': ('r107', 'main_office'), 'mail1': ('r101', 'o105')}
+    yield (wolf_goat_cabbage.domain, None)
+    yield (delivery.domain, None)
+    yield (river_crossing.jealous_couples(6, 4).domain(), None)
+    yield (river_crossing.food_chain(40, 20).domain(), None)
+    yield (fleet_delivery(robots, parcels, semantics='forall').domain(),
+           None)
+    # The shortest sequential plan has 19 steps; searching for it takes
+    # a minute, so the horizons are given.
+    yield (fleet_delivery(robots, parcels, semantics='sequential').domain(),
+           [18, 19])
+
+
+def timed(f, *args, **kwargs):
+    start = time.perf_counter()
+    result = f(*args, **kwargs)
+    return (result, time.perf_counter() - start)
+
+
+def satisfies(clauses, model):
+    true = set(model)
+    return (all(any(l in true for l in c) for c in clauses))
+
+
+def main(t_max=40):
+    print("%-24s %4s %6s %8s %8s %8s %8s %9s %9s %8s" % (
+        'domain', 't', 'result', 'clauses', 'after', 'removed', 'pre [s]',
+        'solve [s]', 'after [s]', 'saved'))
+    searches = []
+    for domain, horizons in domains():
+        if horizons is None:
+            t, _ = find_plan(domain, t_max)
+            horizons = [h for h in [t - 1, t] if h >= 0]
+            searches.append(domain)
+        for h in horizons:
+            clauses = domain.horizon_clauses(h)
+            solution, original = timed(pycosat.solve, clauses)
+            simplified = preprocess(clauses)
+            extended, after = timed(simplified.solve)
+            if (extended == 'UNSAT') != (solution == 'UNSAT'):
+                raise AssertionError("preprocessing changed the result")
+            if extended != 'UNSAT' and not satisfies(clauses, extended):
+                raise AssertionError("extended model is wrong")
+            print("%-24s %4d %6s %8d %8d %7.0f%% %8.3f %9.3f %9.3f %8.3f" % (
+                domain.name, h, 'UNSAT' if solution == 'UNSAT' else 'SAT',
+                len(clauses), len(simplified.clauses),
+                100 * simplified.reduction, simplified.time, original, after,
+                original - simplified.time - after))
+    print()
+    print("%-24s %10s %10s" % ('find_plan (exponential)', 'plain [s]',
+                               'preprocess'))
+    for domain in searches:
+        plain, a = timed(find_plan, domain, t_max, strategy='exponential')
+        simplified, b = timed(find_plan, domain, t_max,
+                              strategy='exponential', preprocess=True)
+        if plain[0] != simplified[0]:
+            raise AssertionError("different horizons")
+        print("%-24s %10.3f %10.3f" % (domain.name, a, b))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Reachability pruning on large generated floorplans.
+
+Delivery on corridor floorplans, with the mail in the last room, and
+fleets of robots on grid floorplans, with parcels on random routes.
+For every instance the table lists the lower bound of the horizon from
+the reachability analysis, the shortest horizon, the time of the
+analysis, the clauses of the formula of the shortest horizon with and
+without pruning and the time of the search without and with it, for
+incremental linear search and from-scratch search.
+"""
+
+from __future__ import print_function
+import functools
+import time
+
+import delivery
+from fleet import fleet_delivery, grid_floorplan, random_instance
+from planner import find_plan
+
+
+def grid(width, height, k, p, seed=0):
+    floorplan = grid_floorplan(width, height)
+    robots, parcels = random_instance(floorplan, k, p, seed)
+    problem = fleet_delivery(robots, parcels, floorplan, semantics='exists')
+    return (lambda reachable: problem.domain(reachable))
+
+
+def instances():
+    for n in [8, 16, 32]:
+        yield ('corridor %d' % n,
+               functools.partial(delivery.corridor_domain, n))
+    for (w, h, k, p) in [(4, 4, 2, 2), (6, 6, 2, 3), (8, 8, 3, 3)]:
+        yield ('grid %dx%d, %d robots, %d parcels' % (w, h, k, p),
+               grid(w, h, k, p))
+
+
+def timed(f, *args, **kwargs):
+    start = time.perf_counter()
+    result = f(*args, **kwargs)
+    return (result, time.perf_counter() - start)
+
+
+def main(t_max=200):
+    modes = [('incremental', dict()), ('scratch', dict(incremental=False))]
+    print("%-32s %5s %7s %9s %8s %8s" % (
+        'instance', 'bound', 'horizon', 'reach [s]', 'clauses', 'pruned')
+        + ''.join('%13s %9s' % (m, 'pruned') for m, _ in modes) + '  [s]')
+    for name, build in instances():
+        plain = build(False)
+        pruned, analysis = timed(build, True)
+        bound = pruned.lower_bound()
+        row = []
+        t = None
+        for _, options in modes:
+            (t0, _), a = timed(find_plan, plain, t_max, **options)
+            (t1, _), b = timed(find_plan, pruned, t_max, **options)
+            if t0 != t1:
+                raise AssertionError("pruning changed the horizon")
+            t = t0
+            row += [a, b]
+        print("%-32s %5d %7d %9.3f %8d %8d" % (
+            name, bound, t, analysis, len(plain.horizon_clauses(t)),
+            len(pruned.horizon_clauses(t)))
+            + ''.join('%13.3f %9.3f' % (row[i], row[i + 1])
+                      for i in range(0, len(row), 2)))
+
+
+if __name__ == "__main__":
+    main()
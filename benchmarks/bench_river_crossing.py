@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Factored river crossing puzzles of growing size.
+
+Lists the clauses and atoms of one time step of the factored encoding,
+the number of states an explicit transition table would need, the
+length of the shortest plan and the time to find it.
+"""
+
+from __future__ import print_function
+import time
+
+import river_crossing
+from planner import find_plan
+
+
+def main(t_max=40):
+    puzzles = [river_crossing.wolf_goat_cabbage()]
+    puzzles += [river_crossing.food_chain(n, k)
+                for (n, k) in ((5, 2), (10, 5), (20, 10), (40, 20),
+                               (80, 40))]
+    puzzles += [river_crossing.jealous_couples(n, k)
+                for (n, k) in ((2, 2), (3, 2), (4, 3), (8, 5))]
+    print("%-24s %8s %8s %10s %8s %10s" % (
+        'puzzle', 'clauses', 'atoms', 'states', 'horizon', 'solve [s]'))
+    for p in puzzles:
+        domain = p.domain()
+        template = domain.template
+        start = time.perf_counter()
+        t, _ = find_plan(domain, t_max)
+        elapsed = time.perf_counter() - start
+        print("%-24s %8d %8d %10s %8s %10.3f" % (
+            p.name, len(template.clauses), template.width,
+            '2^%d' % (len(p.items) + 1), t, elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Latency and throughput of the planning server.
+
+A cold query starts a new interpreter for every query, as running the
+scripts does (python main.py plan ...). The warm queries go to one
+server process over stdin/stdout or a Unix socket, which keeps the
+domains compiled and the circuits loaded. For every workload the table
+lists the latency percentiles of requests sent one after another and
+the throughput; the pipelined rows send all requests before reading
+the first response.
+"""
+
+from __future__ import print_function
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import home_wiring
+from server import Client
+
+rooms = ['main_office', 'mail_drop', 'ts', 'o101', 'o103', 'o105', 'o107',
+         'r101', 'r103', 'r105', 'r107']
+
+
+def workloads(count, seed=0):
+    """Pairs (name, list of requests)."""
+    rnd = random.Random(seed)
+    queries = [dict(op='plan', domain='delivery', t_max=30,
+                    params=dict(mail_at=rnd.choice(rooms),
+                                target=rnd.choice(rooms)))
+               for _ in range(count)]
+    dark = [rnd.sample(range(50), rnd.randint(0, 2)) for _ in range(count)]
+    return ([('ping', [dict(op='ping')] * count),
+             ('plan delivery', [dict(op='plan', domain='delivery')] * count),
+             ('plan delivery queries', queries),
+             ('diagnose home_wiring',
+              [dict(op='diagnose', circuit='home_wiring')] * count),
+             ('diagnose 50 lamps',
+              [dict(op='diagnose', circuit='scaled_wiring',
+                    params=dict(lamps=50), max_size=2,
+                    observations=home_wiring.scaled_circuit(50,
+                                                            dark=d)[2])
+               for d in dark])])
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return (values[min(len(values) - 1, int(p * len(values)))])
+
+
+def sequential(client, requests):
+    latencies = []
+    start = time.perf_counter()
+    for r in requests:
+        before = time.perf_counter()
+        response = client.request(**r)
+        latencies.append(time.perf_counter() - before)
+        if not response['ok']:
+            raise AssertionError(response['error'])
+    return (latencies, time.perf_counter() - start)
+
+
+def pipelined(client, requests):
+    start = time.perf_counter()
+    for r in requests:
+        client.send(r)
+    for r in requests:
+        if not client.receive()['ok']:
+            raise AssertionError("request failed")
+    return (None, time.perf_counter() - start)
+
+
+def report(name, mode, requests, latencies, elapsed):
+    if latencies is None:
+        columns = ('-', '-', '-', '-')
+    else:
+        columns = tuple('%.2f' % (1000 * v) for v in (
+            percentile(latencies, 0.5), percentile(latencies, 0.9),
+            percentile(latencies, 0.99), max(latencies)))
+    print("%-24s %-10s %6d %8s %8s %8s %8s %9.0f" % (
+        (name, mode, len(requests)) + columns
+        + (len(requests) / elapsed,)))
+
+
+def cold(runs):
+    main = os.path.join(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))), 'main.py')
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, main, 'plan', 'delivery'],
+                              stdout=subprocess.DEVNULL)
+        latencies.append(time.perf_counter() - start)
+    return (latencies, sum(latencies))
+
+
+def main(count=200, runs=5):
+    print("%-24s %-10s %6s %8s %8s %8s %8s %9s" % (
+        'workload', 'mode', 'reqs', 'p50[ms]', 'p90[ms]', 'p99[ms]',
+        'max[ms]', 'reqs/s'))
+    report('plan delivery', 'cold', [None] * runs, *cold(runs))
+    loads = workloads(count)
+    with Client() as client:
+        # Wait for the server to start
+        client.request('ping')
+        for name, requests in loads:
+            report(name, 'stdio', requests, *sequential(client, requests))
+        for name, requests in loads:
+            report(name, 'pipelined', requests, *pipelined(client, requests))
+    path = os.path.join(tempfile.mkdtemp(), 'planner.sock')
+    server = subprocess.Popen([sys.executable, '-m', 'server', '--socket',
+                               path])
+    try:
+        while not os.path.exists(path):
+            time.sleep(0.01)
+        with Client(path) as client:
+            for name, requests in loads:
+                report(name, 'socket', requests,
+                       *sequential(client, requests))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Throughput of DiagnosisService on streams of observation sets.
+
+The stream draws observation vectors of a scaled wiring circuit from a
+pool of distinct vectors, so the cache sees repeats once the stream is
+longer than the pool.
+"""
+
+from __future__ import print_function
+import os
+import random
+import time
+
+import home_wiring
+from diagnosis import DiagnosisService
+
+
+def observation_stream(n_lamps, count, distinct, seed=0):
+    rnd = random.Random(seed)
+    vectors = []
+    for _ in range(distinct):
+        dark = rnd.sample(range(n_lamps), rnd.randint(0, 2))
+        vectors.append(home_wiring.scaled_circuit(n_lamps, dark=dark)[2])
+    return ([rnd.choice(vectors) for _ in range(count)])
+
+
+def main(n_lamps=50, count=20000, distinct=2000):
+    axioms, components, _ = home_wiring.scaled_circuit(n_lamps)
+    stream = observation_stream(n_lamps, count, distinct)
+    cpus = os.cpu_count() or 1
+    print("%d lamps, %d observation sets, %d distinct" % (
+        n_lamps, count, distinct))
+    print("%-24s %10s %10s %12s" % ('mode', 'time [s]', 'sets/s', 'cache hits'))
+    for name, options in [('1 process, no cache', dict(cache_size=0)),
+                          ('1 process, cache', dict()),
+                          ('%d processes, cache' % cpus,
+                           dict(processes=cpus))]:
+        with DiagnosisService(axioms, components, **options) as service:
+            start = time.perf_counter()
+            for _ in service.diagnose_many(stream):
+                pass
+            elapsed = time.perf_counter() - start
+        print("%-24s %10.3f %10.0f %12d" % (name, elapsed, count / elapsed,
+                                           service.hits))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Cost of producing one time slice of integer movement axioms.
+
+'strings' formats the axioms with movement_axioms(t) and converts them
+with an AtomTable, 'template' shifts the compiled SliceTemplate.
+"""
+
+from __future__ import print_function
+import time
+
+import delivery
+import wolf_goat_cabbage
+from atoms import AtomTable
+from template import SliceTemplate, numpy
+
+
+def per_slice(f, horizon):
+    start = time.perf_counter()
+    for t in range(horizon):
+        f(t)
+    return ((time.perf_counter() - start) / horizon)
+
+
+def main(horizon=500):
+    print("numpy: %s" % ('yes' if numpy is not None else 'no'))
+    print("%-20s %8s %16s %16s %8s" % ('domain', 'clauses', 'strings [us]',
+                                       'template [us]', 'speedup'))
+    for name, module in [('delivery', delivery),
+                         ('wolf_goat_cabbage', wolf_goat_cabbage)]:
+        atoms = AtomTable()
+        template = SliceTemplate(module.movement_axioms)
+        strings = per_slice(
+            lambda t: atoms.to_numbers(module.movement_axioms(t)), horizon)
+        compiled = per_slice(template.instantiate, horizon)
+        print("%-20s %8d %16.1f %16.1f %7.1fx" % (
+            name, len(template.clauses), strings * 1e6, compiled * 1e6,
+            strings / compiled))
+
+
+if __name__ == "__main__":
+    main()
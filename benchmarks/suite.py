@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Reproducible benchmark suite of encoding and solving.
+
+Three families of instances grow with a size parameter:
+
+    river   river_crossing.free_items(n): n items, one per crossing
+    grid    delivery on fleet.grid_floorplan(n, n): the robot starts
+            in room x0_y0 and fetches the mail from the far corner
+    wiring  home_wiring.scaled_circuit(n): n lamps, all minimal
+            diagnoses of two dark ones
+
+Plans are searched from scratch, which keeps generating the axioms
+(encode) and converting them to integers (convert) apart. The time of
+every phase (see metrics.py) is summed over the horizons of a run; of
+repeat runs the fastest one is kept. One more run measures the peak of
+memory allocated by Python, with tracemalloc. Nothing is random, so the
+same version yields the same formulas, horizons and diagnoses.
+
+The results are written as one JSON document, which compare() checks
+against a baseline:
+
+    python -m benchmarks.suite --output new.json [--compare base.json]
+    python -m benchmarks.suite --diff base.json new.json
+
+Options: --repeat N, --family NAME (repeatable), --label TEXT and
+--threshold RATIO (default 1.25). A phase or the memory regresses if
+it grows by more than the threshold, phases faster than min_seconds
+in the baseline excepted, and the result regresses if it changes. The
+exit status is 1 if anything regressed.
+"""
+
+from __future__ import print_function
+import json
+import platform
+import sys
+import tracemalloc
+
+import delivery
+import home_wiring
+import river_crossing
+from diagnosis import Circuit
+from fleet import grid_floorplan
+from metrics import Recorder
+from planner import Solver, find_plan
+
+# Version of the format of the results
+format_version = 1
+
+phases = ['encode', 'convert', 'preprocess', 'solve', 'refine', 'decode']
+
+# Phases faster than this in the baseline are too noisy to compare
+min_seconds = 0.005
+
+
+def river(n, recorder):
+    domain = river_crossing.free_items(n).domain()
+    find_plan(domain, 2 * n + 1, incremental=False, recorder=recorder)
+
+
+def grid(n, recorder):
+    domain = delivery.query('x%d_y%d' % (n - 1, n - 1), 'x0_y0',
+                            grid_floorplan(n, n), robot_at='x0_y0',
+                            reachable=False)
+    find_plan(domain, 4 * n + 2, incremental=False, recorder=recorder)
+
+
+def wiring(n, recorder):
+    recorder.start('wiring', step='diagnoses')
+    with recorder.phase('encode'):
+        axioms, components, observations = home_wiring.scaled_circuit(n)
+    with recorder.phase('convert'):
+        circuit = Circuit(axioms, components)
+    try:
+        with recorder.phase('solve'):
+            diagnoses = list(circuit.diagnoses(observations))
+        with recorder.phase('decode'):
+            # The health of every component, as home_wiring prints it
+            decoded = [['~' + c if c in d else c for c in components]
+                       for d in diagnoses]
+    finally:
+        circuit.close()
+    recorder.finish(clauses=len(axioms), variables=len(circuit.atoms),
+                    diagnoses=len(decoded))
+    recorder.flush()
+
+
+# Family name, run(size, recorder) and the sizes
+families = [('river', river, (4, 6, 8, 10)),
+            ('grid', grid, (3, 4, 6, 8)),
+            ('wiring', wiring, (100, 400, 1600))]
+
+
+def measure(family, run, n, repeat=3):
+    """Result of size n of a family: the fastest of repeat runs and the
+    peak memory of one more."""
+    best = None
+    for _ in range(repeat):
+        recorder = Recorder()
+        with recorder:
+            run(n, recorder)
+        times = dict((p, 0.0) for p in phases)
+        for r in recorder.records:
+            for p, seconds in r['time'].items():
+                times[p] = times.get(p, 0.0) + seconds
+        if best is None or sum(times.values()) < sum(best[0].values()):
+            best = (times, recorder.records)
+    times, records = best
+    tracemalloc.start()
+    try:
+        run(n, Recorder(enabled=False))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    last = records[-1]
+    result = dict(name='%s_%d' % (family, n), family=family, size=n,
+                  time=times, total=sum(times.values()), peak_memory=peak,
+                  clauses=max(r.get('clauses', 0) for r in records),
+                  variables=max(r.get('variables', 0) for r in records))
+    if 'diagnoses' in last:
+        result['result'] = 'diagnoses %d' % last['diagnoses']
+    elif last.get('result') == 'SAT':
+        result['result'] = 'horizon %d' % last['t']
+    else:
+        result['result'] = 'UNSAT'
+    return (result)
+
+
+def run_suite(names=None, repeat=3, label=None, log=None):
+    """Results of the families named (default: all) as a JSON value."""
+    results = []
+    for family, run, sizes in families:
+        if names and family not in names:
+            continue
+        for n in sizes:
+            result = measure(family, run, n, repeat)
+            if log is not None:
+                log(result)
+            results.append(result)
+    return (dict(format=format_version, label=label,
+                 python=platform.python_version(),
+                 implementation=platform.python_implementation(),
+                 machine=platform.machine(),
+                 solver='pysat' if Solver is not None else 'pycosat',
+                 repeat=repeat, results=results))
+
+
+def compare(base, new, threshold=1.25):
+    """Regressions of the results new against base, as lines of text.
+
+    Only instances present in both are compared.
+    """
+    if base.get('format') != new.get('format'):
+        return (["formats differ: %r and %r" % (base.get('format'),
+                                               new.get('format'))])
+    old = dict((r['name'], r) for r in base['results'])
+    regressions = []
+    for r in new['results']:
+        b = old.get(r['name'])
+        if b is None:
+            continue
+        if r['result'] != b['result']:
+            regressions.append("%s: %s, was %s" % (r['name'], r['result'],
+                                                   b['result']))
+        for p in phases:
+            before = b['time'].get(p, 0.0)
+            after = r['time'].get(p, 0.0)
+            if before >= min_seconds and after > threshold * before:
+                regressions.append("%s: %s %.3f s, was %.3f s (%.2fx)" % (
+                    r['name'], p, after, before, after / before))
+        if r['peak_memory'] > threshold * b['peak_memory']:
+            regressions.append("%s: peak memory %d, was %d (%.2fx)" % (
+                r['name'], r['peak_memory'], b['peak_memory'],
+                r['peak_memory'] / float(b['peak_memory'])))
+    return (regressions)
+
+
+def print_result(r):
+    print("%-12s %10s %8d %8d"
+          % (r['name'], r['result'].replace('horizon', 't'), r['clauses'],
+             r['variables'])
+          + ''.join('%9.3f' % r['time'][p]
+                    for p in ['encode', 'convert', 'solve', 'decode'])
+          + '%10.1f' % (r['peak_memory'] / 1e6))
+    sys.stdout.flush()
+
+
+def load(path):
+    with open(path) as f:
+        return (json.load(f))
+
+
+def report(regressions):
+    for line in regressions:
+        print("regression: %s" % line)
+    if regressions:
+        raise SystemExit(1)
+    print("no regressions")
+
+
+def main(argv):
+    output = base = label = diff = None
+    names = []
+    repeat = 3
+    threshold = 1.25
+    args = list(argv)
+    while args:
+        a = args.pop(0)
+        if a == '--diff' and len(args) >= 2:
+            diff = (args.pop(0), args.pop(0))
+        elif a == '--output' and args:
+            output = args.pop(0)
+        elif a == '--compare' and args:
+            base = args.pop(0)
+        elif a == '--label' and args:
+            label = args.pop(0)
+        elif a == '--family' and args:
+            names.append(args.pop(0))
+        elif a == '--repeat' and args:
+            repeat = int(args.pop(0))
+        elif a == '--threshold' and args:
+            threshold = float(args.pop(0))
+        else:
+            raise SystemExit("unknown option %r; use --output FILE, "
+                             "--compare FILE, --diff OLD NEW, --label TEXT, "
+                             "--family NAME, --repeat N or --threshold "
+                             "RATIO" % a)
+    if diff is not None:
+        report(compare(load(diff[0]), load(diff[1]), threshold))
+        return
+    print("%-12s %10s %8s %8s" % ('instance', 'result', 'clauses', 'vars')
+          + ''.join('%9s' % p for p in ['encode', 'convert', 'solve',
+                                        'decode'])
+          + '%10s' % 'peak [MB]')
+    results = run_suite(names, repeat, label, print_result)
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+            f.write('\n')
+    if base is not None:
+        report(compare(load(base), results, threshold))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
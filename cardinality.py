@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""CNF encodings of at-most-one and exactly-one constraints.
+
+Literals may be given as strings (negated with the prefix '~') or as
+integers. Encodings other than pairwise introduce auxiliary atoms; the
+caller names them with a function aux(i) that returns the i-th
+auxiliary atom, e.g.
+
+    at_most_one(['robot_at_%s_%d' % (l, t) for l in locations],
+                lambda i: 'only_one_robot_aux%d_%d' % (i, t))
+
+Available encodings (n literals):
+
+    pairwise    n(n-1)/2 clauses, no auxiliary atoms
+    sequential  3n-4 clauses, n-1 auxiliary atoms (Sinz' ladder)
+    commander   about 3n clauses, about n/2 auxiliary atoms
+                (Klieber and Kwon, groups of three)
+    binary      n*log2(n) clauses, log2(n) auxiliary atoms (Frisch)
+    auto        pairwise for small n, sequential otherwise
+
+at_most(k, ...) generalizes at_most_one to k literals with Sinz'
+sequential counter (about 2nk clauses and nk auxiliary atoms).
+
+counter(...) counts literals in unary in both directions, for
+constraints that compare two counts (a totalizer with about n log n
+auxiliary atoms and n^2 clauses in the worst case).
+
+Totalizer counts weighted literals in unary (Bailleux and Boufkhad)
+and grows as literals are added, so a solver keeping its clauses can
+be asked for ever smaller bounds by assumptions alone.
+"""
+
+encodings = ['pairwise', 'sequential', 'commander', 'binary', 'auto']
+
+# Up to this many literals, 'auto' uses the pairwise encoding.
+pairwise_limit = 6
+
+
+def neg(l):
+    """Negate a literal in string or integer representation."""
+    if isinstance(l, int):
+        return (-l)
+    if (l[0] == '~'):
+        return (l[1:])
+    return ('~' + l)
+
+
+def choose_encoding(n, encoding='auto'):
+    if encoding not in encodings:
+        raise ValueError("unknown encoding %r" % encoding)
+    if encoding == 'auto':
+        return ('pairwise' if n <= pairwise_limit else 'sequential')
+    return (encoding)
+
+
+def at_most_one(literals, aux=None, encoding='auto'):
+    """Clauses that allow at most one of literals to be true."""
+    literals = list(literals)
+    if aux is None and encoding == 'auto':
+        encoding = 'pairwise'
+    encoding = choose_encoding(len(literals), encoding)
+    if len(literals) <= 1:
+        return ([])
+    if encoding == 'pairwise':
+        return (_pairwise(literals))
+    if aux is None:
+        raise ValueError("encoding %r needs auxiliary atoms" % encoding)
+    counter = [0]
+
+    def fresh():
+        counter[0] += 1
+        return (aux(counter[0] - 1))
+    if encoding == 'sequential':
+        return (_sequential(literals, fresh))
+    if encoding == 'commander':
+        return (_commander(literals, fresh))
+    return (_binary(literals, fresh))
+
+
+def exactly_one(literals, aux=None, encoding='auto'):
+    """Clauses that make exactly one of literals true."""
+    literals = list(literals)
+    return ([literals] + at_most_one(literals, aux, encoding))
+
+
+def at_most(k, literals, aux=None, encoding='auto'):
+    """Clauses that allow at most k of literals to be true.
+
+    For k = 1 this is at_most_one with the given encoding; larger k
+    always use the sequential counter.
+    """
+    literals = list(literals)
+    if k < 0:
+        raise ValueError("negative bound %d" % k)
+    if k == 0:
+        return ([[neg(l)] for l in literals])
+    if k >= len(literals):
+        return ([])
+    if k == 1:
+        return (at_most_one(literals, aux, encoding))
+    if aux is None:
+        raise ValueError("at_most(%d, ...) needs auxiliary atoms" % k)
+    counter = [0]
+
+    def fresh():
+        counter[0] += 1
+        return (aux(counter[0] - 1))
+    return (_sequential_k(literals, k, fresh))
+
+
+def counter(literals, aux):
+    """Unary count of literals: returns the pair (outputs, clauses).
+
+    outputs[j - 1] is true exactly if at least j of literals are; unlike
+    Totalizer, both directions are encoded.
+    """
+    literals = list(literals)
+    clauses = []
+    used = [0]
+
+    def fresh():
+        used[0] += 1
+        return (aux(used[0] - 1))
+
+    def count(x):
+        if len(x) == 1:
+            return (x)
+        a = count(x[:len(x) // 2])
+        b = count(x[len(x) // 2:])
+        r = [fresh() for _ in range(len(a) + len(b))]
+        for i in range(len(a) + 1):
+            for j in range(len(b) + 1):
+                # i of a and j of b make at least i + j
+                if i + j > 0:
+                    clauses.append([r[i + j - 1]]
+                                   + ([neg(a[i - 1])] if i > 0 else [])
+                                   + ([neg(b[j - 1])] if j > 0 else []))
+                # at least i + j + 1 need more than i of a or j of b
+                if i + j < len(r):
+                    clauses.append([neg(r[i + j])]
+                                   + ([a[i]] if i < len(a) else [])
+                                   + ([b[j]] if j < len(b) else []))
+        return (r)
+    if not literals:
+        return ([], [])
+    return (count(literals), clauses)
+
+
+class Totalizer(object):
+    """Unary counter of the weight of the true literals, truncated at cap.
+
+    extend(weighted) adds pairs (weight, literal) and returns the new
+    clauses: they merge a balanced tree of the new literals into the
+    count so far. outputs[j - 1] is forced to be true if the weight is
+    at least j, for j up to cap; only this direction is encoded, which
+    is all bounds from above need. exceeds(k) is the output literal of
+    weight above k: assuming its negation bounds the weight by k.
+    """
+
+    def __init__(self, cap, aux):
+        if cap < 1:
+            raise ValueError("cap must be positive, not %d" % cap)
+        self.cap = cap
+        self.aux = aux
+        self.outputs = []
+        self.used = 0
+
+    def fresh(self):
+        self.used += 1
+        return (self.aux(self.used - 1))
+
+    def extend(self, weighted):
+        """Clauses adding the pairs (weight, literal) to the count."""
+        leaves = [[l] * min(w, self.cap) for (w, l) in weighted if w > 0]
+        if not leaves:
+            return ([])
+        clauses = []
+        while len(leaves) > 1:
+            merged = []
+            for i in range(0, len(leaves) - 1, 2):
+                merged.append(self._merge(leaves[i], leaves[i + 1], clauses))
+            if len(leaves) % 2:
+                merged.append(leaves[-1])
+            leaves = merged
+        if self.outputs:
+            self.outputs = self._merge(self.outputs, leaves[0], clauses)
+        else:
+            self.outputs = self._fresh_copy(leaves[0], clauses)
+        return (clauses)
+
+    def exceeds(self, k):
+        """Literal that is true if the weight is above k, None if the
+        weight cannot be above k."""
+        if k >= self.cap:
+            raise ValueError("bound %d not below cap %d" % (k, self.cap))
+        if k >= len(self.outputs):
+            return (None)
+        return (self.outputs[k])
+
+    def _fresh_copy(self, a, clauses):
+        # Outputs of its own, so the leaves may repeat a literal
+        r = [self.fresh() for _ in a]
+        clauses += [[neg(a[i]), r[i]] for i in range(len(a))]
+        return (r)
+
+    def _merge(self, a, b, clauses):
+        r = [self.fresh() for _ in range(min(len(a) + len(b), self.cap))]
+        for i in range(len(a) + 1):
+            for j in range(len(b) + 1):
+                if i + j == 0:
+                    continue
+                clause = [r[min(i + j, self.cap) - 1]]
+                if i > 0:
+                    clause.append(neg(a[i - 1]))
+                if j > 0:
+                    clause.append(neg(b[j - 1]))
+                clauses.append(clause)
+        return (r)
+
+
+def _pairwise(x):
+    clauses = []
+    for i in range(len(x)):
+        for j in range(i + 1, len(x)):
+            clauses.append([neg(x[i]), neg(x[j])])
+    return (clauses)
+
+
+def _sequential(x, fresh):
+    # s_i: one of x_0 ... x_i is true
+    n = len(x)
+    s = [fresh() for _ in range(n - 1)]
+    clauses = [[neg(x[0]), s[0]]]
+    for i in range(1, n - 1):
+        clauses += [[neg(x[i]), s[i]],
+                    [neg(s[i - 1]), s[i]],
+                    [neg(x[i]), neg(s[i - 1])]]
+    clauses.append([neg(x[n - 1]), neg(s[n - 2])])
+    return (clauses)
+
+
+def _sequential_k(x, k, fresh):
+    # s[i][j]: more than j of x_0 ... x_i are true
+    n = len(x)
+    s = [[fresh() for _ in range(k)] for _ in range(n - 1)]
+    clauses = [[neg(x[0]), s[0][0]]]
+    clauses += [[neg(s[0][j])] for j in range(1, k)]
+    for i in range(1, n - 1):
+        clauses += [[neg(x[i]), s[i][0]],
+                    [neg(s[i - 1][0]), s[i][0]]]
+        for j in range(1, k):
+            clauses += [[neg(x[i]), neg(s[i - 1][j - 1]), s[i][j]],
+                        [neg(s[i - 1][j]), s[i][j]]]
+        clauses.append([neg(x[i]), neg(s[i - 1][k - 1])])
+    clauses.append([neg(x[n - 1]), neg(s[n - 2][k - 1])])
+    return (clauses)
+
+
+def _commander(x, fresh, group_size=3):
+    if len(x) <= group_size + 1:
+        return (_pairwise(x))
+    clauses = []
+    commanders = []
+    for g in range(0, len(x), group_size):
+        group = x[g:g + group_size]
+        if len(group) == 1:
+            commanders.append(group[0])
+            continue
+        c = fresh()
+        commanders.append(c)
+        # Every literal of the group implies its commander ...
+        clauses += [[neg(l), c] for l in group]
+        # ... and at most one literal of the group is true
+        clauses += _pairwise(group)
+    return (clauses + _commander(commanders, fresh, group_size))
+
+
+def _binary(x, fresh):
+    bits = max(1, (len(x) - 1).bit_length())
+    b = [fresh() for _ in range(bits)]
+    clauses = []
+    for i, l in enumerate(x):
+        # x_i implies that the bits spell out i
+        for j in range(bits):
+            clauses.append([neg(l), b[j] if (i >> j) & 1 else neg(b[j])])
+    return (clauses)
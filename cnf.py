@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compact storage of integer CNF formulas.
+
+A list of clauses costs a list object per clause and an int object per
+literal, several times the four bytes a literal needs. CNF keeps all
+literals in one flat array('i') and the end of every clause in a
+second array. Iterating over a CNF yields memoryview slices of the
+literal array, which pycosat reads like lists of ints, so a formula is
+handed to the solver without building a single list:
+
+    pycosat.solve(cnf)
+
+mark() starts a new part of the formula, e.g. the clauses of a time
+step, and part(k) returns the clauses of part k. With NumPy installed,
+as_numpy() returns both arrays as NumPy views without copying them.
+
+While a memoryview or NumPy view of a CNF is alive, its arrays cannot
+grow; iterate over a formula to the end (or close the iterator) before
+appending.
+"""
+
+from array import array
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class CNF(object):
+    """Clauses of integer literals in two flat arrays.
+
+    literals holds the literals of all clauses, ends[i] the position
+    after the last literal of clause i and marks the indices of the
+    first clauses of the parts.
+    """
+
+    def __init__(self, clauses=()):
+        self.literals = array('i')
+        self.ends = array('q')
+        self.marks = [0]
+        self.extend(clauses)
+
+    @classmethod
+    def from_names(cls, clauses, atoms):
+        """Formula of clauses over atom names, numbered by atoms (an
+        AtomTable or SliceTemplate)."""
+        cnf = cls()
+        cnf.extend_names(clauses, atoms)
+        return (cnf)
+
+    def __len__(self):
+        return (len(self.ends))
+
+    def __iter__(self):
+        with memoryview(self.literals) as view:
+            start = 0
+            for end in self.ends:
+                yield (view[start:end])
+                start = end
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                raise ValueError("clauses can only be sliced in order")
+            return (self._range(start, max(start, stop)))
+        if i < 0:
+            i += len(self)
+        start = self.ends[i - 1] if i > 0 else 0
+        return (self.literals[start:self.ends[i]].tolist())
+
+    def _range(self, start, stop):
+        result = CNF()
+        if start == stop:
+            return (result)
+        first = self.ends[start - 1] if start > 0 else 0
+        result.literals = self.literals[first:self.ends[stop - 1]]
+        result.ends = array('q', [e - first for e in self.ends[start:stop]])
+        return (result)
+
+    def append(self, clause):
+        self.literals.extend(clause)
+        self.ends.append(len(self.literals))
+
+    def extend(self, clauses):
+        """Append clauses, a CNF or any iterable of clauses."""
+        if isinstance(clauses, CNF):
+            base = len(self.literals)
+            self.literals.extend(clauses.literals)
+            self.ends.extend(e + base for e in clauses.ends)
+            return
+        literals = self.literals
+        ends = self.ends
+        for c in clauses:
+            literals.extend(c)
+            ends.append(len(literals))
+
+    def extend_names(self, clauses, atoms):
+        """Append clauses over atom names, numbered by atoms."""
+        literals = self.literals
+        ends = self.ends
+        s2n = atoms.s2n
+        for c in clauses:
+            for s in c:
+                literals.append(s2n(s))
+            ends.append(len(literals))
+
+    def extend_flat(self, literals, ends):
+        """Append clauses given as one flat sequence of literals and the
+        ends of the clauses in it, e.g. NumPy arrays."""
+        base = len(self.literals)
+        if numpy is not None and isinstance(literals, numpy.ndarray):
+            self.literals.frombytes(literals.astype(numpy.int32).tobytes())
+            self.ends.frombytes((numpy.asarray(ends, dtype=numpy.int64)
+                                 + base).tobytes())
+            return
+        self.literals.extend(literals)
+        self.ends.extend(e + base for e in ends)
+
+    def copy(self):
+        result = CNF()
+        result.literals = array('i', self.literals)
+        result.ends = array('q', self.ends)
+        result.marks = list(self.marks)
+        return (result)
+
+    def mark(self):
+        """Start a new part with the next clause; returns its number."""
+        self.marks.append(len(self))
+        return (len(self.marks) - 1)
+
+    def part(self, k):
+        """The clauses of part k as a CNF."""
+        stop = self.marks[k + 1] if k + 1 < len(self.marks) else len(self)
+        return (self._range(self.marks[k], stop))
+
+    def simplified(self, assumptions):
+        """The formula with the literals assumptions true: satisfied
+        clauses and falsified literals are left out. Returns None if a
+        clause is falsified."""
+        if numpy is None or not self.literals:
+            return (self._simplified(assumptions))
+        literals, ends = self.as_numpy()
+        n = max(self.variables(), max([abs(l) for l in assumptions] or [0]))
+        value = numpy.zeros(n + 1, dtype=numpy.int8)
+        fixed = numpy.array(assumptions, dtype=numpy.int64)
+        value[numpy.abs(fixed)] = numpy.sign(fixed)
+        # 1: literal true, -1: false, 0: open
+        state = value[numpy.abs(literals)] * numpy.sign(literals)
+        lengths = numpy.diff(ends, prepend=0)
+        clause = numpy.repeat(numpy.arange(len(ends)), lengths)
+        satisfied = numpy.zeros(len(ends), dtype=bool)
+        satisfied[clause[state == 1]] = True
+        keep = ~satisfied
+        open_literals = keep[clause] & (state == 0)
+        remaining = numpy.bincount(clause[open_literals],
+                                   minlength=len(ends))[keep]
+        if (remaining == 0).any():
+            return (None)
+        result = CNF()
+        result.literals = array('i', literals[open_literals].tobytes())
+        result.ends = array('q', numpy.cumsum(remaining).tobytes())
+        before = numpy.concatenate(([0], numpy.cumsum(keep)))
+        result.marks = [int(before[m]) for m in self.marks]
+        return (result)
+
+    def _simplified(self, assumptions):
+        true = set(assumptions)
+        result = CNF()
+        for k in range(len(self.marks)):
+            if k > 0:
+                result.mark()
+            for c in self.part(k):
+                reduced = []
+                for l in c:
+                    if l in true:
+                        break
+                    if -l not in true:
+                        reduced.append(l)
+                else:
+                    if not reduced:
+                        return (None)
+                    result.append(reduced)
+        return (result)
+
+    def variables(self):
+        """The largest variable of the formula."""
+        if not self.literals:
+            return (0)
+        return (max(max(self.literals), -min(self.literals)))
+
+    @property
+    def nbytes(self):
+        """Bytes taken by the formula, arrays and their buffers."""
+        return (sys.getsizeof(self) + sys.getsizeof(self.literals)
+                + sys.getsizeof(self.ends) + sys.getsizeof(self.marks))
+
+    def as_numpy(self):
+        """The literal and end arrays as NumPy arrays sharing memory."""
+        return (numpy.frombuffer(self.literals, dtype=numpy.int32),
+                numpy.frombuffer(self.ends, dtype=numpy.int64))
+
+    def to_lists(self):
+        return ([list(c) for c in self])
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Plans of least cost.
+
+find_plan minimises the number of steps. cheapest_plan minimises the
+total cost of a plan instead, for costs given per step by Costs: a
+term (weight, atoms) of step t costs weight if all atoms (names of time
+t) hold, e.g. (1, ['goat_ab_3']) or (4, ['north_3', 'robot_at_o103_3']).
+
+The horizons are tried in increasing order on one incremental solver.
+The weight of the terms of the steps before the horizon is counted by
+a cardinality.Totalizer. After the first plan, every further solver
+call assumes that the count stays below the cost of the best plan
+found, so tightening the bound and moving to a longer horizon only add
+clauses. Each horizon ends with an unsatisfiable call: no plan of that
+horizon is cheaper.
+
+Longer horizons may hold cheaper plans. The search stops at t_max, or
+as soon as the steps alone cost as much as the best plan: if every step
+costs at least step_bound, a plan of horizon t costs at least
+t * step_bound. For costs per action, step_bound is derived from the
+clauses of the domain that make some action happen at every step.
+
+Where steps may be free, as the empty crossings of the river, that
+bound never cuts the search off. state_bound does instead, if the
+reachability analysis of the domain lists its states (see
+reachability.explore): a plan that visits a state twice can skip the
+steps in between and costs no more, so some cheapest plan visits every
+state once at most and has fewer steps than there are reachable states.
+Without either bound the plan is only the cheapest up to t_max.
+
+The result, an Optimum, records the plan, its cost and every
+refutation the optimality rests on; Optimum.verify checks them again,
+each on a fresh formula solved from scratch.
+"""
+
+from __future__ import print_function
+import itertools
+
+import pycosat
+
+from cardinality import Totalizer
+from planner import IncrementalSolver
+from template import split_atom
+
+
+class Costs(object):
+    """Cost terms per step.
+
+    terms(t) returns the pairs (weight, atoms) of step t, with positive
+    integer weights. step_bound is a lower bound of the cost of every
+    step; weights, if given, the cost of every action.
+    """
+
+    def __init__(self, terms, step_bound=0, weights=None):
+        self.terms = terms
+        self.step_bound = step_bound
+        self.weights = weights
+
+    @classmethod
+    def per_action(cls, weights):
+        """Costs of the actions in the dict weights; others are free."""
+        def terms(t):
+            return ([(w, ['%s_%d' % (a, t)])
+                     for (a, w) in sorted(weights.items()) if w > 0])
+        return (cls(terms, weights=weights))
+
+    def of(self, plan):
+        """The cost of a plan.Plan."""
+        cost = 0
+        for s in range(len(plan)):
+            holds = set(plan.actions_at(s)) | set(plan.state_at(s))
+            for w, atoms in self.terms(s):
+                if all(split_atom(a)[0] in holds for a in atoms):
+                    cost += w
+        return (cost)
+
+
+class Optimum(object):
+    """Result of cheapest_plan.
+
+    plan is the cheapest plan found (a plan.Plan) or None and cost its
+    cost. refuted lists pairs (t, bound): no plan of horizon t costs
+    less than bound, or there is no plan of horizon t at all if bound
+    is None. Horizons below the first entry are ruled out by the
+    domain's lower bound. stopped tells why no longer horizon was
+    tried: 'step bound' or 'state bound' if they cannot be cheaper, so
+    the plan is optimal among all plans; 't_max' if it is only optimal
+    among the plans of up to t_max steps, which is no proof of
+    optimality. solves counts the solver calls.
+    """
+
+    def __init__(self):
+        self.plan = None
+        self.cost = None
+        self.refuted = []
+        self.stopped = 't_max'
+        self.solves = 0
+
+    @property
+    def horizon(self):
+        return (None if self.plan is None else len(self.plan))
+
+    def verify(self, domain, costs):
+        """Check the plan and every refutation from scratch; raises
+        AssertionError if one does not hold."""
+        if self.plan is not None:
+            if costs.of(self.plan) != self.cost:
+                raise AssertionError("the plan costs %d, not %d"
+                                     % (costs.of(self.plan), self.cost))
+            clauses = list(domain.horizon_cnf(self.horizon))
+            clauses += domain.template.to_numbers(
+                [[a] for a in self.plan.literals()])
+            if pycosat.solve(clauses) == 'UNSAT':
+                raise AssertionError("the plan is not a plan")
+        for t, bound in self.refuted:
+            clauses = _bounded(domain, costs, t, bound)
+            if pycosat.solve(clauses) != 'UNSAT':
+                raise AssertionError("horizon %d has a plan cheaper than "
+                                     "%s" % (t, bound))
+        return (True)
+
+    def __repr__(self):
+        return ('Optimum(horizon=%r, cost=%r, stopped=%r, refuted=%r)'
+                % (self.horizon, self.cost, self.stopped, self.refuted))
+
+
+def step_bound(domain, costs):
+    """Lower bound of the cost of every step.
+
+    For costs per action every clause of the template that consists of
+    actions of the same step only forces one of them to happen, so the
+    step costs at least the cheapest of them.
+    """
+    bound = costs.step_bound
+    if costs.weights is None:
+        return (bound)
+    template = domain.template
+    decoder = domain.decoder
+    action = dict((i + 1, a) for (a, i) in zip(decoder.actions,
+                                                decoder.action_index))
+    for c in template.clauses:
+        if c and all(l in action for l in c):
+            bound = max(bound, min(costs.weights.get(action[l], 0)
+                                   for l in c))
+    return (bound)
+
+
+def state_bound(domain):
+    """Longest horizon a cheapest plan of domain needs, for costs that
+    depend on the state and the actions of a step only; None if the
+    reachability analysis does not list the states. The states must
+    tell every fluent of the domain, as those of explore do."""
+    reachability = domain.reachability
+    if reachability is None or reachability.states is None:
+        return (None)
+    states = set()
+    for layer in reachability.states:
+        states.update(layer)
+    return (len(states) - 1)
+
+
+def _terms(template, costs, t, fresh, clauses):
+    """Pairs (weight, literal) of the terms of step t; terms of several
+    atoms get a fresh literal implied by them."""
+    weighted = []
+    for w, atoms in costs.terms(t):
+        literals = [template.s2n(a) for a in atoms]
+        if len(literals) == 1:
+            weighted.append((w, literals[0]))
+            continue
+        c = fresh()
+        clauses.append([c] + [-l for l in literals])
+        weighted.append((w, c))
+    return (weighted)
+
+
+def _bounded(domain, costs, t, bound):
+    """Clauses of horizon t, with the cost below bound unless bound is
+    None, encoded from scratch."""
+    clauses = list(domain.horizon_cnf(t))
+    if bound is None:
+        return (clauses)
+    if bound == 0:
+        return (clauses + [[]])
+    counter = itertools.count((t + 2) * domain.template.width + 1)
+    fresh = lambda: next(counter)
+    totalizer = Totalizer(bound, lambda i: fresh())
+    weighted = []
+    for s in range(0, t):
+        weighted += _terms(domain.template, costs, s, fresh, clauses)
+    clauses += totalizer.extend(weighted)
+    exceeds = totalizer.exceeds(bound - 1)
+    if exceeds is not None:
+        clauses.append([-exceeds])
+    return (clauses)
+
+
+def cheapest_plan(domain, costs, t_max, solver_name='minisat22',
+                  incremental=True):
+    """Search the plan of least cost up to horizon t_max; returns an
+    Optimum.
+
+    With incremental=False every solver call encodes its horizon and
+    bound from scratch and hands them to pycosat, for comparison.
+    """
+    result = Optimum()
+    bound = domain.lower_bound()
+    if bound is None or bound > t_max:
+        return (result)
+    longest = state_bound(domain)
+    if longest is not None and longest <= t_max:
+        t_max = longest
+    search = _incremental if incremental else _from_scratch
+    search(domain, costs, t_max, bound, step_bound(domain, costs),
+           solver_name, result)
+    if result.stopped == 't_max' and longest == t_max:
+        result.stopped = 'state bound'
+    return (result)
+
+
+def _improve(domain, costs, t, model, result):
+    plan = domain.extract_plan(t, model)
+    result.plan = plan
+    result.cost = costs.of(plan)
+
+
+def _incremental(domain, costs, t_max, t_min, per_step, solver_name,
+                 result):
+    atoms = domain.template
+    solver = IncrementalSolver(solver_name)
+    # Fresh atoms above those of all horizons up to t_max
+    counter = itertools.count((t_max + 2) * atoms.width + 1)
+    fresh = lambda: next(counter)
+    totalizer = None
+    weighted = []
+    try:
+        solver.add_clauses(atoms.to_numbers(domain.initial_state
+                                            + domain.fixed(0)))
+        for t in range(0, t_max + 1):
+            if t > 0:
+                clauses = []
+                step = _terms(atoms, costs, t - 1, fresh, clauses)
+                if totalizer is None:
+                    weighted += step
+                else:
+                    clauses += totalizer.extend(step)
+                solver.add_clauses(clauses)
+            solver.add_clauses(atoms.instantiate(t)
+                               + atoms.to_numbers(domain.fixed(t + 1)))
+            if t < t_min:
+                continue
+            if result.cost is not None and t * per_step >= result.cost:
+                result.stopped = 'step bound'
+                return
+            active = atoms.var('__goal', t)
+            solver.add_clauses([c + [-active]
+                                for c in atoms.to_numbers(domain.goal(t))])
+            while True:
+                assumptions = [active]
+                if result.cost is not None:
+                    if result.cost == 0:
+                        break
+                    exceeds = totalizer.exceeds(result.cost - 1)
+                    if exceeds is not None:
+                        assumptions.append(-exceeds)
+                result.solves += 1
+                model = solver.solve(assumptions)
+                if model == 'UNSAT':
+                    break
+                _improve(domain, costs, t, model, result)
+                if totalizer is None:
+                    totalizer = Totalizer(max(1, result.cost),
+                                          lambda i: fresh())
+                    solver.add_clauses(totalizer.extend(weighted))
+            result.refuted.append((t, result.cost))
+            # Horizon t is settled; its goal never needs to hold again.
+            solver.add_clauses([[-active]])
+    finally:
+        solver.close()
+
+
+def _from_scratch(domain, costs, t_max, t_min, per_step, solver_name,
+                  result):
+    for t in range(t_min, t_max + 1):
+        if result.cost is not None and t * per_step >= result.cost:
+            result.stopped = 'step bound'
+            return
+        while result.cost != 0:
+            result.solves += 1
+            model = pycosat.solve(_bounded(domain, costs, t, result.cost))
+            if model == 'UNSAT':
+                break
+            _improve(domain, costs, t, model, result)
+        result.refuted.append((t, result.cost))
+
+
+if __name__ == "__main__":
+    import delivery
+    import wolf_goat_cabbage
+    for name, domain, costs in [
+            ('loaded crossings', wolf_goat_cabbage.domain,
+             wolf_goat_cabbage.loaded_crossings),
+            ('travel', delivery.domain, delivery.travel_costs())]:
+        optimum = cheapest_plan(domain, costs, 30)
+        optimum.verify(domain, costs)
+        print("%s: cost %s at horizon %s (%s), %d solver calls" % (
+            name, optimum.cost, optimum.horizon, optimum.stopped,
+            optimum.solves))
@@ -3,58 +3,47 @@
 """A logical agent navigating the roboto delivery world."""
 
 from __future__ import print_function
+import functools
 import pycosat
 import sys
 import pdb
 
+import metrics
+from atoms import AtomTable
+from cardinality import at_most_one
+from costs import Costs
+from plan import format_plan
+from planner import Domain, find_plan
+from reachability import explore
+
 #################################################################
 #
 # Functions for interfacing PicoSAT
 #
 #################################################################
 
-atoms_list = []
+atoms = AtomTable()
 
 def s2n(s):
     """Convert string representation of atom to number."""
-    if(s[0] == '~'):
-        inv = -1
-        t = s[1:]
-    else:
-        inv = 1
-        t = s
-    try:
-        n = atoms_list.index(t)
-    except:
-        # Atom not in list. Add it.
-        atoms_list.append(t)
-        n = len(atoms_list) - 1
-    return((n+1) * inv)
+    return(atoms.s2n(s))
 
 def n2s(n):
     """Convert numeric representation of atom to string."""
-    r = atoms_list[abs(n)-1]
-    if (n) < 0:
-        r = '~' + r
-    return(r)
+    return(atoms.n2s(n))
 
 def solve(axioms):
-    picosatInput = map(lambda c: map(lambda s: s2n(s), c), axioms)
+    picosatInput = atoms.to_numbers(axioms)
     picosatSolution = pycosat.solve(picosatInput)
     if(picosatSolution == 'UNSAT'):
         return(picosatSolution)
     else:
-        return(map(lambda atom: n2s(atom), picosatSolution))
-
-def print_actions_in(clause):
-    # Print all positive actions in clause.
-    action_trace = []
-    for c in clause:
-        for a in actions:
-            if (c.find(a) == 0):
-                action_trace += [c]
-    for a in action_trace[:-1]:
-        print(a)
+        return(atoms.to_names(picosatSolution))
+
+def print_actions_in(plan):
+    # Print all actions of the plan.
+    for line in format_plan(plan):
+        print(line)
 
 #################################################################
 #
@@ -64,38 +53,70 @@ def print_actions_in(clause):
 
 actions = ['north', 'south', 'west', 'east', 'pick_up', 'drop']
 
+# Floor plane
+# Format: Location,
+#         Location North, Location East, Location South, Location West
+floorplan = [
+      ['main_office',
+       'mail_drop', 'main_office', 'main_office', 'main_office']
+    , ['mail_drop',
+       'mail_drop', 'ts', 'main_office', 'mail_drop']
+    , ['ts',
+       'ts', 'o101', 'ts', 'mail_drop']
+    , ['o101',
+       'o101', 'o103', 'r101', 'ts']
+    , ['o103',
+       'o103', 'o105', 'r103', 'o101']
+    , ['o105',
+       'o105', 'o107', 'r105', 'o103']
+    , ['o107',
+       'o107', 'o107', 'r107', 'o105']
+    , ['r101',
+       'o101', 'r101', 'r101', 'r101']
+    , ['r103',
+       'o103', 'r103', 'r103', 'r103']
+    , ['r105',
+       'o105', 'r105', 'r105', 'r105']
+    , ['r107',
+       'o107', 'r107', 'r107', 'r107']
+    ]
+
+def corridor_floorplan(n):
+    """Floorplan like the one above with n offices along the corridor.
+
+    Every office o1xx has a room r1xx to its south; corridor_floorplan(4)
+    is the floorplan above.
+    """
+    offices = ['o%d' % (101 + 2 * i) for i in range(n)]
+    rooms = ['r%d' % (101 + 2 * i) for i in range(n)]
+    plan = [ ['main_office',
+              'mail_drop', 'main_office', 'main_office', 'main_office']
+           , ['mail_drop',
+              'mail_drop', 'ts', 'main_office', 'mail_drop']
+           , ['ts',
+              'ts', offices[0], 'ts', 'mail_drop']
+           ]
+    for i in range(n):
+        west = offices[i-1] if i > 0 else 'ts'
+        east = offices[i+1] if i+1 < n else offices[i]
+        plan += [[offices[i], offices[i], east, rooms[i], west]]
+    for i in range(n):
+        plan += [[rooms[i], offices[i], rooms[i], rooms[i], rooms[i]]]
+    return(plan)
+
+# Encoding of the at-most-one constraints, see cardinality.py
+amo_encoding = 'auto'
+
 # Movement axioms
 
-def movement_axioms(t):
-    """All movmement axioms for time t."""
-    # Floor plane
-    # Format: Location,
-    #         Location North, Location East, Location South, Location West
-    floorplan = [
-          ['main_office',
-           'mail_drop', 'main_office', 'main_office', 'main_office']
-        , ['mail_drop',
-           'mail_drop', 'ts', 'main_office', 'mail_drop']
-        , ['ts',
-           'ts', 'o101', 'ts', 'mail_drop']
-        , ['o101',
-           'o101', 'o103', 'r101', 'ts']
-        , ['o103',
-           'o103', 'o105', 'r103', 'o101']
-        , ['o105',
-           'o105', 'o107', 'r105', 'o103']
-        , ['o107',
-           'o107', 'o107', 'r107', 'o105']
-        , ['r101',
-           'o101', 'r101', 'r101', 'r101']
-        , ['r103',
-           'o103', 'r103', 'r103', 'r103']
-        , ['r105',
-           'o105', 'r105', 'r105', 'r105']
-        , ['r107',
-           'o107', 'r107', 'r107', 'r107']
-        ]
+def movement_axioms(t, floorplan=floorplan, encoding=None, lazy=False):
+    """All movmement axioms for time t.
 
+    With lazy=True the at-most-one constraints of mutexes(t) are left
+    out, see lazy.py.
+    """
+    if encoding is None:
+        encoding = amo_encoding
     locations = [l[0] for l in floorplan]
     room_links = []
     # Movement axioms
@@ -125,10 +146,10 @@ def movement_axioms(t):
     # (¬ robot_at_mail_drop_t ∨ ¬ robot_at_o101_t) ∧ 
     # ...
     only_one_robot = []
-    for l0 in range(len(locations)):
-        for l1 in range(l0+1, len(locations)):
-            only_one_robot += [['~robot_at_%s_%d' % (locations[l0], t),
-                                '~robot_at_%s_%d' % (locations[l1], t),]]
+    if not lazy:
+        only_one_robot = at_most_one(
+            ['robot_at_%s_%d' % (l, t) for l in locations],
+            lambda i: 'only_one_robot_aux%d_%d' % (i, t), encoding)
 
     # Exactly one action at a time:
     one_action_a_time = []
@@ -136,11 +157,9 @@ def movement_axioms(t):
     # north_t ∨ south_t ∨ west_t ∨ east_t ∨ pick_up_t ∨ drop_t
     one_action_a_time += [['%s_%d' % (l, t) for l in actions]]
     # At most one action at a time
-    for a0 in range(len(actions)):
-        for a1 in range(a0+1, len(actions)):
-            if (a0 != a1):
-                one_action_a_time += [['~%s_%d' % (actions[a0], t),
-                                       '~%s_%d' % (actions[a1], t)]]
+    one_action_a_time += at_most_one(
+        ['%s_%d' % (l, t) for l in actions],
+        lambda i: 'one_action_aux%d_%d' % (i, t), encoding)
 
     # Picking up and dropping mail
     pick_drop_mail = []
@@ -186,10 +205,10 @@ def movement_axioms(t):
     # (¬ mail_at_mail_drop_t ∨ ¬ mail_at_o101_t) ∧ 
     # ...
     one_piece_mail = []
-    for l0 in range(len(locations)):
-        for l1 in range(l0+1, len(locations)):
-            one_piece_mail += [['~mail_at_%s_%d' % (locations[l0], t),
-                                '~mail_at_%s_%d' % (locations[l1], t)]]
+    if not lazy:
+        one_piece_mail = at_most_one(
+            ['mail_at_%s_%d' % (l, t) for l in locations],
+            lambda i: 'one_piece_mail_aux%d_%d' % (i, t), encoding)
 
     # We're done
     return (room_links
@@ -208,25 +227,123 @@ def movement_axioms(t):
 #################################################################
 
 
-t_max = 20
-axioms_up_to_time_t = []
-for t in range(0, t_max+1):
-    axioms_up_to_time_t += movement_axioms(t)
-    axioms = (axioms_up_to_time_t +
-              [ # Start position of agent
-                  ['robot_at_main_office_0']
-                # Robot starts empty handed
-                 , ['~robot_carries_mail_0']
-                # Start position of mail
-                 , ['mail_at_r107_0']
-                # Target position for mail
-                , ['mail_at_main_office_%d' % t]
-                # , ['robot_at_ts_%d' % t]
-                , ['~robot_carries_mail_%d' % t]
-              ])
-    solution = solve(axioms)
-    if(solution != 'UNSAT'):
+def initial_state():
+    return ([ # Start position of agent
+                ['robot_at_main_office_0']
+              # Robot starts empty handed
+             , ['~robot_carries_mail_0']
+              # Start position of mail
+             , ['mail_at_r107_0']
+            ])
+
+def goal(t):
+    return ([ # Target position for mail
+                ['mail_at_main_office_%d' % t]
+              # , ['robot_at_ts_%d' % t]
+             , ['~robot_carries_mail_%d' % t]
+            ])
+
+def mutexes(t, floorplan=floorplan):
+    """Groups of atoms of which at most one holds at time t."""
+    locations = [l[0] for l in floorplan]
+    return ([['robot_at_%s_%d' % (l, t) for l in locations],
+             ['mail_at_%s_%d' % (l, t) for l in locations]])
+
+def reachability(floorplan=floorplan, robot_at='main_office',
+                 mail_at='r107'):
+    """Robot and mail locations reachable at every step, by breadth-first
+    search over the floorplan."""
+    moves = dict((l[0], list(zip(['north', 'east', 'south', 'west'], l[1:])))
+                 for l in floorplan)
+    # A state is (robot location, mail location, robot carries mail)
+    def successors(state):
+        robot, mail, carries = state
+        for (direction, connection) in moves[robot]:
+            yield (direction,
+                   (connection, connection if carries else mail, carries))
+        if mail == robot:
+            yield ('pick_up', (robot, mail, True))
+        yield ('drop', (robot, mail, False))
+    def holds(state):
+        robot, mail, carries = state
+        return (['robot_at_%s' % robot, 'mail_at_%s' % mail]
+                + (['robot_carries_mail'] if carries else []))
+    locations = [l[0] for l in floorplan]
+    fluents = (['robot_at_%s' % l for l in locations]
+               + ['mail_at_%s' % l for l in locations]
+               + ['robot_carries_mail'])
+    return (explore((robot_at, mail_at, False), successors, fluents, actions,
+                    holds))
+
+def travel_costs(distance=None, handling=1, floorplan=floorplan):
+    """Costs of delivery plans for costs.cheapest_plan: a move from a
+    location to its neighbour costs distance(location, neighbour),
+    default 1, also into a wall; picking up and dropping the mail
+    costs handling."""
+    if distance is None:
+        distance = lambda here, there: 1
+    directions = ['north', 'east', 'south', 'west']
+    moves = [(distance(row[0], there), d, row[0])
+             for row in floorplan
+             for (d, there) in zip(directions, row[1:])]
+    def terms(t):
+        result = [(w, ['%s_%d' % (d, t), 'robot_at_%s_%d' % (here, t)])
+                  for (w, d, here) in moves if w > 0]
+        if handling > 0:
+            result += [(handling, ['pick_up_%d' % t]),
+                       (handling, ['drop_%d' % t])]
+        return (result)
+    # Exactly one action at a time, from the robot's location
+    return (Costs(terms, min([handling] + [w for (w, _, _) in moves])))
+
+domain = Domain('delivery', movement_axioms, initial_state(), goal, actions,
+                atoms, reachability,
+                functools.partial(movement_axioms, lazy=True), mutexes)
+
+def query(mail_at, target, floorplan=floorplan, robot_at='main_office',
+          encoding=None, reachable=True, name='delivery'):
+    """Domain for bringing the mail from location mail_at to target on
+    floorplan, with the robot starting at robot_at.
+
+    encoding selects the at-most-one encoding of the axioms (see
+    movement_axioms); with reachable=False the domain goes without the
+    reachability analysis.
+    """
+    def query_goal(t):
+        return ([['mail_at_%s_%d' % (target, t)],
+                 ['~robot_carries_mail_%d' % t]])
+    analysis = None
+    if reachable:
+        analysis = functools.partial(reachability, floorplan, robot_at,
+                                     mail_at)
+    return (Domain(name,
+                   functools.partial(movement_axioms, floorplan=floorplan,
+                                     encoding=encoding),
+                   [['robot_at_%s_0' % robot_at],
+                    ['~robot_carries_mail_0'],
+                    ['mail_at_%s_0' % mail_at]],
+                   query_goal, actions,
+                   reachability=analysis,
+                   relaxed=functools.partial(movement_axioms,
+                                             floorplan=floorplan,
+                                             encoding=encoding, lazy=True),
+                   mutexes=functools.partial(mutexes, floorplan=floorplan)))
+
+def corridor_domain(n, reachable=True, **options):
+    """Bring the mail from the last room of corridor_floorplan(n) to the
+    main office; options as for query."""
+    plan = corridor_floorplan(n)
+    return (query(plan[-1][0], 'main_office', plan, reachable=reachable,
+                  **options))
+
+if __name__ == "__main__":
+    t_max = 20
+    with metrics.from_argv(sys.argv[1:]) as recorder:
+        t, model = find_plan(domain, t_max, decode=False, recorder=recorder)
+        with recorder.phase('decode'):
+            plan = None if model == 'UNSAT' else domain.extract_plan(t, model)
+    if(plan is not None):
         print("Found a solution:")
-        print_actions_in(solution)
+        print_actions_in(plan)
         sys.exit(0)
-print("Not possible in up to %d steps. :-(" % t_max)
+    print("Not possible in up to %d steps. :-(" % t_max)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Enumeration of minimal diagnoses as hitting sets of conflicts.
+
+A diagnosis is a set of components that, when assumed to be faulty,
+makes the axioms consistent with the observations; all other
+components are assumed to work. A conflict is a set of components that
+cannot all work at the same time. The minimal diagnoses are exactly the
+minimal hitting sets of the minimal conflicts (Reiter 1987).
+
+minimal_diagnoses builds Reiter's hitting set tree breadth first. Each
+node that is not yet consistent is labelled with a minimal conflict,
+obtained from the unsatisfiable core of the failed consistency check
+and shrunk by deletion, and gets one child per component of the
+conflict. Conflicts are reused for every node they are disjoint from.
+Because the tree is explored by size, diagnoses come out ordered by
+cardinality and every diagnosis found is subset-minimal.
+
+DiagnosisService answers streams of observation sets against one
+circuit, in parallel and with a cache for repeated observations.
+"""
+
+from __future__ import print_function
+from collections import OrderedDict, deque
+import multiprocessing
+
+from atoms import AtomTable
+from fastsat import HornSolver, is_horn
+from planner import IncrementalSolver, Solver
+
+
+class Circuit(object):
+    """Axioms of a system with a list of components that may fail.
+
+    The axioms are converted and loaded into the solver once; the
+    components and the observations are passed to the solver as
+    assumptions, so many observation sets can be checked against the
+    same circuit.
+
+    solver_name is the name of a PySAT solver, 'horn' for the forward
+    chaining engine of fastsat (Horn axioms only) or 'pycosat'. By
+    default PySAT is used where it is installed. Otherwise Horn axioms
+    go to the Horn engine, because pycosat neither keeps the formula
+    nor reports cores.
+    """
+
+    def __init__(self, axioms, components, solver_name=None):
+        self.atoms = AtomTable()
+        self.components = list(components)
+        clauses = self.atoms.to_numbers(axioms)
+        if solver_name is None:
+            if Solver is not None:
+                solver_name = 'minisat22'
+            elif is_horn(clauses):
+                solver_name = 'horn'
+        if solver_name == 'horn':
+            self.solver = HornSolver(clauses)
+        else:
+            if solver_name == 'pycosat':
+                solver_name = None
+            self.solver = IncrementalSolver(solver_name)
+            self.solver.add_clauses(clauses)
+        self.var = dict((c, self.atoms.s2n(c)) for c in self.components)
+        self.checks = 0
+
+    def close(self):
+        self.solver.close()
+
+    def conflict(self, healthy, observations):
+        """Return a minimal conflict among the healthy components.
+
+        observations are numeric literals. Returns None if assuming all
+        of healthy to work is consistent with the observations.
+        """
+        fixed = list(observations)
+        if self._consistent(fixed, healthy):
+            return (None)
+        conflict = self._core(healthy)
+        # Shrink the conflict by deletion. A component that is needed in
+        # a conflict is needed in every subset of it as well.
+        i = 0
+        while i < len(conflict):
+            rest = conflict[:i] + conflict[i + 1:]
+            if self._consistent(fixed, rest):
+                i += 1
+            else:
+                conflict = self._core(rest)
+        return (conflict)
+
+    def _consistent(self, observations, healthy):
+        self.checks += 1
+        var = self.var
+        return (self.solver.solve(observations + [var[c] for c in healthy])
+                != 'UNSAT')
+
+    def _core(self, healthy):
+        core = set(self.solver.core())
+        return ([c for c in healthy if self.var[c] in core])
+
+    def diagnoses(self, observations, max_size=None, max_count=None,
+                  minimality='subset'):
+        """Yield the minimal diagnoses for observations.
+
+        observations are atoms in string representation. Every
+        diagnosis is a list of faulty components. They are generated in
+        order of increasing size; max_size and max_count limit their
+        size and number. With minimality='cardinality' only the
+        diagnoses of the smallest size are generated.
+        """
+        if minimality not in ('subset', 'cardinality'):
+            raise ValueError("unknown minimality %r" % minimality)
+        observed = [self.atoms.s2n(o) for o in observations]
+        order = dict((c, i) for (i, c) in enumerate(self.components))
+        conflicts = []
+        found = []
+        root = frozenset()
+        queue = deque([root])
+        seen = set([root])
+        while queue:
+            h = queue.popleft()
+            if max_size is not None and len(h) > max_size:
+                return
+            if (minimality == 'cardinality' and found
+                    and len(h) > len(found[0])):
+                return
+            if any(d <= h for d in found):
+                continue
+            conflict = None
+            for c in conflicts:
+                if not (c & h):
+                    conflict = c
+                    break
+            if conflict is None:
+                healthy = [c for c in self.components if c not in h]
+                conflict = self.conflict(healthy, observed)
+                if conflict is None:
+                    found.append(h)
+                    yield (sorted(h, key=order.get))
+                    if max_count is not None and len(found) >= max_count:
+                        return
+                    continue
+                if not conflict:
+                    # The observations contradict the axioms on their own.
+                    return
+                conflict = frozenset(conflict)
+                conflicts.append(conflict)
+            for c in sorted(conflict, key=order.get):
+                child = h | frozenset([c])
+                if child not in seen:
+                    seen.add(child)
+                    queue.append(child)
+
+
+def minimal_diagnoses(axioms, components, observations, **options):
+    """Yield the minimal diagnoses; see Circuit.diagnoses for options."""
+    circuit = Circuit(axioms, components)
+    try:
+        for d in circuit.diagnoses(observations, **options):
+            yield (d)
+    finally:
+        circuit.close()
+
+
+#################################################################
+#
+# Diagnosing streams of observations
+#
+#################################################################
+
+# Circuit of a worker process of a DiagnosisService
+_worker_circuit = None
+_worker_options = None
+
+
+def _init_worker(axioms, components, options):
+    global _worker_circuit, _worker_options
+    _worker_circuit = Circuit(axioms, components)
+    _worker_options = options
+
+
+def _diagnose_in_worker(key):
+    return (tuple(tuple(d) for d in
+                  _worker_circuit.diagnoses(key, **_worker_options)))
+
+
+class DiagnosisService(object):
+    """Diagnoses many observation sets against the same circuit.
+
+    The circuit is compiled once per process. With processes > 1 the
+    observation sets are spread over a pool of worker processes, each
+    holding its own compiled circuit. Results are kept in an LRU cache
+    of cache_size observation sets, so repeated observation vectors are
+    answered without solving. The remaining keyword options are passed
+    to Circuit.diagnoses.
+
+    Every result is a tuple of diagnoses, each a tuple of components.
+    """
+
+    def __init__(self, axioms, components, processes=1, cache_size=4096,
+                 **options):
+        self.options = options
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self.circuit = None
+        self.pool = None
+        self.processes = processes or multiprocessing.cpu_count()
+        if self.processes > 1:
+            self.pool = multiprocessing.Pool(
+                self.processes, initializer=_init_worker,
+                initargs=(axioms, components, options))
+        else:
+            self.circuit = Circuit(axioms, components)
+
+    def __enter__(self):
+        return (self)
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        if self.circuit is not None:
+            self.circuit.close()
+            self.circuit = None
+
+    def diagnose(self, observations):
+        """Return the diagnoses of one set of observations."""
+        return (next(self.diagnose_many([observations])))
+
+    def diagnose_many(self, observation_sets, batch_size=1024):
+        """Yield the diagnoses of every observation set, in order.
+
+        observation_sets may be any iterable, including an endless
+        stream; it is consumed in batches of batch_size sets.
+        """
+        batch = []
+        for observations in observation_sets:
+            batch.append(tuple(sorted(set(observations))))
+            if len(batch) >= batch_size:
+                for r in self._diagnose_batch(batch):
+                    yield (r)
+                batch = []
+        for r in self._diagnose_batch(batch):
+            yield (r)
+
+    def _diagnose_batch(self, keys):
+        results = {}
+        missing = []
+        for key in keys:
+            if key in results:
+                # Repeated within the batch; answered with the first one
+                self.hits += 1
+                continue
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                results[key] = self.cache[key]
+                self.hits += 1
+            else:
+                results[key] = None
+                missing.append(key)
+        self.misses += len(missing)
+        if self.pool is not None:
+            chunksize = max(1, len(missing) // (4 * self.processes))
+            answers = self.pool.map(_diagnose_in_worker, missing, chunksize)
+        else:
+            answers = [tuple(tuple(d) for d in
+                             self.circuit.diagnoses(key, **self.options))
+                       for key in missing]
+        for key, answer in zip(missing, answers):
+            results[key] = answer
+            self._remember(key, answer)
+        return ([results[key] for key in keys])
+
+    def _remember(self, key, answer):
+        if self.cache_size <= 0:
+            return
+        self.cache[key] = answer
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
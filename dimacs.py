@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""DIMACS CNF files and an on-disk cache of planning instances.
+
+write_dimacs streams integer clauses to a file in buffered blocks, so a
+formula never has to exist as a whole in memory. Since the header must
+state the number of variables and clauses before they are known, a
+header line of fixed width is written first and filled in at the end.
+read_dimacs maps a file into memory and yields its clauses one by one.
+
+InstanceCache keeps the complete formula of a Domain for a horizon as a
+DIMACS file, so later runs load the integers instead of encoding the
+problem again. The files use the variable numbering of the domain's
+SliceTemplate and can be handed to any other DIMACS solver as well:
+
+    python dimacs.py cnf_files 10
+
+writes the wolf, goat and cabbage and the delivery problems for the
+horizons up to 10 to the directory cnf_files.
+"""
+
+from __future__ import print_function
+import itertools
+import mmap
+import os
+import sys
+
+from fastsat import simplify
+
+# Width of the header line; leaves room for 10^16 variables and clauses.
+_header_format = 'p cnf %-16d %-16d\n'
+_header_width = len(_header_format % (0, 0))
+
+
+def write_dimacs(path, clauses, comments=(), buffer_size=4096):
+    """Write integer clauses to path in DIMACS format.
+
+    clauses may be any iterable, e.g. a generator; they are written in
+    blocks of buffer_size clauses. The file appears under path only
+    once it is complete. Returns the pair (variables, clauses).
+    """
+    num_vars = 0
+    num_clauses = 0
+    temporary = '%s.%d.tmp' % (path, os.getpid())
+    with open(temporary, 'w') as f:
+        for line in comments:
+            f.write('c %s\n' % line)
+        header = f.tell()
+        f.write(' ' * (_header_width - 1) + '\n')
+        lines = []
+        for c in clauses:
+            lines.append(' '.join(map(str, c)) + ' 0\n')
+            for l in c:
+                if l > num_vars:
+                    num_vars = l
+                elif -l > num_vars:
+                    num_vars = -l
+            if len(lines) >= buffer_size:
+                f.write(''.join(lines))
+                num_clauses += len(lines)
+                lines = []
+        f.write(''.join(lines))
+        num_clauses += len(lines)
+        f.seek(header)
+        f.write(_header_format % (num_vars, num_clauses))
+    os.replace(temporary, path)
+    return (num_vars, num_clauses)
+
+
+def read_header(path):
+    """Return the pair (variables, clauses) of the header, or None."""
+    with open(path) as f:
+        for line in f:
+            if line.startswith('p'):
+                fields = line.split()
+                return (int(fields[2]), int(fields[3]))
+            if not line.startswith('c'):
+                break
+    return (None)
+
+
+def read_dimacs(path, chunk_size=1 << 20):
+    """Yield the integer clauses of a DIMACS file.
+
+    The file is memory-mapped and split into lines chunk_size bytes at
+    a time. Clauses may span several lines.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            clause = []
+            size = len(data)
+            start = 0
+            while start < size:
+                end = min(start + chunk_size, size)
+                if end < size:
+                    newline = data.find(b'\n', end)
+                    end = size if newline < 0 else newline + 1
+                for line in data[start:end].split(b'\n'):
+                    first = line[:1]
+                    if first in (b'c', b'p', b''):
+                        continue
+                    if first == b'%':
+                        # End marker of the SATLIB benchmark files
+                        return
+                    literals = list(map(int, line.split()))
+                    if not literals:
+                        continue
+                    if (not clause and literals[-1] == 0
+                            and literals.count(0) == 1):
+                        # The common case: one clause on one line
+                        literals.pop()
+                        yield (literals)
+                        continue
+                    for l in literals:
+                        if l == 0:
+                            yield (clause)
+                            clause = []
+                        else:
+                            clause.append(l)
+                start = end
+            if clause:
+                yield (clause)
+        finally:
+            data.close()
+
+
+#################################################################
+#
+# Instance cache
+#
+#################################################################
+
+class InstanceCache(object):
+    """Complete formulas of planning problems, stored as DIMACS files.
+
+    A file is keyed by the name of the domain, the horizon, the
+    fingerprint of the domain and whether the formula is pruned by
+    reachability, so changing the axioms never returns a stale formula.
+    """
+
+    def __init__(self, directory='cnf_cache'):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def path(self, domain, t):
+        """File name of the formula of domain for horizon t."""
+        pruned = '' if domain.reachability is None else '_reachable'
+        return (os.path.join(self.directory, '%s_%d_%s%s.cnf' % (
+            domain.name, t, domain.fingerprint[:16], pruned)))
+
+    def clauses(self, domain, t):
+        """Generate the integer clauses of domain for horizon t from
+        disk; a formula not cached yet is written first, streamed from
+        horizon_stream."""
+        path = self.path(domain, t)
+        if os.path.exists(path):
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._write(domain, t, path)
+        return (read_dimacs(path))
+
+    def export(self, domain, t):
+        """Make sure the formula is on disk and return its file name."""
+        path = self.path(domain, t)
+        if not os.path.exists(path):
+            self._write(domain, t, path)
+        return (path)
+
+    def _write(self, domain, t, path):
+        comments = ['%s, horizon %d' % (domain.name, t)]
+        falsified = []
+
+        def stream():
+            for c in horizon_stream(domain, t):
+                if not c:
+                    falsified.append(c)
+                yield (c)
+        write_dimacs(path, stream(), comments)
+        if falsified:
+            # As Domain.horizon_cnf has it
+            write_dimacs(path, [[]], comments)
+
+
+def horizon_stream(domain, t):
+    """Generate the clauses of Domain.horizon_cnf(t) one time slice at a
+    time: the initial state, the axioms of every step and the goal,
+    then the units of the atoms fixed by reachability.
+
+    Every slice is pruned by the fixed atoms on its own. If they
+    falsify a clause, the empty clause is generated last, after the
+    clauses of the slices before.
+    """
+    atoms = domain.template
+    fixed = []
+    if domain.reachability is not None:
+        fixed = [c[0] for s in range(0, t + 2)
+                 for c in atoms.to_numbers(domain.fixed(s))]
+    true = set(fixed)
+    slices = itertools.chain([atoms.to_numbers(domain.initial_state)],
+                             (atoms.instantiate(s) for s in range(0, t + 1)),
+                             [atoms.to_numbers(domain.goal(t))])
+    for clauses in slices:
+        if fixed:
+            clauses = simplify(clauses, true)
+            if clauses is None:
+                yield ([])
+                return
+        for c in clauses:
+            yield (c)
+    for l in fixed:
+        yield ([l])
+
+
+if __name__ == "__main__":
+    import delivery
+    import wolf_goat_cabbage
+    directory = sys.argv[1] if len(sys.argv) > 1 else 'cnf_cache'
+    t_max = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    cache = InstanceCache(directory)
+    for domain in [wolf_goat_cabbage.domain, delivery.domain]:
+        for t in range(0, t_max + 1):
+            print(cache.export(domain, t))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Named planning domains and circuits, built on first use.
+
+The scripts define their domains at module level, but importing them
+runs nothing but definitions: the reachability analysis of a Domain
+and its integer template are computed the first time they are needed.
+A Catalog maps names to functions building a Domain or a circuit from
+keyword parameters with JSON values,
+
+    catalog = Catalog()
+    catalog.domain('delivery', mail_at='r107', target='o103')
+    catalog.circuit('scaled_wiring', lamps=200)
+
+imports the module on the first request and keeps what it built, so
+the next request for the same name and parameters reuses the domain
+with its compiled template, reachability analysis and plan decoder.
+warm() computes all of them at once.
+
+A circuit is the triple (axioms, components, observations): what
+diagnosis.Circuit takes and the observations to diagnose by default.
+"""
+
+from collections import OrderedDict
+import json
+
+
+def _delivery(mail_at=None, target=None):
+    import delivery
+    if mail_at is None and target is None:
+        return (delivery.domain)
+    return (delivery.query(mail_at or 'r107', target or 'main_office'))
+
+
+def _wolf_goat_cabbage():
+    import wolf_goat_cabbage
+    return (wolf_goat_cabbage.domain)
+
+
+def _river_crossing(puzzle='wolf_goat_cabbage', n=None, capacity=None):
+    import river_crossing
+    if puzzle == 'wolf_goat_cabbage':
+        return (river_crossing.wolf_goat_cabbage().domain())
+    if puzzle not in ('food_chain', 'jealous_couples',
+                      'missionaries_cannibals'):
+        raise ValueError("unknown river crossing puzzle %r" % puzzle)
+    options = {} if capacity is None else dict(capacity=capacity)
+    return (getattr(river_crossing, puzzle)(n or 3, **options).domain())
+
+
+def _fleet(robots, parcels, grid=None, semantics='exists', capacity=1):
+    import delivery
+    import fleet
+    floorplan = delivery.floorplan
+    if grid is not None:
+        floorplan = fleet.grid_floorplan(*grid)
+    parcels = dict((p, tuple(route)) for (p, route) in parcels.items())
+    return (fleet.fleet_delivery(robots, parcels, floorplan, semantics,
+                                 capacity).domain())
+
+
+def _home_wiring():
+    import home_wiring
+    return (home_wiring.axioms, home_wiring.everythingOK,
+            home_wiring.observations)
+
+
+def _scaled_wiring(lamps=100, group=4, dark=None):
+    import home_wiring
+    return (home_wiring.scaled_circuit(lamps, group, dark))
+
+
+domains = OrderedDict([('delivery', _delivery),
+                       ('wolf_goat_cabbage', _wolf_goat_cabbage),
+                       ('river_crossing', _river_crossing),
+                       ('fleet', _fleet)])
+
+circuits = OrderedDict([('home_wiring', _home_wiring),
+                        ('scaled_wiring', _scaled_wiring)])
+
+
+def warm(domain):
+    """Compute everything of domain that is built on first use."""
+    domain.template
+    domain.decoder
+    domain.reachability
+    domain.fingerprint
+    return (domain)
+
+
+class Catalog(object):
+    """Domains and circuits built on demand and kept for reuse.
+
+    At most max_entries of each are kept; the least recently used ones
+    are dropped.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._domains = OrderedDict()
+        self._circuits = OrderedDict()
+
+    def domain(self, name, **params):
+        if name not in domains:
+            raise ValueError("unknown domain %r" % name)
+        return (self._get(self._domains, domains[name], name, params,
+                          warm))
+
+    def circuit(self, name, **params):
+        """The triple (axioms, components, observations) of a circuit."""
+        if name not in circuits:
+            raise ValueError("unknown circuit %r" % name)
+        return (self._get(self._circuits, circuits[name], name, params,
+                          None))
+
+    def loaded(self):
+        """Keys of the domains and circuits kept."""
+        return (list(self._domains), list(self._circuits))
+
+    def _get(self, cache, build, name, params, prepare):
+        key = key_of(name, params)
+        if key in cache:
+            cache.move_to_end(key)
+            return (cache[key])
+        value = build(**params)
+        if prepare is not None:
+            prepare(value)
+        cache[key] = value
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+        return (value)
+
+
+def key_of(name, params):
+    """Key of a domain or circuit name with its parameters."""
+    if not params:
+        return (name)
+    return ('%s %s' % (name, json.dumps(params, sort_keys=True)))
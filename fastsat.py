@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Linear-time satisfiability checks for Horn and 2-SAT formulas.
+
+A clause is Horn if it contains at most one positive literal. Horn
+formulas are decided by forward chaining from the facts (Dowling and
+Gallier 1984): every atom derived that way has to be true, all others
+can be false. Formulas whose clauses have at most two literals are
+decided via the strongly connected components of their implication
+graph (Aspvall, Plass and Tarjan 1979), found by
+strongly_connected_components. Both run in time linear in the size of
+the formula.
+
+solve() checks which fragment a formula belongs to, after the
+assumptions have been applied, and only calls pycosat for formulas
+that are neither Horn nor 2-SAT. Literals are integers as for pycosat,
+and so is the result: a list of literals or 'UNSAT'.
+
+Being pure Python, these engines do not beat pycosat on a single call:
+PicoSAT's unit propagation does the same work in C (see
+benchmarks/bench_fastsat.py). They pay off where a formula is checked
+many times under different assumptions. HornSolver indexes the formula
+once, and its cores come straight from the derivations. pycosat
+cannot report cores at all.
+"""
+
+import pycosat
+
+
+def is_horn(clauses):
+    """True if no clause contains more than one positive literal."""
+    for c in clauses:
+        positive = 0
+        for l in c:
+            if l > 0:
+                positive += 1
+                if positive > 1:
+                    return (False)
+    return (True)
+
+
+def is_2sat(clauses):
+    """True if no clause contains more than two literals."""
+    for c in clauses:
+        if len(c) > 2:
+            return (False)
+    return (True)
+
+
+def simplify(clauses, assumptions):
+    """Apply the assumptions to clauses.
+
+    Returns the clauses that are not yet satisfied, without their
+    falsified literals, or None if a clause became empty.
+    """
+    true = set(assumptions)
+    result = []
+    for c in clauses:
+        reduced = []
+        satisfied = False
+        for l in c:
+            if l in true:
+                satisfied = True
+                break
+            if -l not in true:
+                reduced.append(l)
+        if satisfied:
+            continue
+        if not reduced:
+            return (None)
+        result.append(reduced)
+    return (result)
+
+
+def _num_vars(clauses, assumptions=()):
+    n = 0
+    for c in clauses:
+        for l in c:
+            if abs(l) > n:
+                n = abs(l)
+    for l in assumptions:
+        if abs(l) > n:
+            n = abs(l)
+    return (n)
+
+
+def solve(clauses, assumptions=()):
+    """Solve clauses under assumptions with the cheapest method.
+
+    The result has the same form as that of pycosat.solve.
+    """
+    if not isinstance(clauses, list):
+        clauses = [list(c) for c in clauses]
+    assumptions = list(assumptions)
+    if assumptions and len(set(map(abs, assumptions))) != len(
+            set(assumptions)):
+        return ('UNSAT')
+    n = _num_vars(clauses, assumptions)
+    rest = simplify(clauses, assumptions) if assumptions else clauses
+    if rest is None:
+        return ('UNSAT')
+    if is_horn(rest):
+        model = solve_horn(rest, n)
+    elif is_2sat(rest):
+        model = solve_2sat(rest, n)
+    else:
+        return (pycosat.solve(clauses + [[a] for a in assumptions]))
+    if model == 'UNSAT' or not assumptions:
+        return (model)
+    fixed = dict((abs(a), a) for a in assumptions)
+    return ([fixed.get(abs(l), l) for l in model])
+
+
+def solve_horn(clauses, n=None):
+    """Minimal model of a Horn formula, or 'UNSAT'."""
+    if n is None:
+        n = _num_vars(clauses)
+    watch = [[] for _ in range(n + 1)]
+    heads = []
+    missing = []
+    true = [False] * (n + 1)
+    queue = []
+    for i, c in enumerate(clauses):
+        # head 0 marks a clause without positive literal
+        head = 0
+        k = 0
+        for l in c:
+            if l > 0:
+                head = l
+            else:
+                watch[-l].append(i)
+                k += 1
+        heads.append(head)
+        missing.append(k)
+        if k == 0:
+            if head == 0:
+                return ('UNSAT')
+            if not true[head]:
+                true[head] = True
+                queue.append(head)
+    while queue:
+        v = queue.pop()
+        for i in watch[v]:
+            missing[i] -= 1
+            if missing[i] == 0:
+                h = heads[i]
+                if h == 0:
+                    return ('UNSAT')
+                if not true[h]:
+                    true[h] = True
+                    queue.append(h)
+    return ([v if true[v] else -v for v in range(1, n + 1)])
+
+
+def solve_2sat(clauses, n=None):
+    """Model of a formula with at most two literals per clause, or 'UNSAT'."""
+    if n is None:
+        n = _num_vars(clauses)
+    # Node 2v-2 stands for literal v, node 2v-1 for literal -v.
+    def node(l):
+        return (2 * l - 2 if l > 0 else -2 * l - 1)
+    graph = [[] for _ in range(2 * n)]
+    for c in clauses:
+        if not c:
+            return ('UNSAT')
+        a = c[0]
+        b = c[1] if len(c) > 1 else c[0]
+        # (a or b) is (-a -> b) and (-b -> a)
+        graph[node(-a)].append(node(b))
+        graph[node(-b)].append(node(a))
+    component = strongly_connected_components(graph)
+    model = []
+    for v in range(1, n + 1):
+        p, q = component[2 * v - 2], component[2 * v - 1]
+        if p == q:
+            return ('UNSAT')
+        # Tarjan numbers components in reverse topological order.
+        model.append(v if p < q else -v)
+    return (model)
+
+
+def strongly_connected_components(graph):
+    """Strongly connected components of a graph, by Tarjan's algorithm.
+
+    graph[v] lists the successors of node v, nodes being the integers
+    0 to len(graph) - 1. The result maps every node to the number of its
+    component; components are numbered in reverse topological order, so
+    for an edge v -> w the component of w is numbered no later than
+    that of v.
+    """
+    index = [None] * len(graph)
+    low = [0] * len(graph)
+    component = [None] * len(graph)
+    stack = []
+    on_stack = [False] * len(graph)
+    counter = 0
+    components = 0
+    for root in range(len(graph)):
+        if index[root] is not None:
+            continue
+        work = [(root, 0)]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        while work:
+            v, i = work[-1]
+            if i < len(graph[v]):
+                work[-1] = (v, i + 1)
+                w = graph[v][i]
+                if index[w] is None:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, 0))
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+            work.pop()
+            if work:
+                u = work[-1][0]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component[w] = components
+                    if w == v:
+                        break
+                components += 1
+    return (component)
+
+
+class HornSolver(object):
+    """Forward chaining over a Horn formula that is indexed once.
+
+    Positive assumptions are added as facts, negative ones forbid an
+    atom to be derived. After an unsatisfiable call, core() returns the
+    assumptions the contradiction was derived from. The interface is
+    that of planner.IncrementalSolver.
+    """
+
+    def __init__(self, clauses=(), n=None):
+        self.heads = []
+        self.bodies = []
+        self.counts = []
+        self.watch = {}
+        self.facts = []
+        self.n = n or 0
+        self.conflict = None
+        self.reason = {}
+        self.add_clauses(clauses)
+
+    def add_clauses(self, clauses):
+        for c in clauses:
+            head = None
+            body = set()
+            for l in c:
+                if l > 0:
+                    if head is not None and head != l:
+                        raise ValueError("clause %r is not Horn" % (c,))
+                    head = l
+                else:
+                    body.add(-l)
+                if abs(l) > self.n:
+                    self.n = abs(l)
+            i = len(self.heads)
+            self.heads.append(head)
+            self.bodies.append(list(body))
+            self.counts.append(len(body))
+            if not body:
+                self.facts.append(i)
+            for v in body:
+                self.watch.setdefault(v, []).append(i)
+
+    def solve(self, assumptions=()):
+        """Return the minimal model as list of literals, or 'UNSAT'."""
+        heads = self.heads
+        watch = self.watch
+        missing = self.counts[:]
+        forbidden = set(-a for a in assumptions if a < 0)
+        # Derived atoms with the clause they were derived by; None for
+        # assumptions.
+        reason = self.reason = {}
+        self.conflict = None
+        queue = []
+        for a in assumptions:
+            if a > 0 and a not in reason:
+                reason[a] = None
+                queue.append(a)
+        for i in self.facts:
+            h = heads[i]
+            if h is None:
+                self.conflict = ('clause', i)
+                return ('UNSAT')
+            if h not in reason:
+                reason[h] = i
+                queue.append(h)
+        while queue:
+            v = queue.pop()
+            if v in forbidden:
+                self.conflict = ('atom', v)
+                return ('UNSAT')
+            for i in watch.get(v, ()):
+                missing[i] -= 1
+                if missing[i] == 0:
+                    h = heads[i]
+                    if h is None:
+                        self.conflict = ('clause', i)
+                        return ('UNSAT')
+                    if h not in reason:
+                        reason[h] = i
+                        queue.append(h)
+        n = max([self.n] + [abs(a) for a in assumptions])
+        return ([v if v in reason else -v for v in range(1, n + 1)])
+
+    def core(self):
+        """Assumptions of the last unsatisfiable call that caused it."""
+        if self.conflict is None:
+            return ([])
+        bodies = self.bodies
+        kind, x = self.conflict
+        core = []
+        todo = []
+        if kind == 'atom':
+            core.append(-x)
+            todo.append(x)
+        else:
+            todo += bodies[x]
+        seen = set()
+        while todo:
+            v = todo.pop()
+            if v in seen:
+                continue
+            seen.add(v)
+            r = self.reason.get(v)
+            if r is None:
+                core.append(v)
+            else:
+                todo += bodies[r]
+        return (core)
+
+    def close(self):
+        pass
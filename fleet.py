@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""K robots delivering P parcels on a floorplan, carrying up to C each.
+
+delivery.py models one robot and one piece of mail with hand-made
+clauses. Here the domain is written with STRIPS actions (see
+strips.py), so it can be solved with parallel steps: robots move at
+the same time, and under exists-step semantics a robot may pick up a
+parcel and leave the room in one step.
+
+    move_<robot>_<from>_<to>      along a link of the floorplan
+    pick_<robot>_<parcel>_<l>
+    drop_<robot>_<parcel>_<l>
+
+The state is factored into the location of every robot
+('at_<robot>_<l>'), the location of every parcel ('<parcel>_at_<l>')
+and the parcels a robot holds ('<robot>_holds_<parcel>'), so atoms and
+actions grow linearly with K and P. The capacity is an invariant of
+every state, encoded with a sequential counter over the parcels a robot
+holds. A robot does not pick up and drop parcels in the same step, so
+the loads of a step never exceed the capacity, in whatever order its
+actions are executed.
+
+grid_floorplan and delivery.corridor_floorplan generate larger
+floorplans, random_instance places robots and parcels on them.
+"""
+
+from __future__ import print_function
+import random
+
+import delivery
+from cardinality import at_most
+from strips import Action, StripsProblem
+
+
+def links(floorplan):
+    """Pairs (l, m) of neighbouring locations of a floorplan."""
+    pairs = []
+    for row in floorplan:
+        for m in row[1:]:
+            if m != row[0] and (row[0], m) not in pairs:
+                pairs.append((row[0], m))
+    return (pairs)
+
+
+def fleet_delivery(robots, parcels, floorplan=delivery.floorplan,
+                   semantics='forall', capacity=1, name='fleet'):
+    """StripsProblem for robots delivering parcels.
+
+    robots maps every robot to its start location, parcels maps every
+    parcel to the pair (start, target).
+    """
+    locations = [row[0] for row in floorplan]
+    fluents = []
+    actions = []
+    exclusive = []
+    for r in robots:
+        fluents += ['at_%s_%s' % (r, l) for l in locations]
+        fluents += ['%s_holds_%s' % (r, p) for p in parcels]
+        for (l, m) in links(floorplan):
+            actions.append(Action('move_%s_%s_%s' % (r, l, m),
+                                  pre=['at_%s_%s' % (r, l)],
+                                  add=['at_%s_%s' % (r, m)],
+                                  delete=['at_%s_%s' % (r, l)]))
+        picks = []
+        drops = []
+        for p in parcels:
+            for l in locations:
+                picks.append(Action(
+                    'pick_%s_%s_%s' % (r, p, l),
+                    pre=['at_%s_%s' % (r, l), '%s_at_%s' % (p, l)],
+                    add=['%s_holds_%s' % (r, p)],
+                    delete=['%s_at_%s' % (p, l)]))
+                drops.append(Action(
+                    'drop_%s_%s_%s' % (r, p, l),
+                    pre=['at_%s_%s' % (r, l), '%s_holds_%s' % (r, p)],
+                    add=['%s_at_%s' % (p, l)],
+                    delete=['%s_holds_%s' % (r, p)]))
+        actions += picks + drops
+        if capacity < len(parcels):
+            exclusive.append(([a.name for a in picks],
+                              [a.name for a in drops]))
+    for p in parcels:
+        fluents += ['%s_at_%s' % (p, l) for l in locations]
+
+    def load(t):
+        clauses = []
+        for r in robots:
+            clauses += at_most(
+                capacity, ['%s_holds_%s_%d' % (r, p, t) for p in parcels],
+                lambda i: '%s_load_aux%d_%d' % (r, i, t))
+        return (clauses)
+    init = (['at_%s_%s' % (r, l) for (r, l) in robots.items()]
+            + ['%s_at_%s' % (p, s) for (p, (s, _)) in parcels.items()])
+    goal = ['%s_at_%s' % (p, g) for (p, (_, g)) in parcels.items()]
+    return (StripsProblem(fluents, actions, init, goal, semantics,
+                          name=name, invariants=load, exclusive=exclusive))
+
+
+def capacity_check(robots, parcels, capacity):
+    """Function telling whether no robot holds more than capacity
+    parcels in a state, for StripsProblem.simulate."""
+    held = dict((r, ['%s_holds_%s' % (r, p) for p in parcels])
+                for r in robots)
+
+    def check(state):
+        return (all(sum(1 for f in fs if f in state) <= capacity
+                    for fs in held.values()))
+    return (check)
+
+
+#################################################################
+#
+# Instance generators
+#
+#################################################################
+
+def grid_floorplan(width, height):
+    """Floorplan of a width x height grid of rooms 'x<i>_y<j>'.
+
+    Rows follow the format of delivery.floorplan: location, then the
+    locations north, east, south and west of it, the location itself
+    where there is a wall.
+    """
+    def room(i, j):
+        return ('x%d_y%d' % (i, j))
+    plan = []
+    for j in range(height):
+        for i in range(width):
+            here = room(i, j)
+            plan.append([here,
+                         room(i, j - 1) if j > 0 else here,
+                         room(i + 1, j) if i + 1 < width else here,
+                         room(i, j + 1) if j + 1 < height else here,
+                         room(i - 1, j) if i > 0 else here])
+    return (plan)
+
+
+def random_instance(floorplan, k, p, seed=0):
+    """Random start locations for k robots and routes for p parcels.
+
+    Returns the pair (robots, parcels) for fleet_delivery.
+    """
+    rng = random.Random(seed)
+    locations = [row[0] for row in floorplan]
+    robots = dict(('robot%d' % i, rng.choice(locations)) for i in range(k))
+    parcels = dict(('parcel%d' % i, tuple(rng.sample(locations, 2)))
+                   for i in range(p))
+    return (robots, parcels)
+
+
+if __name__ == "__main__":
+    from planner import find_plan
+    robots = {'robot0': 'main_office', 'robot1': 'o107'}
+    parcels = {'mail0': ('r107', 'main_office'), 'mail1': ('r101', 'o105'),
+               'mail2': ('r105', 'r101')}
+    for capacity in [1, 2]:
+        problem = fleet_delivery(robots, parcels, capacity=capacity,
+                                 semantics='exists')
+        domain = problem.domain()
+        t, model = find_plan(domain, 40, decode=False)
+        sequence = problem.linearize(domain.extract_plan(t, model))
+        print("capacity %d: %d steps, %d actions" % (
+            capacity, t, len(sequence)))
+        for a in sequence:
+            print("    %s" % a)
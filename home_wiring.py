@@ -13,6 +13,12 @@
 
 import pycosat
 import pdb
+import sys
+
+import metrics
+from atoms import AtomTable
+from cnf import CNF
+from diagnosis import minimal_diagnoses
 
 #################################################################
 #
@@ -22,34 +28,19 @@ import pdb
 
 def s2n(s):
     """Convert string representation of atom to number."""
-    if (s[0] == '~'):
-        inv = -1
-        t = s[1:]
-    else:
-        inv = 1
-        t = s
-    try:
-        n = atoms_list.index(t)
-    except:
-        # Atom not in list. Add it.
-        atoms_list.append(t)
-        n = len(atoms_list) - 1
-    return((n+1) * inv)
+    return(atoms.s2n(s))
 
 def n2s(n):
     """Convert numeric representation of atom to string."""
-    r = atoms_list[abs(n)-1]
-    if (n) < 0:
-        r = '~' + r
-    return(r)
+    return(atoms.n2s(n))
 
 def solve(axioms):
-    picosatInput = map(lambda c: map(lambda s: s2n(s), c), axioms)
+    picosatInput = atoms.to_numbers(axioms)
     picosatSolution = pycosat.solve(picosatInput)
     if (picosatSolution == 'UNSAT'):
         return(picosatSolution)
     else:
-        return(map(lambda atom: n2s(atom), picosatSolution))
+        return(atoms.to_names(picosatSolution))
 
 #################################################################
 #
@@ -59,15 +50,16 @@ def solve(axioms):
 
 # In our diagnostics example, we use the following symbolic names for
 # atoms.
-atoms_list = [ 'live_l_1' , 'live_w_0' , 'live_w_0' , 'live_w_1' , 'up_s_2'
-             , 'live_w_0' , 'live_w_2' , 'down_s_2' , 'live_w_1' , 'live_w_3'
-             , 'up_s_1' , 'live_w_2' , 'live_w_3' , 'down_s_1' , 'live_l_2'
-             , 'live_w_4' , 'live_w_4' , 'live_w_3' , 'up_s_3' , 'down_s_3'
-             , 'live_p_1' , 'live_w_3' , 'live_w_3' , 'live_w_5' , 'ok_cb_1'
-             , 'live_p_2' , 'live_w_6' , 'live_w_6' , 'live_w_5' , 'ok_cb_2'
-             , 'live_w_5' , 'live_outside' , 'lit_l_1' , 'live_l_1' , 'ok_l_1'
-             , 'lit_l_2' , 'live_l_2' , 'ok_l_2' , 'live_p_1' , 'live_p_2'
-             ]
+atoms = AtomTable(
+    [ 'live_l_1' , 'live_w_0' , 'live_w_0' , 'live_w_1' , 'up_s_2'
+    , 'live_w_0' , 'live_w_2' , 'down_s_2' , 'live_w_1' , 'live_w_3'
+    , 'up_s_1' , 'live_w_2' , 'live_w_3' , 'down_s_1' , 'live_l_2'
+    , 'live_w_4' , 'live_w_4' , 'live_w_3' , 'up_s_3' , 'down_s_3'
+    , 'live_p_1' , 'live_w_3' , 'live_w_3' , 'live_w_5' , 'ok_cb_1'
+    , 'live_p_2' , 'live_w_6' , 'live_w_6' , 'live_w_5' , 'ok_cb_2'
+    , 'live_w_5' , 'live_outside' , 'lit_l_1' , 'live_l_1' , 'ok_l_1'
+    , 'lit_l_2' , 'live_l_2' , 'ok_l_2' , 'live_p_1' , 'live_p_2'
+    ])
 
 # Here come the axioms about the world of the diagnostics problem.
 # This is a formula in CNF, where negated atoms are indicated by the
@@ -114,6 +106,11 @@ axioms = [ ['live_l_1', '~live_w_0']
 
 # Try running the diagnosis both with allNegations and with
 # singleNegations and compare the results.
+#
+# Both enumerate the error conditions blindly, allNegations even all 2^n
+# of them. diagnosis() below uses minimal_diagnoses from diagnosis.py
+# instead, which only generates the minimal sets of faulty components
+# from the conflicts it finds.
 
 def allNegations(c):
     if (len(c) == 0):
@@ -132,36 +129,77 @@ def singleNegations(c):
         r.append(e)
     return(r)
 
-def diagnosis():
-    everythingOK = [  'live_outside'
-                    , 'ok_cb_1'
-                    , 'ok_cb_2'
-                    , 'ok_l_1'
-                    , 'ok_l_2'
-                   ]
-    observations = [  'up_s_1'
-                    , 'up_s_2' 
-                    , '~lit_l_1'
-                   ]
-    clauses = (axioms +
-               list(map(lambda x: [x], everythingOK)) +
-               list(map(lambda x: [x], observations)))
-    solution = solve(clauses)
+# The components that may be faulty, and what we observe.
+everythingOK = [  'live_outside'
+                , 'ok_cb_1'
+                , 'ok_cb_2'
+                , 'ok_l_1'
+                , 'ok_l_2'
+               ]
+observations = [  'up_s_1'
+                , 'up_s_2' 
+                , '~lit_l_1'
+               ]
+
+def diagnosis(recorder=metrics.disabled):
+    recorder.start('home_wiring', step='consistency')
+    with recorder.phase('encode'):
+        clauses = (axioms +
+                   list(map(lambda x: [x], everythingOK)) +
+                   list(map(lambda x: [x], observations)))
+    with recorder.phase('convert'):
+        picosatInput = CNF.from_names(clauses, atoms)
+    with recorder.phase('solve'):
+        solution = pycosat.solve(picosatInput)
+    recorder.finish(solution, len(picosatInput), len(atoms))
     if (solution == 'UNSAT'):
         print('Something is wrong. I will try to identify \
 possible sources of the defect ...')
-        #possibleErrors = allNegations(everythingOK)
-        possibleErrors = singleNegations(everythingOK)
-        for e in possibleErrors:
-            clauses = (axioms +
-                       list(map(lambda x: [x], e)) +
-                       list(map(lambda x: [x], observations)))
-            if (solve(clauses) != 'UNSAT'):
-                print("\nPossible cause of error:")
-                for c in e:
-                    print(c)
+        recorder.start('home_wiring', step='diagnoses')
+        with recorder.phase('solve'):
+            diagnoses = list(minimal_diagnoses(axioms, everythingOK,
+                                               observations))
+        recorder.finish(clauses=len(axioms), diagnoses=len(diagnoses))
+        for d in diagnoses:
+            print("\nPossible cause of error:")
+            for c in everythingOK:
+                print('~' + c if c in d else c)
+
+#################################################################
+#
+# Larger circuits
+#
+#################################################################
+
+def scaled_circuit(n, group=4, dark=None):
+    """A circuit with n lamps for benchmarks.
+
+    Power comes from outside through one circuit breaker per group of
+    lamps. Every lamp hangs off its breaker through its own switch.
+    Returns the axioms, the components that may fail and observations
+    in which all switches are up and the lamps in dark (default: the
+    first and the last one) stay dark.
+    """
+    if dark is None:
+        dark = [0, n - 1]
+    clauses = []
+    components = ['live_outside']
+    observations = []
+    for b in range((n + group - 1) // group):
+        clauses += [['live_cb_%d' % b, '~live_outside', '~ok_cb_%d' % b]]
+        components += ['ok_cb_%d' % b]
+    for l in range(n):
+        clauses += [ ['live_l_%d' % l, '~live_cb_%d' % (l // group),
+                      '~up_s_%d' % l, '~ok_s_%d' % l]
+                   , ['lit_l_%d' % l, '~live_l_%d' % l, '~ok_l_%d' % l]
+                   ]
+        components += ['ok_s_%d' % l, 'ok_l_%d' % l]
+        observations += ['up_s_%d' % l]
+        observations += ['~lit_l_%d' % l if l in dark else 'lit_l_%d' % l]
+    return(clauses, components, observations)
 
 if __name__ == "__main__":
-    diagnosis()
+    with metrics.from_argv(sys.argv[1:]) as recorder:
+        diagnosis(recorder)
 
 ## END CODE SNIPPET
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Lazy generation of the mutual exclusion axioms of a domain.
+
+Families such as only_one_state, only_one_robot and one_piece_mail
+make up a large part of a formula, yet the solver rarely makes two
+atoms of such a group true at once: the frame axioms mostly keep one
+location per object anyway. In lazy mode the planner solves a relaxed
+formula without these families (counterexample-guided abstraction
+refinement). Every model is checked against all groups; for every
+group with several true atoms the binary clauses excluding those pairs
+are added and the horizon is solved again, until a model violates no
+group. A horizon whose relaxed formula is unsatisfiable is refuted
+without any mutex clause.
+
+A domain supports lazy mode if it has relaxed axioms, its movement
+axioms without the families, and mutexes(t), the groups of atom names
+at time t of which at most one may be true (see planner.Domain). The
+auxiliary atoms of the families left out have no meaning in the
+models found lazily.
+"""
+
+from cardinality import at_most_one
+
+
+class LazyMutexes(object):
+    """Lazily added mutex clauses and what they are compared with.
+
+    lazy counts the clauses added, eager the clauses of the families
+    in the eager encoding of the horizons solved, and pairwise the
+    pairs a pairwise encoding would need. rounds counts the calls of
+    the solver, refinements those that found violated groups.
+    """
+
+    def __init__(self):
+        self.lazy = 0
+        self.eager = 0
+        self.pairwise = 0
+        self.rounds = 0
+        self.refinements = 0
+        self._domain = None
+
+    def relaxed_clauses(self, domain, t):
+        """Integer clauses of the relaxed axioms of time t, numbered in
+        domain.template."""
+        template = domain.template
+        if self._domain is not domain:
+            if domain.relaxed is None or domain.mutexes is None:
+                raise ValueError("domain %r has no relaxed axioms"
+                                 % domain.name)
+            self._domain = domain
+            self._base = template.to_numbers(domain.relaxed(0))
+            self._per_step = (len(domain.movement_axioms(0))
+                              - len(self._base))
+        shift = t * template.width
+        return ([[l + shift if l > 0 else l - shift for l in c]
+                 for c in self._base])
+
+    def count_eager(self, domain, t):
+        """Add the clauses the families would take at time t."""
+        self.eager += self._per_step
+        self.pairwise += sum(len(at_most_one(g)) for g in domain.mutexes(t))
+
+    def violated(self, domain, model, t):
+        """Clauses excluding the pairs of true atoms in the groups of
+        times 0 to t, in model."""
+        self.rounds += 1
+        template = domain.template
+        n = len(model)
+        clauses = []
+        for s in range(0, t + 1):
+            for group in domain.mutexes(s):
+                true = [v for v in map(template.number, group)
+                        if v <= n and model[v - 1] > 0]
+                clauses += [[-a, -b] for i, a in enumerate(true)
+                            for b in true[i + 1:]]
+        if clauses:
+            self.refinements += 1
+            self.lazy += len(clauses)
+        return (clauses)
@@ -6,3 +6,56 @@
 #Eine PP-Präsentation ist nicht notwendig. Es ist in Ordnung, wenn Sie uns Ihre Lösung in der IDE/dem Editor Ihrer Wahl präsentieren.
 
 #"Purely Logical Agent: Wolf, Goat, and Cabbage"-Teil
+
+"""Plan a domain, diagnose a circuit or run the server (see server.py).
+
+    python main.py plan DOMAIN [T_MAX]
+    python main.py diagnose CIRCUIT
+    python main.py serve [--socket PATH] [--warm DOMAIN ...]
+"""
+
+from __future__ import print_function
+import sys
+
+import server
+
+usage = ("use: main.py plan DOMAIN [T_MAX] | diagnose CIRCUIT | "
+         "serve [--socket PATH] [--warm DOMAIN ...]")
+
+
+def main(argv):
+    if not argv:
+        raise SystemExit(usage)
+    command, args = argv[0], argv[1:]
+    if command == 'serve':
+        server.main(args)
+        return
+    planning = server.PlanningServer()
+    try:
+        if command == 'plan' and 1 <= len(args) <= 2:
+            t_max = int(args[1]) if len(args) > 1 else 50
+            response = planning.handle(dict(op='plan', domain=args[0],
+                                            t_max=t_max))
+        elif command == 'diagnose' and len(args) == 1:
+            response = planning.handle(dict(op='diagnose',
+                                            circuit=args[0]))
+        else:
+            raise SystemExit(usage)
+    finally:
+        planning.close()
+    if not response['ok']:
+        raise SystemExit(response['error'])
+    if command == 'diagnose':
+        for d in response['diagnoses']:
+            print("Possible cause of error: %s" % ', '.join(d))
+    elif response['horizon'] is None:
+        print("Not possible in up to %d steps. :-(" % t_max)
+    else:
+        print("Found a solution:")
+        for s, step in enumerate(response['steps']):
+            for a in step:
+                print('%s_%d' % (a, s))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Timing, memory and formula statistics of the planner and the scripts.
+
+A Recorder collects one record per horizon (or other unit of work):
+the wall time of its phases, the size of the formula and the result.
+
+    encode      building the axioms (strings or template slices)
+    convert     string atoms to integers
+    preprocess  simplifying the formula and extending its model
+    solve       the SAT solver
+    refine      checking models against lazily generated constraints
+    decode      the model back to atom names or a Plan
+
+Every record is written as one JSON line. With memory=True the peak of
+memory allocated by Python during the record is measured as well, with
+tracemalloc; that slows the program down considerably. With profile set
+to a file name, the whole run is profiled with cProfile and the
+statistics are dumped there.
+
+A disabled Recorder does nothing: its phase() returns a shared context
+manager without any work in it. The scripts take the options
+
+    --metrics FILE    write the JSON-lines report to FILE ('-': stdout)
+    --memory          measure peak memory per record
+    --profile FILE    dump cProfile statistics to FILE
+
+A Histogram counts durations, e.g. the latencies of queries, in
+logarithmic buckets.
+"""
+
+from __future__ import print_function
+import cProfile
+import json
+import sys
+import time
+import tracemalloc
+
+
+class _Nothing(object):
+    def __enter__(self):
+        return (self)
+
+    def __exit__(self, *exc):
+        return (False)
+
+
+_nothing = _Nothing()
+
+
+class _Phase(object):
+    def __init__(self, times, name):
+        self.times = times
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return (self)
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.times[self.name] = self.times.get(self.name, 0.0) + elapsed
+        return (False)
+
+
+class Recorder(object):
+    """Collects metrics records and writes them as JSON lines.
+
+    path is a file name ('-' for stdout) or None to only keep the
+    records in the list records. The recorder is a context manager that
+    starts and stops memory tracing and profiling.
+    """
+
+    def __init__(self, path=None, memory=False, profile=None, enabled=True):
+        self.enabled = enabled
+        self.path = path
+        self.memory = memory
+        self.profile = profile
+        self.records = []
+        self.current = None
+        self._stream = None
+        self._profiler = None
+
+    def __enter__(self):
+        if not self.enabled:
+            return (self)
+        if self.path == '-':
+            self._stream = sys.stdout
+        elif self.path is not None:
+            self._stream = open(self.path, 'a')
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.profile is not None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return (self)
+
+    def __exit__(self, *exc):
+        self.close()
+        return (False)
+
+    def close(self):
+        if not self.enabled:
+            return
+        self.flush()
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.profile)
+            self._profiler = None
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if self._stream is not None and self._stream is not sys.stdout:
+            self._stream.close()
+        self._stream = None
+
+    def start(self, domain, t=None, **fields):
+        """Begin the record of horizon t of domain (a name)."""
+        if not self.enabled:
+            return
+        self.flush()
+        self.current = dict(domain=domain, t=t, time={})
+        self.current.update(fields)
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+    def phase(self, name):
+        """Context manager adding its wall time to phase name."""
+        if not self.enabled or self.current is None:
+            return (_nothing)
+        return (_Phase(self.current['time'], name))
+
+    def finish(self, result=None, clauses=None, variables=None, **fields):
+        """Complete the current record; it is written by the next start
+        or flush, so a decode phase can still be added."""
+        if not self.enabled or self.current is None:
+            return
+        if result is not None:
+            self.current['result'] = 'UNSAT' if result == 'UNSAT' else 'SAT'
+        if clauses is not None:
+            self.current['clauses'] = clauses
+        if variables is not None:
+            self.current['variables'] = variables
+        self.current.update(fields)
+
+    def flush(self):
+        """Write the current record."""
+        if not self.enabled or self.current is None:
+            return
+        record = self.current
+        self.current = None
+        if self.memory and tracemalloc.is_tracing():
+            record['peak_memory'] = tracemalloc.get_traced_memory()[1]
+        self.add(record)
+
+    def add(self, record):
+        """Write a record made elsewhere, e.g. in a worker process."""
+        if not self.enabled:
+            return
+        self.records.append(record)
+        if self._stream is not None:
+            self._stream.write(json.dumps(record, sort_keys=True) + '\n')
+            self._stream.flush()
+
+
+# Shared recorder of runs without instrumentation
+disabled = Recorder(enabled=False)
+
+
+class Histogram(object):
+    """Counts of durations in buckets growing by a factor of two.
+
+    Bucket i counts the durations up to smallest * 2**i seconds, the
+    last one all longer durations. Percentiles are read off the bucket
+    bounds, so they are exact to a factor of two; total and maximum
+    are exact.
+    """
+
+    def __init__(self, smallest=0.0001, buckets=24):
+        self.bounds = [smallest * 2 ** i for i in range(buckets - 1)]
+        self.counts = [0] * buckets
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, seconds):
+        i = 0
+        while i < len(self.bounds) and seconds > self.bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    def percentile(self, p):
+        """Upper bound of the duration of fraction p of the samples."""
+        if self.count == 0:
+            return (None)
+        rank = p * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n > 0:
+                if i < len(self.bounds):
+                    return (min(self.bounds[i], self.maximum))
+                return (self.maximum)
+        return (self.maximum)
+
+    def to_dict(self):
+        """The histogram as JSON values: the non-empty buckets as pairs
+        of upper bound (None for the last) and count."""
+        return (dict(count=self.count, total=self.total,
+                     maximum=self.maximum,
+                     p50=self.percentile(0.5), p90=self.percentile(0.9),
+                     p99=self.percentile(0.99),
+                     buckets=[(self.bounds[i] if i < len(self.bounds)
+                               else None, n)
+                              for i, n in enumerate(self.counts) if n]))
+
+
+def from_argv(argv):
+    """Recorder for the command line options described above.
+
+    Returns the disabled recorder if none of them is given.
+    """
+    path = profile = None
+    memory = False
+    args = list(argv)
+    while args:
+        a = args.pop(0)
+        if a == '--metrics' and args:
+            path = args.pop(0)
+        elif a == '--profile' and args:
+            profile = args.pop(0)
+        elif a == '--memory':
+            memory = True
+        else:
+            raise SystemExit("unknown option %r; use --metrics FILE, "
+                             "--memory or --profile FILE" % a)
+    if path is None and profile is None and not memory:
+        return (disabled)
+    if path is None and memory:
+        path = '-'
+    return (Recorder(path, memory, profile))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Plans decoded from the integer models of the planner.
+
+In the numbering of a SliceTemplate the atom 'name_t' is variable
+t * width + index(name) + 1, and a model lists the literal of variable
+v at position v - 1. PlanDecoder therefore reads the action and fluent
+atoms of every step straight from their positions in the model,
+without converting the model to strings or scanning it.
+
+A Plan holds the ids of the actions taken at every step and of the
+fluents that hold in every state. format_plan lays it out in the format
+the scripts always used, one 'action_t' per line.
+"""
+
+import re
+
+# Auxiliary atoms of the cardinality encodings, e.g. 'one_action_aux0'
+_aux = re.compile(r'_aux\d+$')
+
+
+class Plan(object):
+    """Actions per step and states in between.
+
+    steps[s] lists the ids of the actions taken at step s and states[s]
+    the ids of the fluents true at time s; ids index into actions and
+    fluents. A plan of horizon t has t steps and t + 1 states.
+    """
+
+    def __init__(self, actions, fluents, steps, states):
+        self.actions = actions
+        self.fluents = fluents
+        self.steps = steps
+        self.states = states
+
+    @property
+    def horizon(self):
+        return (len(self.steps))
+
+    def __len__(self):
+        return (len(self.steps))
+
+    def actions_at(self, s):
+        """Names of the actions taken at step s."""
+        return ([self.actions[a] for a in self.steps[s]])
+
+    def state_at(self, s):
+        """Names of the fluents true at time s."""
+        return ([self.fluents[f] for f in self.states[s]])
+
+    def literals(self):
+        """The actions of the plan as atoms 'action_t'."""
+        return (['%s_%d' % (self.actions[a], s)
+                 for s, step in enumerate(self.steps) for a in step])
+
+
+class PlanDecoder(object):
+    """Positions of the action and fluent atoms of a domain's template.
+
+    Fluents are all atoms of the template that are neither actions nor
+    auxiliary atoms of an encoding nor reserved ('__goal').
+    """
+
+    def __init__(self, template, actions):
+        self.width = template.width
+        self.actions = [a for a in actions if a in template.index]
+        self.action_index = [template.index[a] for a in self.actions]
+        actions = set(self.actions)
+        self.fluents = [n for n in template.names
+                        if n not in actions and not n.startswith('__')
+                        and not _aux.search(n)]
+        self.fluent_index = [template.index[f] for f in self.fluents]
+
+    def decode(self, model, t):
+        """Plan of horizon t in an integer model."""
+        width = self.width
+        n = len(model)
+        steps = []
+        states = []
+        for s in range(0, t + 1):
+            base = s * width
+            states.append(tuple(
+                f for (f, i) in enumerate(self.fluent_index)
+                if base + i < n and model[base + i] > 0))
+            if s < t:
+                steps.append(tuple(
+                    a for (a, i) in enumerate(self.action_index)
+                    if base + i < n and model[base + i] > 0))
+        return (Plan(self.actions, self.fluents, steps, states))
+
+    def action_variables(self, t):
+        """Variables of the actions of the t steps of horizon t."""
+        return ([s * self.width + i + 1 for s in range(0, t)
+                 for i in self.action_index])
+
+
+def format_plan(plan, states=False):
+    """Lines listing the actions of plan, one 'action_t' per line.
+
+    With states=True every action is preceded by the fluents true
+    before it, and the final state closes the list.
+    """
+    lines = []
+    for s in range(len(plan) + 1):
+        if states:
+            lines.append('  [%s]' % ', '.join(plan.state_at(s)))
+        if s < len(plan):
+            lines += ['%s_%d' % (a, s) for a in plan.actions_at(s)]
+    return (lines)
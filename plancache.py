@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Plans kept on disk across runs.
+
+PlanCache stores the result of every horizon search in an SQLite
+database, keyed by the fingerprint of the domain (see
+Domain.fingerprint), i.e. by its movement axioms, initial state and
+goal. A query that was answered before is returned without solving. Plans
+are stored as integer models in the numbering of the domain's
+SliceTemplate and decoded on lookup, as find_plan(decode=...) asks.
+
+A search that fails up to t_max proves that no plan shorter than
+t_max + 1 exists. That lower bound is stored as well, and a later search
+with a larger t_max starts there instead of at horizon 0.
+
+The database is opened in write-ahead-log mode, so any number of
+processes may read it while one of them writes. The number of entries
+is bounded by max_entries; the least recently used ones are dropped.
+"""
+
+from __future__ import print_function
+import json
+import sqlite3
+import time
+import zlib
+
+from planner import find_plan
+
+
+class PlanCache(object):
+    """Shortest plans and lower bounds of planning problems on disk."""
+
+    def __init__(self, path='plans.sqlite', max_entries=10000, timeout=30):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path, timeout=timeout)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        with self.db:
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS plans ('
+                ' key TEXT PRIMARY KEY,'
+                ' name TEXT,'
+                # Shortest horizon with a plan, NULL if none is known
+                ' horizon INTEGER,'
+                # Every horizon below lower_bound is unsatisfiable
+                ' lower_bound INTEGER NOT NULL,'
+                ' solution BLOB,'
+                ' used REAL NOT NULL)')
+            self.db.execute(
+                'CREATE INDEX IF NOT EXISTS plans_used ON plans (used)')
+
+    def __enter__(self):
+        return (self)
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def lookup(self, domain):
+        """Return (horizon, solution, lower_bound) for domain, or None.
+
+        horizon and solution are None if only a lower bound is known.
+        """
+        row = self.db.execute(
+            'SELECT horizon, solution, lower_bound FROM plans WHERE key = ?',
+            (domain.fingerprint,)).fetchone()
+        if row is None:
+            return (None)
+        horizon, solution, lower_bound = row
+        if solution is not None:
+            solution = json.loads(zlib.decompress(solution).decode())
+        with self.db:
+            self.db.execute('UPDATE plans SET used = ? WHERE key = ?',
+                            (time.time(), domain.fingerprint))
+        return (horizon, solution, lower_bound)
+
+    def store(self, domain, horizon, solution, lower_bound=None):
+        """Remember the shortest plan of domain or, if horizon is None,
+        that it has no plan shorter than lower_bound."""
+        if horizon is not None:
+            lower_bound = horizon
+            solution = zlib.compress(json.dumps(solution).encode())
+        else:
+            solution = None
+        with self.db:
+            self.db.execute(
+                'INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?, ?, ?)',
+                (domain.fingerprint, domain.name, horizon, lower_bound,
+                 solution, time.time()))
+            self.db.execute(
+                'DELETE FROM plans WHERE key IN (SELECT key FROM plans'
+                ' ORDER BY used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,))
+
+    def __len__(self):
+        return (self.db.execute('SELECT COUNT(*) FROM plans').fetchone()[0])
+
+    def find_plan(self, domain, t_max, **options):
+        """planner.find_plan, answered from the cache where possible.
+
+        Counts a hit if the cache alone answers the query, i.e. if it
+        holds a plan of horizon up to t_max or a lower bound above
+        t_max. Otherwise the search starts at the stored lower bound,
+        or at options['t_min'] if that is larger.
+        """
+        decode = options.pop('decode', True)
+        t_min = options.pop('t_min', 0)
+        known = self.lookup(domain)
+        t = None
+        if known is not None:
+            horizon, model, bound = known
+            t_min = max(t_min, bound)
+            if horizon is not None and horizon <= t_max:
+                t = horizon
+        if t is not None or t_min > t_max:
+            self.hits += 1
+        else:
+            self.misses += 1
+            t, model = find_plan(domain, t_max, t_min=t_min, decode=False,
+                                 **options)
+            if t is None:
+                self.store(domain, None, None, t_max + 1)
+            else:
+                self.store(domain, t, model)
+        if t is None:
+            return (None, 'UNSAT')
+        if decode:
+            return (t, domain.template.to_names(model))
+        return (t, model)
+
+
+if __name__ == "__main__":
+    import sys
+    import delivery
+    with PlanCache() as cache:
+        for target in sys.argv[1:] or ['main_office']:
+            domain = delivery.query('r107', target)
+            start = time.perf_counter()
+            t, solution = cache.find_plan(domain, 20)
+            print("mail from r107 to %s: %s steps, %.3f s" % (
+                target, t, time.perf_counter() - start))
+        print("hits: %d, misses: %d" % (cache.hits, cache.misses))
@@ -0,0 +1,718 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Horizon search for planning problems encoded in propositional logic.
+
+A planning problem is described by a Domain: the axioms linking time t
+to time t+1, the initial state and the goal at time t. find_plan tries
+the horizons 0, 1, 2, ... and returns the first one for which the
+axioms up to that horizon together with the goal are satisfiable.
+
+In incremental mode only the clauses of the new time step are added to
+the solver for each horizon. They are instantiated from the integer
+template of the movement axioms (see template.py). The goal of horizon t is guarded by an
+activation atom and switched on as an assumption, so it can be retired
+again when the horizon turns out to be too short. When PySAT is
+installed its solvers keep their learned clauses between horizons.
+Without PySAT the formula is still built incrementally in integer form,
+but every horizon is handed to pycosat as a whole.
+
+iter_plans lists all plans of the shortest horizon, one after another.
+improving_plans reports plans and lower bounds as the search proceeds,
+for callers that may have to stop before it is complete.
+"""
+
+from __future__ import print_function
+import hashlib
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import os
+import time
+import pycosat
+
+try:
+    from pysat.solvers import Solver
+except ImportError:
+    Solver = None
+
+from atoms import AtomTable
+from cnf import CNF
+from fastsat import simplify
+from metrics import Recorder, disabled
+from plan import PlanDecoder
+from preprocess import preprocess as _simplify
+from template import SliceTemplate
+
+
+class Domain(object):
+    """A planning problem whose axioms are generated per time step.
+
+    movement_axioms(t) returns the clauses linking time t and t+1,
+    initial_state the clauses that hold at time 0 and goal(t) the
+    clauses that require the goal at time t. All clauses are written
+    with the string representation of atoms.
+
+    The movement axioms are compiled into an integer SliceTemplate the
+    first time the template is needed.
+
+    reachability, a reachability.Reachability, fixes the atoms that
+    cannot take one of their values at a time step and bounds the
+    horizon from below; find_plan skips the horizons below that bound.
+    It may be given as a function returning it, which is called the
+    first time it is needed, so that merely importing a domain does not
+    analyse it.
+
+    relaxed(t), if given, returns the movement axioms without the
+    at-most-one families of the groups mutexes(t) returns, lists of
+    atom names of time t. find_plan(lazy=...) adds clauses of those
+    families only where a model violates them (see lazy.py).
+
+    linearize(plan), if given, returns the actions of a Plan as one
+    sequence that can be executed in that order. Domains whose steps
+    hold several actions need it when the order within a step matters,
+    as for the exists-step plans of strips.py.
+    """
+
+    def __init__(self, name, movement_axioms, initial_state, goal, actions,
+                 atoms=None, reachability=None, relaxed=None, mutexes=None,
+                 linearize=None):
+        self.name = name
+        self.movement_axioms = movement_axioms
+        self.initial_state = initial_state
+        self.goal = goal
+        self.actions = actions
+        self.atoms = atoms if atoms is not None else AtomTable()
+        self._reachability = reachability
+        self.relaxed = relaxed
+        self.mutexes = mutexes
+        self.linearize = linearize
+        self._template = None
+        self._fingerprint = None
+        self._decoder = None
+
+    @property
+    def reachability(self):
+        if callable(self._reachability):
+            self._reachability = self._reachability()
+        return (self._reachability)
+
+    @reachability.setter
+    def reachability(self, reachability):
+        self._reachability = reachability
+
+    @property
+    def template(self):
+        if self._template is None:
+            self._template = SliceTemplate(self.movement_axioms,
+                                           extra=['__goal'])
+        return (self._template)
+
+    @property
+    def fingerprint(self):
+        """Hex digest of the movement axioms, initial state and goal.
+
+        Domains with equal fingerprints have the same plans, whatever
+        their names.
+        """
+        if self._fingerprint is None:
+            template = self.template
+            h = hashlib.sha1()
+            h.update(repr((template.names, template.clauses,
+                           sorted(map(sorted, self.initial_state)),
+                           self.goal(0), self.goal(1))).encode())
+            self._fingerprint = h.hexdigest()
+        return (self._fingerprint)
+
+    @property
+    def decoder(self):
+        if self._decoder is None:
+            self._decoder = PlanDecoder(self.template, self.actions)
+        return (self._decoder)
+
+    def variant(self, initial_state=None, goal=None):
+        """The domain with another initial state or goal, sharing the
+        compiled template. The reachability analysis depends on the
+        initial state and is only kept if it is the same."""
+        domain = Domain(self.name, self.movement_axioms,
+                        initial_state or self.initial_state,
+                        goal or self.goal, self.actions, self.atoms,
+                        self._reachability if initial_state is None
+                        else None, self.relaxed, self.mutexes,
+                        self.linearize)
+        domain._template = self._template
+        domain._decoder = self._decoder
+        return (domain)
+
+    def extract_plan(self, t, model):
+        """Plan of horizon t in an integer model returned by find_plan."""
+        return (self.decoder.decode(model, t))
+
+    def fixed(self, t):
+        """Unit clauses of the atoms at time t fixed by reachability."""
+        if self.reachability is None:
+            return ([])
+        return (self.reachability.fixed(t))
+
+    def lower_bound(self):
+        """Shortest horizon the goal may be reached at, None if it is
+        unreachable."""
+        if self.reachability is None:
+            return (0)
+        return (self.reachability.lower_bound(self.goal))
+
+    def horizon_clauses(self, t):
+        """Integer clauses of the complete problem for horizon t.
+
+        Clauses satisfied by the atoms fixed by reachability are left
+        out, and so are their falsified literals.
+        """
+        atoms = self.template
+        clauses = atoms.to_numbers(self.initial_state)
+        for s in range(0, t + 1):
+            clauses += atoms.instantiate(s)
+        clauses += atoms.to_numbers(self.goal(t))
+        if self.reachability is None:
+            return (clauses)
+        fixed = [c[0] for s in range(0, t + 2)
+                 for c in atoms.to_numbers(self.fixed(s))]
+        simplified = simplify(clauses, fixed)
+        if simplified is None:
+            return ([[]])
+        return (simplified + [[l] for l in fixed])
+
+    def horizon_cnf(self, t):
+        """The clauses of horizon_clauses(t) as a cnf.CNF, built from
+        the template without intermediate lists. Part s holds the
+        clauses of time step s; the initial state comes with step 0 and
+        the goal with step t."""
+        atoms = self.template
+        cnf = CNF(atoms.to_numbers(self.initial_state))
+        for s in range(0, t + 1):
+            if s > 0:
+                cnf.mark()
+            atoms.instantiate_into(cnf, s)
+        cnf.extend(atoms.to_numbers(self.goal(t)))
+        if self.reachability is None:
+            return (cnf)
+        fixed = [c[0] for s in range(0, t + 2)
+                 for c in atoms.to_numbers(self.fixed(s))]
+        simplified = cnf.simplified(fixed)
+        if simplified is None:
+            return (CNF([[]]))
+        simplified.extend([l] for l in fixed)
+        return (simplified)
+
+
+class IncrementalSolver(object):
+    """A clause database that can grow between calls to solve."""
+
+    def __init__(self, solver_name='minisat22'):
+        self.clauses = CNF()
+        self.solver = None
+        self.assumptions = []
+        if Solver is not None and solver_name is not None:
+            self.solver = Solver(name=solver_name)
+
+    def add_clauses(self, clauses):
+        if self.solver is not None:
+            self.solver.append_formula(clauses)
+        else:
+            self.clauses.extend(clauses)
+
+    def solve(self, assumptions=()):
+        """Return a model as list of literals, or 'UNSAT'."""
+        self.assumptions = list(assumptions)
+        if self.solver is not None:
+            if self.solver.solve(assumptions=list(assumptions)):
+                return (self.solver.get_model())
+            return ('UNSAT')
+        return (pycosat.solve(itertools.chain(self.clauses,
+                                              [[a] for a in assumptions])))
+
+    def core(self):
+        """Assumptions of the last unsatisfiable call that caused it.
+
+        PySAT reports a subset of the assumptions; without PySAT all of
+        them are returned. The result is not necessarily minimal.
+        """
+        if self.solver is not None:
+            return (self.solver.get_core() or [])
+        return (self.assumptions)
+
+    def close(self):
+        if self.solver is not None:
+            self.solver.delete()
+            self.solver = None
+
+
+strategies = ['linear', 'parallel', 'exponential']
+
+
+def find_plan(domain, t_max, incremental=True, solver_name='minisat22',
+              strategy='linear', workers=None, cache=None, t_min=0,
+              decode=True, recorder=None, portfolio=None, preprocess=False,
+              lazy=None):
+    """Search the shortest horizon up to t_max that reaches the goal.
+
+    Returns the pair (t, solution), where solution lists the literals
+    of the model in string form. If no horizon up to t_max works, the
+    result is (None, 'UNSAT'). Horizons below t_min are not tried; pass
+    a proven lower bound there; the lower bound of domain.reachability
+    is applied anyway. With decode=False the solution is the
+    integer model in the numbering of domain.template, to be passed to
+    domain.extract_plan.
+
+    strategy selects how horizons are probed:
+
+    linear       0, 1, 2, ... one after another. incremental selects
+                 incremental solving, and solver_name the PySAT solver
+                 it uses; None forces the pycosat fallback.
+    parallel     several horizons at once in worker processes (workers,
+                 default: number of CPUs). Longer horizons are cancelled
+                 as soon as a shorter one is satisfiable, and a plan is
+                 only returned once all shorter horizons are refuted.
+    exponential  1, 2, 4, ... until a horizon is satisfiable, then binary
+                 search below it. This is only guaranteed to find the
+                 shortest plan if the goal stays reachable once reached,
+                 which holds for domains with idle actions such as the
+                 delivery and river crossing domains.
+
+    cache, a dimacs.InstanceCache, stores the complete formula of every
+    horizon on disk, so later runs load it instead of encoding it. It is
+    used wherever a horizon is solved as a whole, that is by all
+    strategies except incremental linear search.
+
+    portfolio, a portfolio.Portfolio, races several orderings of the
+    formula of every horizon in worker processes. Like cache, it is used
+    wherever a horizon is solved as a whole, except by the parallel
+    strategy, which runs its probes in worker processes already.
+
+    With preprocess=True the formula of every horizon solved as a whole
+    is simplified first (see preprocess.py) and the model of the
+    simplified formula is extended back to all atoms. The incremental
+    solvers keep their formulas as they are: clauses of later horizons
+    may mention any atom. Passing cache, portfolio or preprocess to
+    incremental or lazy linear search raises ValueError.
+
+    lazy, a lazy.LazyMutexes, makes linear search solve every horizon
+    without the mutex families of the domain and add their clauses only
+    where a model violates them. It counts the clauses added and those
+    of the eager encoding. Only linear search supports it.
+
+    recorder, a metrics.Recorder, receives a record for every horizon
+    tried, with the time spent encoding, converting, preprocessing,
+    solving and decoding, and the size of the formula.
+    """
+    if strategy not in strategies:
+        raise ValueError("unknown strategy %r" % strategy)
+    if recorder is None:
+        recorder = disabled
+    if strategy == 'parallel' and portfolio is not None:
+        raise ValueError("the parallel strategy cannot use a portfolio")
+    if strategy != 'linear' and lazy is not None:
+        raise ValueError("only linear search generates mutexes lazily")
+    if strategy == 'linear' and (incremental or lazy is not None):
+        for option, value in [('cache', cache), ('portfolio', portfolio),
+                              ('preprocess', preprocess or None)]:
+            if value is not None:
+                raise ValueError("%s needs horizons solved as a whole; use "
+                                 "incremental=False or another strategy"
+                                 % option)
+    bound = domain.lower_bound()
+    if bound is None or bound > t_max:
+        return (None, 'UNSAT')
+    t_min = max(t_min, bound)
+    if strategy == 'parallel':
+        t, model = _find_plan_parallel(domain, t_max, workers, cache, t_min,
+                                       recorder, preprocess)
+    elif strategy == 'exponential':
+        t, model = _find_plan_exponential(domain, t_max, cache, t_min,
+                                          recorder, portfolio, preprocess)
+    elif lazy is not None:
+        t, model = _find_plan_lazy(domain, t_max, solver_name, lazy, t_min,
+                                   recorder)
+    elif incremental:
+        t, model = _find_plan_incremental(domain, t_max, solver_name, t_min,
+                                          recorder)
+    elif cache is not None:
+        t, model = _find_plan_cached(domain, t_max, cache, t_min, recorder,
+                                     portfolio, preprocess)
+    else:
+        t, model = _find_plan_from_scratch(domain, t_max, t_min, recorder,
+                                           portfolio, preprocess)
+    if t is not None and strategy != 'linear':
+        # The last record belongs to whatever horizon was probed last.
+        recorder.start(domain.name, t, strategy=strategy, step='decode')
+    if t is None or not decode:
+        return (t, model)
+    with recorder.phase('decode'):
+        solution = domain.template.to_names(model)
+    recorder.flush()
+    return (t, solution)
+
+
+def iter_plans(domain, t_max, limit=None, timeout=None,
+               solver_name='minisat22', t_min=0, horizon=None):
+    """Generate the distinct shortest plans of domain, as plan.Plan.
+
+    The shortest horizon up to t_max is searched with find_plan unless
+    horizon gives the horizon whose plans to list. Every model found
+    is blocked by a clause over the action atoms only, so models that
+    differ in fluents or auxiliary atoms alone do not repeat a plan.
+    Nothing but the blocking clauses is kept between plans.
+
+    limit stops the enumeration after that many plans, timeout after
+    that many seconds; the time is checked between two solver calls.
+    Like find_plan the solver is PySAT's solver_name if available; the
+    pycosat fallback solves the formula anew for every plan.
+    """
+    start = time.perf_counter()
+    t = horizon
+    if t is None:
+        t, _ = find_plan(domain, t_max, solver_name=solver_name,
+                         t_min=t_min, decode=False)
+        if t is None:
+            return
+    template = domain.template
+    decoder = domain.decoder
+    fixed = set(abs(c[0]) for s in range(0, t + 1)
+                for c in template.to_numbers(domain.fixed(s)))
+    projection = [v for v in decoder.action_variables(t) if v not in fixed]
+    solver = IncrementalSolver(solver_name)
+    try:
+        solver.add_clauses(domain.horizon_cnf(t))
+        found = 0
+        while limit is None or found < limit:
+            if timeout is not None and time.perf_counter() - start > timeout:
+                return
+            model = solver.solve()
+            if model == 'UNSAT':
+                return
+            found += 1
+            yield (decoder.decode(model, t))
+            n = len(model)
+            solver.add_clauses([[-v if v <= n and model[v - 1] > 0 else v
+                                 for v in projection]])
+    finally:
+        solver.close()
+
+
+def improving_plans(domain, t_max, solver_name='minisat22', t_min=0,
+                    recorder=disabled):
+    """Generate ever better results of the search up to horizon t_max.
+
+    A pair (t, model) is a plan of horizon t, each shorter than the one
+    before; a pair (t, None) states that no plan is shorter than t. A
+    first plan is searched at the horizons t_min, 2 t_min, 4 t_min, ...
+    and then incremental linear search proves the shortest, counting
+    the bound up. When the generator is exhausted, the last plan is the
+    shortest one up to t_max (if there is any), so a caller stopping
+    early keeps the best plan found so far and a lower bound.
+    """
+    bound = domain.lower_bound()
+    if bound is None or bound > t_max:
+        yield (t_max + 1, None)
+        return
+    t_min = max(t_min, bound)
+    yield (t_min, None)
+    best = None
+    t = t_min
+    while best is None:
+        solution = _probe(domain, t, recorder=recorder, strategy='anytime')
+        if (solution != 'UNSAT'):
+            best = t
+            yield (t, solution)
+        elif t == t_max:
+            break
+        else:
+            # Unsatisfiable horizons only bound the plan from below if
+            # all shorter ones are, too.
+            t = min(t_max, max(1, 2 * t))
+    if best == t_min:
+        return
+    upper = t_max if best is None else best - 1
+    for t, solution in _incremental_horizons(domain, upper, solver_name,
+                                             t_min, recorder):
+        if (solution != 'UNSAT'):
+            yield (t, solution)
+        else:
+            yield (t + 1, None)
+    recorder.flush()
+
+
+def _solve(clauses, recorder=disabled, portfolio=None, preprocess=False):
+    """Solve a complete formula, simplified first if preprocess is set."""
+    solve = portfolio.solve if portfolio is not None else pycosat.solve
+    if not preprocess:
+        with recorder.phase('solve'):
+            return (solve(clauses))
+    with recorder.phase('preprocess'):
+        simplified = _simplify(clauses)
+    recorder.finish(simplified=len(simplified.clauses),
+                    reduction=round(simplified.reduction, 4))
+    if simplified.unsat:
+        return ('UNSAT')
+    with recorder.phase('solve'):
+        solution = solve(simplified.clauses)
+    with recorder.phase('preprocess'):
+        return (simplified.extend(solution))
+
+
+def _find_plan_from_scratch(domain, t_max, t_min=0, recorder=disabled,
+                            portfolio=None, preprocess=False):
+    atoms = domain.atoms
+    # The axioms up to time t, converted once per step
+    steps = CNF.from_names(domain.fixed(0), atoms)
+    for t in range(0, t_max + 1):
+        if t > 0:
+            steps.mark()
+        if t < t_min:
+            steps.extend_names(domain.movement_axioms(t)
+                               + domain.fixed(t + 1), atoms)
+            continue
+        recorder.start(domain.name, t, strategy='from_scratch')
+        with recorder.phase('encode'):
+            axioms = domain.movement_axioms(t) + domain.fixed(t + 1)
+            goal = domain.initial_state + domain.goal(t)
+        with recorder.phase('convert'):
+            steps.extend_names(axioms, atoms)
+            clauses = steps.copy()
+            clauses.extend_names(goal, atoms)
+        solution = _solve(clauses, recorder, portfolio, preprocess)
+        recorder.finish(solution, len(clauses), len(atoms))
+        if (solution != 'UNSAT'):
+            with recorder.phase('decode'):
+                # Renumbered like the models of the other strategies
+                template = domain.template
+                model = [-v for v in range(1, (t + 2) * template.width + 1)]
+                for l in template.to_numbers([atoms.to_names(solution)])[0]:
+                    model[abs(l) - 1] = l
+            return (t, model)
+    recorder.flush()
+    return (None, 'UNSAT')
+
+
+def _find_plan_incremental(domain, t_max, solver_name, t_min=0,
+                           recorder=disabled):
+    horizons = _incremental_horizons(domain, t_max, solver_name, t_min,
+                                     recorder)
+    try:
+        for t, solution in horizons:
+            if (solution != 'UNSAT'):
+                return (t, solution)
+    finally:
+        horizons.close()
+    recorder.flush()
+    return (None, 'UNSAT')
+
+
+def _incremental_horizons(domain, t_max, solver_name, t_min=0,
+                          recorder=disabled):
+    """Generate the pairs (t, solution) of the horizons from t_min up to
+    the first satisfiable one, solved incrementally."""
+    atoms = domain.template
+    solver = IncrementalSolver(solver_name)
+    try:
+        clauses = atoms.to_numbers(domain.initial_state + domain.fixed(0))
+        solver.add_clauses(clauses)
+        total = len(clauses)
+        for t in range(0, t_max + 1):
+            if t < t_min:
+                clauses = (atoms.instantiate(t)
+                           + atoms.to_numbers(domain.fixed(t + 1)))
+                solver.add_clauses(clauses)
+                total += len(clauses)
+                continue
+            recorder.start(domain.name, t, strategy='incremental')
+            with recorder.phase('encode'):
+                clauses = (atoms.instantiate(t)
+                           + atoms.to_numbers(domain.fixed(t + 1)))
+                solver.add_clauses(clauses)
+                total += len(clauses)
+                goal = domain.goal(t)
+            # goal_t holds if the activation atom is assumed
+            active = atoms.var('__goal', t)
+            with recorder.phase('convert'):
+                goal = atoms.to_numbers(goal)
+            solver.add_clauses([c + [-active] for c in goal])
+            total += len(goal)
+            with recorder.phase('solve'):
+                solution = solver.solve([active])
+            recorder.finish(solution, total, (t + 2) * atoms.width)
+            yield (t, solution)
+            if (solution != 'UNSAT'):
+                return
+            # Horizon t is too short; its goal never needs to hold again.
+            solver.add_clauses([[-active]])
+            total += 1
+    finally:
+        solver.close()
+
+
+def _find_plan_lazy(domain, t_max, solver_name, lazy, t_min=0,
+                    recorder=disabled):
+    atoms = domain.template
+    solver = IncrementalSolver(solver_name)
+    try:
+        clauses = atoms.to_numbers(domain.initial_state + domain.fixed(0))
+        solver.add_clauses(clauses)
+        total = len(clauses)
+        for t in range(0, t_max + 1):
+            clauses = (lazy.relaxed_clauses(domain, t)
+                       + atoms.to_numbers(domain.fixed(t + 1)))
+            solver.add_clauses(clauses)
+            total += len(clauses)
+            lazy.count_eager(domain, t)
+            if t < t_min:
+                continue
+            recorder.start(domain.name, t, strategy='lazy')
+            active = atoms.var('__goal', t)
+            with recorder.phase('convert'):
+                goal = atoms.to_numbers(domain.goal(t))
+            solver.add_clauses([c + [-active] for c in goal])
+            total += len(goal)
+            added = 0
+            while True:
+                with recorder.phase('solve'):
+                    solution = solver.solve([active])
+                if (solution == 'UNSAT'):
+                    break
+                with recorder.phase('refine'):
+                    clauses = lazy.violated(domain, solution, t)
+                if not clauses:
+                    break
+                solver.add_clauses(clauses)
+                added += len(clauses)
+            total += added
+            recorder.finish(solution, total, (t + 2) * atoms.width,
+                            lazy=added)
+            if (solution != 'UNSAT'):
+                return (t, solution)
+            solver.add_clauses([[-active]])
+            total += 1
+        recorder.flush()
+        return (None, 'UNSAT')
+    finally:
+        solver.close()
+
+
+def _find_plan_cached(domain, t_max, cache, t_min=0, recorder=disabled,
+                      portfolio=None, preprocess=False):
+    for t in range(t_min, t_max + 1):
+        solution = _probe(domain, t, cache, recorder, 'cached', portfolio,
+                          preprocess)
+        if (solution != 'UNSAT'):
+            return (t, solution)
+    recorder.flush()
+    return (None, 'UNSAT')
+
+
+def _probe(domain, t, cache=None, recorder=disabled, strategy=None,
+           portfolio=None, preprocess=False):
+    recorder.start(domain.name, t, strategy=strategy)
+    with recorder.phase('encode'):
+        if cache is not None:
+            clauses = CNF(cache.clauses(domain, t))
+        else:
+            clauses = domain.horizon_cnf(t)
+    solution = _solve(clauses, recorder, portfolio, preprocess)
+    recorder.finish(solution, len(clauses), (t + 2) * domain.template.width)
+    if portfolio is not None:
+        recorder.finish(winner=portfolio.winner)
+    return (solution)
+
+
+def _probe_worker(domain, t, connection, cache=None, record=False,
+                  preprocess=False):
+    recorder = Recorder() if record else disabled
+    solution = _probe(domain, t, cache, recorder, 'parallel',
+                      preprocess=preprocess)
+    recorder.flush()
+    connection.send((solution, recorder.records))
+    connection.close()
+
+
+def _find_plan_exponential(domain, t_max, cache=None, t_min=0,
+                           recorder=disabled, portfolio=None,
+                           preprocess=False):
+    if t_min > t_max:
+        return (None, 'UNSAT')
+    # Find a satisfiable horizon hi by doubling; lo is the longest
+    # horizon known to be unsatisfiable.
+    lo, hi, best = t_min - 1, t_min, None
+    while best is None:
+        solution = _probe(domain, hi, cache, recorder, 'exponential',
+                          portfolio, preprocess)
+        if (solution != 'UNSAT'):
+            best = (hi, solution)
+        elif hi == t_max:
+            return (None, 'UNSAT')
+        else:
+            lo, hi = hi, min(t_max, max(1, 2 * hi))
+    while best[0] - lo > 1:
+        mid = (lo + best[0]) // 2
+        solution = _probe(domain, mid, cache, recorder, 'exponential',
+                          portfolio, preprocess)
+        if (solution != 'UNSAT'):
+            best = (mid, solution)
+        else:
+            lo = mid
+    return (best)
+
+
+def _find_plan_parallel(domain, t_max, workers=None, cache=None, t_min=0,
+                        recorder=disabled, preprocess=False):
+    # The template is compiled here, before the workers are started.
+    domain.template
+    workers = workers or os.cpu_count() or 1
+    running = {}
+    unsat = set(range(t_min))
+    best = None
+    next_t = t_min
+    try:
+        while True:
+            while (len(running) < workers and next_t <= t_max
+                   and (best is None or next_t < best[0])):
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                p = multiprocessing.Process(target=_probe_worker,
+                                            args=(domain, next_t, sender,
+                                                  cache, recorder.enabled,
+                                                  preprocess))
+                p.daemon = True
+                p.start()
+                sender.close()
+                running[receiver] = (next_t, p)
+                next_t += 1
+            if best is not None and all(t in unsat for t in range(best[0])):
+                return (best)
+            if not running:
+                return (None, 'UNSAT')
+            for receiver in multiprocessing.connection.wait(list(running)):
+                t, p = running.pop(receiver)
+                try:
+                    solution, records = receiver.recv()
+                except EOFError:
+                    raise RuntimeError("probe of horizon %d failed" % t)
+                finally:
+                    receiver.close()
+                    p.join()
+                for record in records:
+                    recorder.add(record)
+                if (solution == 'UNSAT'):
+                    unsat.add(t)
+                elif best is None or t < best[0]:
+                    best = (t, solution)
+            if best is not None:
+                # Longer horizons cannot give a shorter plan any more.
+                for receiver in [r for r in running
+                                 if running[r][0] > best[0]]:
+                    _cancel(running.pop(receiver))
+    finally:
+        for receiver in list(running):
+            _cancel(running.pop(receiver))
+
+
+def _cancel(probe):
+    t, p = probe
+    p.terminate()
+    p.join()
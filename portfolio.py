@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Racing differently ordered copies of a formula in worker processes.
+
+How fast PicoSAT solves a formula depends a lot on the order of its
+variables and clauses, and that order is an accident of how the
+axioms were generated. A Portfolio starts one worker process per
+strategy on the same formula; the first answer wins and the other
+workers are killed. A strategy may
+
+    rename the variables by a random permutation (permute)
+    shuffle the clauses and the literals in them (shuffle)
+    give pycosat a propagation limit (prop_limit) and, whenever it is
+    exceeded, start again on a new shuffle with twice the limit
+
+Models are renamed back before they are returned. Portfolio.wins
+counts how often every strategy won, so the portfolio can be tuned to
+a domain (see benchmarks/bench_portfolio.py).
+"""
+
+from __future__ import print_function
+import multiprocessing
+import multiprocessing.connection
+import os
+import random
+import time
+
+import pycosat
+
+
+class Strategy(object):
+    """One way of ordering and solving a formula."""
+
+    def __init__(self, name, seed=0, permute=False, shuffle=False,
+                 prop_limit=0):
+        self.name = name
+        self.seed = seed
+        self.permute = permute
+        self.shuffle = shuffle
+        self.prop_limit = prop_limit
+
+    def __repr__(self):
+        return ('Strategy(%r)' % self.name)
+
+    def solve(self, clauses):
+        """Solve clauses in the order of this strategy."""
+        rng = random.Random(self.seed)
+        limit = self.prop_limit
+        shuffle = self.shuffle
+        while True:
+            renamed, back = _reorder(clauses, rng, self.permute, shuffle)
+            solution = pycosat.solve(renamed, prop_limit=limit)
+            if solution != 'UNKNOWN':
+                break
+            # Start again on a new order with a larger limit
+            limit *= 2
+            shuffle = True
+        if solution == 'UNSAT' or back is None:
+            return (solution)
+        model = [0] * len(back)
+        for l in solution:
+            v = back[abs(l)]
+            model[v - 1] = v if l > 0 else -v
+        return ([l for l in model if l != 0])
+
+
+def _reorder(clauses, rng, permute, shuffle):
+    """Return the reordered clauses and the map from new variables back
+    to old ones (None if the variables are kept)."""
+    back = None
+    if permute:
+        n = 0
+        for c in clauses:
+            for l in c:
+                if abs(l) > n:
+                    n = abs(l)
+        new = list(range(1, n + 1))
+        rng.shuffle(new)
+        new.insert(0, 0)
+        back = [0] * (n + 1)
+        for v in range(1, n + 1):
+            back[new[v]] = v
+        clauses = [[new[l] if l > 0 else -new[-l] for l in c]
+                   for c in clauses]
+    if shuffle:
+        clauses = [list(c) for c in clauses]
+        for c in clauses:
+            rng.shuffle(c)
+        rng.shuffle(clauses)
+    return (clauses, back)
+
+
+def default_strategies(n=4):
+    """The original order, restarts with a propagation limit and n - 2
+    random orders."""
+    strategies = [Strategy('original'),
+                  Strategy('restarts', seed=1, shuffle=True,
+                           prop_limit=20000)]
+    for i in range(max(0, n - 2)):
+        strategies.append(Strategy('shuffle%d' % i, seed=100 + i,
+                                   permute=True, shuffle=True))
+    return (strategies[:n])
+
+
+def _worker(strategy, clauses, connection):
+    start = time.perf_counter()
+    solution = strategy.solve(clauses)
+    connection.send((solution, time.perf_counter() - start))
+    connection.close()
+
+
+class Portfolio(object):
+    """Races strategies on every formula passed to solve.
+
+    At most workers strategies (default: all) run at once; the others
+    are left out. wins counts the races won by every strategy.
+    """
+
+    def __init__(self, strategies=None, workers=None):
+        self.strategies = list(strategies or default_strategies(
+            workers or os.cpu_count() or 1))
+        self.workers = workers or len(self.strategies)
+        self.wins = dict((s.name, 0) for s in self.strategies)
+        self.winner = None
+        self.races = 0
+
+    def solve(self, clauses):
+        """Solve clauses like pycosat.solve, with the first strategy
+        that finishes. Its name is stored in winner."""
+        self.races += 1
+        strategies = self.strategies[:self.workers]
+        if len(strategies) == 1:
+            self.winner = strategies[0].name
+            self.wins[self.winner] += 1
+            return (strategies[0].solve(clauses))
+        running = {}
+        try:
+            for s in strategies:
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                p = multiprocessing.Process(target=_worker,
+                                            args=(s, clauses, sender))
+                p.daemon = True
+                p.start()
+                sender.close()
+                running[receiver] = (s, p)
+            while running:
+                for receiver in multiprocessing.connection.wait(
+                        list(running)):
+                    s, p = running.pop(receiver)
+                    try:
+                        solution, _ = receiver.recv()
+                    except EOFError:
+                        # The worker died; the others may still answer.
+                        continue
+                    finally:
+                        receiver.close()
+                        p.join()
+                    self.winner = s.name
+                    self.wins[s.name] += 1
+                    return (solution)
+            raise RuntimeError("all portfolio workers failed")
+        finally:
+            for receiver in list(running):
+                s, p = running.pop(receiver)
+                p.terminate()
+                p.join()
+                receiver.close()
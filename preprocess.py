@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Simplification of integer CNF formulas before they are solved.
+
+The formula of a horizon carries a lot that the solver only has to
+rediscover: the initial state consists of unit clauses that decide the
+fluents of time 0 and through the frame axioms many atoms of the early
+steps, and the auxiliary atoms of the cardinality encodings are defined
+by a few short clauses each. preprocess() removes such parts with
+
+    unit propagation        fixing the literals of unit clauses
+    pure literals           fixing atoms that occur with one sign only
+    subsumption             dropping clauses that contain another
+                            clause, and removing a literal l from a
+                            clause D if D contains C - {l} for a clause
+                            C with -l (self-subsuming resolution)
+    variable elimination    replacing the clauses of an atom by their
+                            resolvents if there are no more of them
+                            (Eén and Biere 2005)
+
+The result is a Simplified formula, equisatisfiable with the original
+one. Its extend() turns a model of the simplified clauses back into a
+model of the original ones: fixed atoms take their values and
+eliminated atoms are set, in reverse order of elimination, so that
+their removed clauses hold. Atoms listed in frozen keep their
+occurrences, so clauses over them may still be added later.
+"""
+
+from __future__ import print_function
+import time
+
+import pycosat
+
+
+class _Unsat(Exception):
+    pass
+
+
+class Simplified(object):
+    """A simplified formula and what is needed to extend its models.
+
+    clauses is the simplified formula over the variables of the
+    original one (they are not renumbered), unsat is True if
+    preprocessing refuted the formula already. counts lists how many
+    units, pure literals, subsumed and strengthened clauses and
+    eliminated variables were found, and time the seconds it took.
+    """
+
+    def __init__(self, clauses, variables, original, fixed, stack, counts,
+                 unsat=False, elapsed=0.0):
+        self.clauses = clauses
+        self.variables = variables
+        self.original = original
+        self.fixed = fixed
+        self.stack = stack
+        self.counts = counts
+        self.unsat = unsat
+        self.time = elapsed
+
+    @property
+    def reduction(self):
+        """Fraction of the original clauses removed."""
+        if not self.original:
+            return (0.0)
+        return (1.0 - float(len(self.clauses)) / self.original)
+
+    def extend(self, solution):
+        """Model of the original formula from a model of clauses."""
+        if self.unsat or solution == 'UNSAT':
+            return ('UNSAT')
+        value = [False] * (self.variables + 1)
+        for l in solution:
+            if abs(l) <= self.variables:
+                value[abs(l)] = l > 0
+        for v, l in self.fixed.items():
+            value[v] = l > 0
+        for v, clauses in reversed(self.stack):
+            # v is true iff one of its positive clauses needs it
+            value[v] = False
+            for c in clauses:
+                if not any(value[l] if l > 0 else not value[-l]
+                           for l in c):
+                    value[v] = True
+                    break
+        return ([v if value[v] else -v
+                 for v in range(1, self.variables + 1)])
+
+    def solve(self, solve=pycosat.solve):
+        """Solve with solve (like pycosat.solve) and extend the model."""
+        if self.unsat:
+            return ('UNSAT')
+        return (self.extend(solve(self.clauses)))
+
+
+def preprocess(clauses, frozen=(), eliminate=True, occurrence_limit=10,
+               resolvent_limit=16, rounds=3):
+    """Simplify an integer CNF formula; returns a Simplified.
+
+    Variables are only eliminated if neither sign occurs in more than
+    occurrence_limit clauses and no resolvent is longer than
+    resolvent_limit. The techniques are repeated for at most rounds
+    rounds while they keep removing clauses.
+    """
+    start = time.perf_counter()
+    formula = _Formula(frozen)
+    try:
+        for c in clauses:
+            formula.original += 1
+            formula.add(c)
+        formula.propagate()
+        for _ in range(rounds):
+            before = formula.live
+            formula.subsume()
+            formula.propagate()
+            formula.pure()
+            if eliminate:
+                formula.eliminate(occurrence_limit, resolvent_limit)
+                formula.propagate()
+            if formula.live == before:
+                break
+        unsat = False
+        result = [c for c in formula.clauses if c is not None]
+    except _Unsat:
+        unsat = True
+        result = [[]]
+    return (Simplified(result, formula.variables, formula.original,
+                       formula.value, formula.stack, formula.counts, unsat,
+                       time.perf_counter() - start))
+
+
+class _Formula(object):
+    """Clauses with occurrence lists; removed clauses become None."""
+
+    def __init__(self, frozen=()):
+        self.frozen = set(abs(v) for v in frozen)
+        self.clauses = []
+        self.occurs = {}
+        self.value = {}
+        self.stack = []
+        self.queue = []
+        self.live = 0
+        self.original = 0
+        self.variables = 0
+        self.counts = dict(units=0, pure=0, subsumed=0, strengthened=0,
+                           eliminated=0)
+
+    def add(self, c):
+        c = list(set(c))
+        for l in c:
+            if abs(l) > self.variables:
+                self.variables = abs(l)
+        for l in c:
+            if -l in c:
+                return
+        if not c:
+            raise _Unsat()
+        i = len(self.clauses)
+        self.clauses.append(c)
+        self.live += 1
+        for l in c:
+            self.occurs.setdefault(l, set()).add(i)
+        if len(c) == 1:
+            self.queue.append(c[0])
+
+    def remove(self, i):
+        for l in self.clauses[i]:
+            self.occurs[l].discard(i)
+        self.clauses[i] = None
+        self.live -= 1
+
+    def strengthen(self, i, l):
+        """Remove literal l from clause i."""
+        c = self.clauses[i]
+        c.remove(l)
+        self.occurs[l].discard(i)
+        if not c:
+            raise _Unsat()
+        if len(c) == 1:
+            self.queue.append(c[0])
+
+    def assign(self, l):
+        self.value[abs(l)] = l
+        for i in list(self.occurs.get(l, ())):
+            self.remove(i)
+        for i in list(self.occurs.get(-l, ())):
+            self.strengthen(i, -l)
+
+    def propagate(self):
+        while self.queue:
+            l = self.queue.pop()
+            fixed = self.value.get(abs(l))
+            if fixed is not None:
+                if fixed != l:
+                    raise _Unsat()
+                continue
+            self.counts['units'] += 1
+            self.assign(l)
+
+    def pure(self):
+        for v in range(1, self.variables + 1):
+            if v in self.value or v in self.frozen:
+                continue
+            positive = self.occurs.get(v)
+            negative = self.occurs.get(-v)
+            if positive and not negative:
+                self.counts['pure'] += 1
+                self.assign(v)
+            elif negative and not positive:
+                self.counts['pure'] += 1
+                self.assign(-v)
+
+    def subsume(self):
+        """Backward subsumption and self-subsuming resolution with every
+        clause, shortest clauses first."""
+        clauses = self.clauses
+        occurs = self.occurs
+        order = sorted((i for i in range(len(clauses))
+                        if clauses[i] is not None),
+                       key=lambda i: len(clauses[i]))
+        for i in order:
+            c = clauses[i]
+            if c is None:
+                continue
+            size = len(c)
+            literals = set(c)
+            # Clauses containing c all contain its rarest literal
+            rarest = min(c, key=lambda l: len(occurs[l]))
+            for j in list(occurs[rarest]):
+                d = clauses[j]
+                if j != i and len(d) >= size and literals.issubset(d):
+                    self.remove(j)
+                    self.counts['subsumed'] += 1
+            for l in c:
+                rest = literals - set([l])
+                for j in list(occurs.get(-l, ())):
+                    d = clauses[j]
+                    if (d is not None and len(d) >= size
+                            and rest.issubset(d)):
+                        self.strengthen(j, -l)
+                        self.counts['strengthened'] += 1
+
+    def eliminate(self, occurrence_limit, resolvent_limit):
+        occurs = self.occurs
+        clauses = self.clauses
+
+        def cost(v):
+            return (len(occurs.get(v, ())) * len(occurs.get(-v, ())))
+        candidates = [v for v in range(1, self.variables + 1)
+                      if v not in self.value and v not in self.frozen]
+        for v in sorted(candidates, key=cost):
+            if v in self.value or self.queue:
+                # Units are propagated before anything else is tried.
+                self.propagate()
+                if v in self.value:
+                    continue
+            positive = [clauses[i] for i in occurs.get(v, ())]
+            negative = [clauses[i] for i in occurs.get(-v, ())]
+            if not positive and not negative:
+                continue
+            if (len(positive) > occurrence_limit
+                    or len(negative) > occurrence_limit):
+                continue
+            resolvents = self._resolvents(v, positive, negative,
+                                          len(positive) + len(negative),
+                                          resolvent_limit)
+            if resolvents is None:
+                continue
+            self.stack.append((v, [[l for l in c if l != v]
+                                   for c in positive]))
+            for i in list(occurs.get(v, ())) + list(occurs.get(-v, ())):
+                self.remove(i)
+            for r in resolvents:
+                self.add(r)
+            self.counts['eliminated'] += 1
+
+    def _resolvents(self, v, positive, negative, bound, resolvent_limit):
+        """Non-tautological resolvents on v, or None if there are more
+        than bound of them or one is too long."""
+        resolvents = []
+        for p in positive:
+            rest = set(p)
+            rest.discard(v)
+            for n in negative:
+                r = set(rest)
+                tautology = False
+                for l in n:
+                    if l == -v:
+                        continue
+                    if -l in r:
+                        tautology = True
+                        break
+                    r.add(l)
+                if tautology:
+                    continue
+                if len(r) > resolvent_limit or len(resolvents) == bound:
+                    return (None)
+                resolvents.append(list(r))
+        return (resolvents)
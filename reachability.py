@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Forward reachability analysis of planning domains.
+
+A Reachability tells for every time step which atoms may be true and
+which may be false in some execution from the initial state. Atoms
+that cannot be true at time t are fixed to false there, atoms that
+cannot be false to true, and the goal cannot hold before the first
+step at which each of its clauses has a possible literal. The planner
+uses that step as lower bound of the horizon and the fixed atoms to
+simplify the formula of every horizon (see planner.Domain).
+
+There are two ways to compute one:
+
+    explore         breadth-first search over an explicit state space,
+                    given by the successors of every state. Exact per
+                    atom, for small state spaces such as the states
+                    table of wolf_goat_cabbage.py or the robot and mail
+                    locations of delivery.py.
+    planning_graph  the relaxed planning graph of a StripsProblem:
+                    fluents that can be added or deleted by actions
+                    whose preconditions may hold. Deletes never hide a
+                    fluent and actions never exclude each other, so the
+                    graph over-approximates every step semantics.
+
+Both are sound: an atom is only fixed if no execution, and therefore no
+plan, gives it the other value.
+"""
+
+from template import split_atom
+
+
+class Reachability(object):
+    """Atoms that may be true and atoms that may be false at every time.
+
+    layers[t] is the pair (may_true, may_false) of sets of atom names
+    without time index at time t. From layer cycle on the layers repeat,
+    so layer t for t >= len(layers) is that of cycle + (t - cycle) % p,
+    with p = len(layers) - cycle. Atoms not listed in atoms are never
+    fixed. states[t], if given, lists the sets of fluents true in the
+    states reachable at time t; the goal is then checked on every state
+    as a whole rather than atom by atom.
+    """
+
+    def __init__(self, atoms, layers, cycle=None, states=None):
+        self.atoms = sorted(atoms)
+        self._known = set(self.atoms)
+        self.layers = layers
+        self.cycle = len(layers) - 1 if cycle is None else cycle
+        self.states = states
+        # Fluents the states tell about; other atoms are not checked
+        self._fluents = set()
+        for layer in states or ():
+            for true in layer:
+                self._fluents.update(true)
+
+    def layer(self, t):
+        if t >= len(self.layers):
+            period = len(self.layers) - self.cycle
+            t = self.cycle + (t - self.cycle) % period
+        return (self.layers[t])
+
+    def fixed(self, t):
+        """Unit clauses for the atoms at time t that have one value only."""
+        may_true, may_false = self.layer(t)
+        return ([['~%s_%d' % (a, t)] for a in self.atoms
+                 if a not in may_true]
+                + [['%s_%d' % (a, t)] for a in self.atoms
+                   if a not in may_false])
+
+    def possible(self, literal):
+        """False if the literal 'name_t' or '~name_t' cannot hold."""
+        negative = literal[0] == '~'
+        name, t = split_atom(literal.lstrip('~'))
+        if name not in self._known:
+            return (True)
+        may_true, may_false = self.layer(t)
+        return (name in (may_false if negative else may_true))
+
+    def lower_bound(self, goal):
+        """First t at which every clause of goal(t) may hold, or None if
+        the goal is never reachable."""
+        for t in range(len(self.layers)):
+            clauses = goal(t)
+            if not all(any(self.possible(l) for l in c) for c in clauses):
+                continue
+            if self.states is None or any(self._satisfies(true, clauses)
+                                          for true in self.states[t]):
+                return (t)
+        return (None)
+
+    def _satisfies(self, true, clauses):
+        for c in clauses:
+            for l in c:
+                negative = l[0] == '~'
+                name = split_atom(l.lstrip('~'))[0]
+                if name not in self._fluents or (name in true) != negative:
+                    break
+            else:
+                return (False)
+        return (True)
+
+
+def explore(initial, successors, fluents, actions, holds=None):
+    """Reachability by breadth-first search from the state initial.
+
+    successors(state) yields the pairs (action, state) of the actions
+    executable in state; holds(state) returns the fluents true in
+    state (default: the state itself, a set of fluents). Every action
+    atom may be false; it may be true at t if it is executable in one
+    of the states reachable at t.
+    """
+    if holds is None:
+        holds = frozenset
+    fluents = set(fluents)
+    actions = set(actions)
+    frontier = frozenset([initial])
+    seen = {frontier: 0}
+    layers = []
+    states = []
+    while True:
+        taken = set()
+        following = set()
+        for state in frontier:
+            for action, s in successors(state):
+                taken.add(action)
+                following.add(s)
+        true = [frozenset(holds(s)) for s in frontier]
+        states.append(true)
+        may_true = set(taken)
+        may_false = set(actions)
+        for f in fluents:
+            if any(f in h for h in true):
+                may_true.add(f)
+            if not all(f in h for h in true):
+                may_false.add(f)
+        layers.append((may_true, may_false))
+        frontier = frozenset(following)
+        if frontier in seen:
+            return (Reachability(fluents | actions, layers, seen[frontier],
+                                 states))
+        seen[frontier] = len(layers)
+
+
+def planning_graph(problem):
+    """Reachability of the relaxed planning graph of a StripsProblem."""
+    may_true = set(problem.init)
+    may_false = set(problem.fluents) - may_true
+    names = set(a.name for a in problem.actions)
+    layers = []
+    while True:
+        possible = []
+        for a in problem.actions:
+            positive, negative = a.requires()
+            if (all(f in may_true for f in positive)
+                    and all(f in may_false for f in negative)):
+                possible.append(a)
+        layers.append((may_true | set(a.name for a in possible),
+                       may_false | names))
+        added = may_true.union(*[a.add for a in possible])
+        deleted = may_false.union(*[a.delete for a in possible])
+        if added == may_true and deleted == may_false:
+            return (Reachability(set(problem.fluents) | names, layers))
+        may_true, may_false = added, deleted
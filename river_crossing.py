@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""River crossing puzzles with any number of items and boat capacity.
+
+wolf_goat_cabbage.py enumerates the states of its puzzle by hand. Here
+the state is factored instead: one atom per item and time step tells on
+which bank the item is ('<item>_at_b_t'; false means bank a), and one
+more tells where the ferryman is ('ferry_at_b_t'). The size of the
+encoding therefore grows linearly with the number of items, while the
+number of states grows as 2^(N+1).
+
+At every step the ferryman either stays ('~cross_t') or crosses the
+river ('cross_t'), taking along up to capacity items from his bank
+('carry_<item>_t'). A conflict (x, y) means that x must not be left
+alone with y without the ferryman; further guards listed in the
+conflict, as in (x, y, g), make the pair safe as well.
+
+Conflicts between groups are numeric: for a pair (A, B) of lists of
+items in outnumbering, the items of B must not outnumber those of A on
+a bank where any of A are, whether the ferryman is there or not. Both
+groups are counted per bank with cardinality.counter. With
+empty_crossings=False the ferryman never crosses alone, as when the
+passengers row the boat themselves.
+"""
+
+from __future__ import print_function
+
+from cardinality import at_most, counter, neg
+from planner import Domain
+
+
+class RiverCrossing(object):
+    """A river crossing puzzle, encoded in SAT per time step.
+
+    items lists the names of the items, conflicts the tuples
+    (x, y, guards...) and outnumbering the pairs of groups (A, B)
+    described above, and capacity how many items the boat carries
+    besides the ferryman.
+    """
+
+    def __init__(self, items, conflicts, capacity=1,
+                 name='river_crossing', outnumbering=(),
+                 empty_crossings=True):
+        for c in list(conflicts) + [a + b for (a, b) in outnumbering]:
+            for x in c:
+                if x not in items:
+                    raise ValueError("unknown item %r in conflict %r"
+                                     % (x, c))
+        self.items = list(items)
+        self.conflicts = [tuple(c) for c in conflicts]
+        self.outnumbering = [(list(a), list(b)) for (a, b) in outnumbering]
+        self.capacity = capacity
+        self.empty_crossings = empty_crossings
+        self.name = name
+        self.actions = ['cross'] + ['carry_%s' % x for x in self.items]
+
+    def movement_axioms(self, t, encoding='auto'):
+        """All movement axioms for time t."""
+        f0 = 'ferry_at_b_%d' % t
+        f1 = 'ferry_at_b_%d' % (t + 1)
+        cross = 'cross_%d' % t
+        # The ferryman changes sides exactly when he crosses
+        ferry = [ ['~' + cross, f0, f1]
+                , ['~' + cross, '~' + f0, '~' + f1]
+                , [cross, '~' + f0, f1]
+                , [cross, f0, '~' + f1]
+                ]
+        carry = []
+        if not self.empty_crossings:
+            carry += [['~' + cross]
+                      + ['carry_%s_%d' % (x, t) for x in self.items]]
+        for x in self.items:
+            x0 = '%s_at_b_%d' % (x, t)
+            x1 = '%s_at_b_%d' % (x, t + 1)
+            c = 'carry_%s_%d' % (x, t)
+            # Items are only carried when crossing, from the ferry's bank
+            carry += [ ['~' + c, cross]
+                     , ['~' + c, '~' + x0, f0]
+                     , ['~' + c, x0, '~' + f0]
+                     ]
+            # An item changes sides exactly when it is carried
+            carry += [ ['~' + c, x0, x1]
+                     , ['~' + c, '~' + x0, '~' + x1]
+                     , [c, '~' + x0, x1]
+                     , [c, x0, '~' + x1]
+                     ]
+        capacity = at_most(self.capacity,
+                           ['carry_%s_%d' % (x, t) for x in self.items],
+                           lambda i: 'capacity_aux%d_%d' % (i, t), encoding)
+        # Nobody gets eaten: for a conflict (x, y, guards) x and y are
+        # never on one bank without the ferryman or one of the guards.
+        safety = []
+        for c in self.conflicts:
+            here = ['%s_at_b_%d' % (x, t) for x in c]
+            safety += [['~' + here[0], '~' + here[1], f0] + here[2:]]
+            safety += [[here[0], here[1], '~' + f0]
+                       + ['~' + g for g in here[2:]]]
+        return (ferry + carry + capacity + safety
+                + self._outnumbering_axioms(t))
+
+    def _outnumbering_axioms(self, t):
+        """No group B outnumbers its group A on a bank at time t where
+        some of A are."""
+        clauses = []
+        for g, (a, b) in enumerate(self.outnumbering):
+            for bank in ['a', 'b']:
+                def here(x):
+                    l = '%s_at_b_%d' % (x, t)
+                    return (neg(l) if bank == 'a' else l)
+
+                def aux(tag):
+                    return (lambda i: 'count_%s%d_%s_aux%d_%d'
+                            % (tag, g, bank, i, t))
+                at_least_a, count_a = counter([here(x) for x in a],
+                                              aux('a'))
+                at_least_b, count_b = counter([here(x) for x in b],
+                                              aux('b'))
+                clauses += count_a + count_b
+                # k of A here (1 <= k < |B|) allow at most k of B
+                for k in range(1, min(len(a), len(b) - 1) + 1):
+                    clauses.append([neg(at_least_a[0]), neg(at_least_b[k])]
+                                   + ([at_least_a[k]] if k < len(a)
+                                      else []))
+        return (clauses)
+
+    def initial_state(self):
+        """Everybody starts on bank a."""
+        return ([['~ferry_at_b_0']]
+                + [['~%s_at_b_0' % x] for x in self.items])
+
+    def goal(self, t):
+        """Everybody is on bank b at time t."""
+        return ([['ferry_at_b_%d' % t]]
+                + [['%s_at_b_%d' % (x, t)] for x in self.items])
+
+    def domain(self):
+        return (Domain(self.name, self.movement_axioms,
+                       self.initial_state(), self.goal, self.actions))
+
+    def print_plan(self, plan):
+        """Print the crossings of a Plan."""
+        for s in range(len(plan)):
+            taken = plan.actions_at(s)
+            if 'cross' not in taken:
+                continue
+            cargo = [a[len('carry_'):] for a in taken if a != 'cross']
+            if 'ferry_at_b' in plan.state_at(s):
+                direction = 'b -> a'
+            else:
+                direction = 'a -> b'
+            print("%3d: %s with %s" % (s, direction,
+                                       ', '.join(cargo) or 'nothing'))
+
+
+#################################################################
+#
+# Instances
+#
+#################################################################
+
+def wolf_goat_cabbage():
+    """The puzzle of wolf_goat_cabbage.py."""
+    return (RiverCrossing(['wolf', 'goat', 'cabbage'],
+                          [('wolf', 'goat'), ('goat', 'cabbage')],
+                          name='wolf_goat_cabbage'))
+
+
+def food_chain(n, capacity=1):
+    """n items in a chain, where every item eats the next one."""
+    items = ['item%d' % i for i in range(n)]
+    return (RiverCrossing(items, list(zip(items, items[1:])), capacity,
+                          name='food_chain_%d_%d' % (n, capacity)))
+
+
+def free_items(n, capacity=1):
+    """n items without conflicts. The boat holds capacity of them, so
+    the ferryman has to shuttle back and forth."""
+    items = ['item%d' % i for i in range(n)]
+    return (RiverCrossing(items, [], capacity,
+                          name='free_items_%d_%d' % (n, capacity)))
+
+
+def missionaries_cannibals(n, capacity=2):
+    """n missionaries and n cannibals, who row the boat themselves. The
+    cannibals must never outnumber the missionaries on a bank where
+    there are any."""
+    missionaries = ['missionary%d' % i for i in range(n)]
+    cannibals = ['cannibal%d' % i for i in range(n)]
+    return (RiverCrossing(missionaries + cannibals, [], capacity,
+                          name='missionaries_cannibals_%d_%d'
+                          % (n, capacity),
+                          outnumbering=[(missionaries, cannibals)],
+                          empty_crossings=False))
+
+
+def jealous_couples(n, capacity=2):
+    """n couples; nobody may be with another's partner unless their own
+    partner is there, too. A ferryman rows the boat."""
+    husbands = ['husband%d' % i for i in range(n)]
+    wives = ['wife%d' % i for i in range(n)]
+    conflicts = [(husbands[j], wives[i], husbands[i])
+                 for i in range(n) for j in range(n) if i != j]
+    return (RiverCrossing(husbands + wives, conflicts, capacity,
+                          name='jealous_couples_%d_%d' % (n, capacity)))
+
+
+if __name__ == "__main__":
+    from planner import find_plan
+    puzzle = wolf_goat_cabbage()
+    domain = puzzle.domain()
+    t, model = find_plan(domain, 20, decode=False)
+    if model == 'UNSAT':
+        print("Not possible in up to 20 steps. :-(")
+    else:
+        print("Found a solution in %d steps:" % t)
+        puzzle.print_plan(domain.extract_plan(t, model))
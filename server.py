@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""A long-running process answering planning and diagnosis queries.
+
+Every query started as a script pays for a fresh interpreter, the
+imports and the encoding of its domain. The server keeps a
+domains.Catalog instead, so the domains stay compiled between queries,
+and a diagnosis.DiagnosisService per circuit, which keeps the circuit
+loaded in its solver and caches repeated observations.
+
+The protocol is JSON lines: every request is one JSON object on a line
+of its own and is answered by one line. The server reads from stdin
+and writes to stdout, or accepts connections on a Unix socket:
+
+    python server.py [--socket PATH] [--warm DOMAIN ...]
+
+A request names its operation in "op"; an "id" is copied to the
+response. Responses carry "ok": true and the result, or "ok": false and
+an "error" message.
+
+    ping       nothing
+    list       the domains and circuits known and those loaded
+    plan       shortest plan of "domain" (with "params") up to "t_max";
+               "strategy", "incremental", "solver_name", "t_min" and
+               "preprocess" are passed to find_plan, "preprocess"
+               with "incremental": false; "states": true adds the
+               fluents of every state
+    plans      all shortest plans, at most "limit" of them, within
+               "timeout" seconds (see planner.iter_plans)
+    diagnose   minimal diagnoses of "circuit" (with "params") for
+               "observations", by default those of the circuit;
+               "max_size", "max_count" and "minimality" are passed to
+               Circuit.diagnoses
+    stats      requests, errors and time spent per operation
+
+A plan is returned as "steps", the lists of actions of every time step.
+The actions of a step can be executed in the order listed; for the
+STRIPS domains (e.g. "fleet"), whose steps may hold actions that
+depend on each other, it comes from StripsProblem.linearize.
+
+For example
+
+    {"id": 1, "op": "plan", "domain": "delivery",
+     "params": {"mail_at": "r101", "target": "o103"}, "t_max": 20}
+
+is answered with
+
+    {"id": 1, "ok": true, "horizon": 8, "steps": [["north"], ...]}
+
+A lock makes the requests of all connections run one at a time. The
+Client class is the Python client of the socket server. At most
+max_services circuits keep a DiagnosisService; the least recently used
+one is closed when another is needed.
+"""
+
+from __future__ import print_function
+from collections import OrderedDict
+import json
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+from diagnosis import DiagnosisService
+from domains import Catalog, circuits, domains, key_of
+from planner import find_plan, iter_plans
+
+_plan_options = ['strategy', 'incremental', 'solver_name', 't_min',
+                 'preprocess']
+_diagnosis_options = ['max_size', 'max_count', 'minimality']
+
+
+def plan_to_json(plan, states=False, linearize=None):
+    """The steps of a Plan, each in the order linearize(plan) executes
+    them if given, and with states=True the states as well."""
+    steps = [plan.actions_at(s) for s in range(len(plan))]
+    if linearize is not None:
+        # linearize keeps the actions of every step together
+        sequence = linearize(plan)
+        start = 0
+        for s, step in enumerate(steps):
+            steps[s] = sequence[start:start + len(step)]
+            start += len(step)
+    result = dict(steps=steps)
+    if states:
+        result['states'] = [plan.state_at(s) for s in range(len(plan) + 1)]
+    return (result)
+
+
+class PlanningServer(object):
+    """Answers requests against domains and circuits kept in memory."""
+
+    def __init__(self, catalog=None, max_services=16):
+        self.catalog = catalog if catalog is not None else Catalog()
+        self.max_services = max_services
+        self.services = OrderedDict()
+        self.started = time.time()
+        self.counts = {}
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def close(self):
+        for service in self.services.values():
+            service.close()
+        self.services = OrderedDict()
+
+    def handle_line(self, line):
+        """The response line to a request line."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("a request must be a JSON object")
+        except ValueError as e:
+            with self.lock:
+                self.errors += 1
+            return (json.dumps(dict(ok=False, error=str(e))))
+        return (json.dumps(self.handle(request)))
+
+    def handle(self, request):
+        """The response to a decoded request."""
+        op = request.get('op')
+        start = time.perf_counter()
+        response = dict(ok=True)
+        if 'id' in request:
+            response['id'] = request['id']
+        method = getattr(self, 'op_%s' % op, None)
+        with self.lock:
+            try:
+                if method is None:
+                    raise ValueError("unknown op %r" % op)
+                response.update(method(request))
+            except Exception as e:
+                self.errors += 1
+                response['ok'] = False
+                response['error'] = '%s: %s' % (type(e).__name__, e)
+            if method is not None:
+                count, total = self.counts.get(op, (0, 0.0))
+                self.counts[op] = (count + 1,
+                                   total + time.perf_counter() - start)
+        return (response)
+
+    def _domain(self, request):
+        return (self.catalog.domain(request['domain'],
+                                    **request.get('params', {})))
+
+    def op_ping(self, request):
+        return ({})
+
+    def op_list(self, request):
+        loaded_domains, loaded_circuits = self.catalog.loaded()
+        return (dict(domains=list(domains), circuits=list(circuits),
+                     loaded=loaded_domains + loaded_circuits))
+
+    def op_plan(self, request):
+        domain = self._domain(request)
+        options = dict((k, request[k]) for k in _plan_options
+                       if k in request)
+        if options.get('preprocess'):
+            # Only horizons solved as a whole are preprocessed
+            options['incremental'] = False
+        t, model = find_plan(domain, request.get('t_max', 50),
+                             decode=False, **options)
+        if t is None:
+            return (dict(horizon=None))
+        result = plan_to_json(domain.extract_plan(t, model),
+                              request.get('states', False), domain.linearize)
+        result['horizon'] = t
+        return (result)
+
+    def op_plans(self, request):
+        domain = self._domain(request)
+        plans = [plan_to_json(p, request.get('states', False),
+                              domain.linearize)
+                 for p in iter_plans(domain, request.get('t_max', 50),
+                                     request.get('limit', 100),
+                                     request.get('timeout'),
+                                     t_min=request.get('t_min', 0),
+                                     horizon=request.get('horizon'))]
+        return (dict(horizon=len(plans[0]['steps']) if plans else None,
+                     count=len(plans), plans=plans))
+
+    def op_diagnose(self, request):
+        name = request['circuit']
+        params = request.get('params', {})
+        options = dict((k, request[k]) for k in _diagnosis_options
+                       if k in request)
+        axioms, components, observations = self.catalog.circuit(name,
+                                                                **params)
+        key = (key_of(name, params), json.dumps(options, sort_keys=True))
+        if key in self.services:
+            self.services.move_to_end(key)
+        else:
+            self.services[key] = DiagnosisService(axioms, components,
+                                                  **options)
+            while len(self.services) > self.max_services:
+                self.services.popitem(last=False)[1].close()
+        diagnoses = self.services[key].diagnose(
+            request.get('observations', observations))
+        return (dict(diagnoses=[list(d) for d in diagnoses]))
+
+    def op_stats(self, request):
+        hits = sum(s.hits for s in self.services.values())
+        return (dict(uptime=time.time() - self.started, errors=self.errors,
+                     requests=dict((op, dict(count=c, time=t))
+                                   for (op, (c, t)) in self.counts.items()),
+                     diagnosis_cache_hits=hits))
+
+    def serve(self, infile, outfile):
+        """Answer the request lines of infile on outfile until EOF."""
+        for line in infile:
+            if not line.strip():
+                continue
+            outfile.write(self.handle_line(line) + '\n')
+            outfile.flush()
+
+
+class _Connection(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.planning.handle_line(line.decode())
+            self.wfile.write((response + '\n').encode())
+
+
+class UnixServer(socketserver.ThreadingMixIn,
+                 socketserver.UnixStreamServer):
+    """Serves a PlanningServer on a Unix socket, a thread per
+    connection."""
+
+    daemon_threads = True
+
+    def __init__(self, path, planning):
+        if os.path.exists(path):
+            os.unlink(path)
+        self.planning = planning
+        socketserver.UnixStreamServer.__init__(self, path, _Connection)
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class Client(object):
+    """Sends requests to a server on a Unix socket or, without a path,
+    to a server process of its own on stdin and stdout."""
+
+    def __init__(self, path=None, warm=()):
+        self.process = None
+        self.socket = None
+        if path is None:
+            args = [sys.executable, os.path.abspath(__file__)]
+            for name in warm:
+                args += ['--warm', name]
+            self.process = subprocess.Popen(args, stdin=subprocess.PIPE,
+                                            stdout=subprocess.PIPE)
+            self.rfile = self.process.stdout
+            self.wfile = self.process.stdin
+        else:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(path)
+            self.rfile = self.socket.makefile('rb')
+            self.wfile = self.socket.makefile('wb')
+
+    def __enter__(self):
+        return (self)
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def send(self, request):
+        self.wfile.write((json.dumps(request) + '\n').encode())
+        self.wfile.flush()
+
+    def receive(self):
+        line = self.rfile.readline()
+        if not line:
+            raise EOFError("the server closed the connection")
+        return (json.loads(line.decode()))
+
+    def request(self, op, **fields):
+        """Send one request and return its response."""
+        fields['op'] = op
+        self.send(fields)
+        return (self.receive())
+
+    def close(self):
+        if self.process is not None:
+            self.wfile.close()
+            self.process.wait()
+            self.rfile.close()
+            self.process = None
+        if self.socket is not None:
+            self.rfile.close()
+            self.wfile.close()
+            self.socket.close()
+            self.socket = None
+
+
+def main(argv):
+    path = None
+    warm = []
+    args = list(argv)
+    while args:
+        a = args.pop(0)
+        if a == '--socket' and args:
+            path = args.pop(0)
+        elif a == '--warm' and args:
+            warm.append(args.pop(0))
+        else:
+            raise SystemExit("unknown option %r; use --socket PATH or "
+                             "--warm DOMAIN" % a)
+    planning = PlanningServer()
+    for name in warm:
+        planning.catalog.domain(name)
+    try:
+        if path is None:
+            planning.serve(sys.stdin, sys.stdout)
+            return
+        server = UnixServer(path, planning)
+        # Remove the socket when terminated as well
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    finally:
+        planning.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Planning problems given by STRIPS actions, with parallel steps.
+
+An Action has preconditions (fluents, negated with the prefix '~'), and
+adds and deletes fluents. StripsProblem compiles the actions into
+movement axioms for the planner: preconditions and effects of every
+action, and explanatory frame axioms stating that a fluent only changes
+if an action changes it.
+
+How many actions may share a time step depends on the semantics:
+
+    sequential  at most one action per step, so the horizon is the
+                plan length
+    forall      (forall-step) any set of actions none of which
+                interferes with another. Two actions interfere if one
+                of them falsifies a precondition of the other; such
+                actions can be executed in any order.
+    exists      (exists-step) actions are executed in a fixed order,
+                and only an action that falsifies a precondition of a
+                later one is excluded from its step. The order follows
+                the disabling graph, so that an action that disables
+                another one tends to come after it.
+
+The parallel semantics need fewer steps wherever independent actions
+can happen at the same time, e.g. when several robots move at once.
+linearize turns the steps of a Plan back into a sequence of actions
+(Rintanen, Heljanko and Niemelä 2006).
+
+Actions that all require and delete the same fluent, such as the moves
+of one robot out of one room, exclude each other pairwise. Such cliques
+are encoded with at_most_one, so the exclusions grow linearly with the
+number of actions in a clique rather than quadratically.
+"""
+
+from __future__ import print_function
+import functools
+
+from cardinality import at_most_one
+from fastsat import strongly_connected_components
+from planner import Domain
+from reachability import planning_graph
+
+step_semantics = ['sequential', 'forall', 'exists']
+
+
+class Action(object):
+    """A STRIPS action: preconditions, added and deleted fluents."""
+
+    def __init__(self, name, pre=(), add=(), delete=()):
+        self.name = name
+        self.pre = list(pre)
+        self.add = list(add)
+        self.delete = list(delete)
+
+    def __repr__(self):
+        return ('Action(%r, %r, %r, %r)'
+                % (self.name, self.pre, self.add, self.delete))
+
+    def requires(self):
+        """Fluents that must hold and fluents that must not hold."""
+        positive = [p for p in self.pre if p[0] != '~']
+        negative = [p[1:] for p in self.pre if p[0] == '~']
+        return (positive, negative)
+
+
+def disabling(actions):
+    """Pairs (i, j) of action indices where action i falsifies a
+    precondition of action j."""
+    deleters, adders = _falsifiers(actions)
+    pairs = set()
+    for j, b in enumerate(actions):
+        positive, negative = b.requires()
+        for f in positive:
+            pairs.update((i, j) for i in deleters.get(f, ()) if i != j)
+        for f in negative:
+            pairs.update((i, j) for i in adders.get(f, ()) if i != j)
+    return (pairs)
+
+
+def cliques(actions):
+    """Sets of action indices that all require and falsify one fluent.
+
+    Every action of such a set disables every other one.
+    """
+    deleters, adders = _falsifiers(actions)
+    requirers = {}
+    for j, b in enumerate(actions):
+        positive, negative = b.requires()
+        for f in positive:
+            requirers.setdefault(('+', f), []).append(j)
+        for f in negative:
+            requirers.setdefault(('-', f), []).append(j)
+    result = []
+    for (sign, f), js in sorted(requirers.items()):
+        falsifiers = set(deleters.get(f, ()) if sign == '+'
+                         else adders.get(f, ()))
+        clique = [j for j in js if j in falsifiers]
+        if len(clique) > 1:
+            result.append(clique)
+    return (result)
+
+
+def _falsifiers(actions):
+    deleters = {}
+    adders = {}
+    for i, a in enumerate(actions):
+        for f in a.delete:
+            deleters.setdefault(f, []).append(i)
+        for f in a.add:
+            adders.setdefault(f, []).append(i)
+    return (deleters, adders)
+
+
+class StripsProblem(object):
+    """A planning problem over fluents changed by STRIPS actions.
+
+    init lists the fluents true at time 0, all others are false; goal
+    lists fluent literals that must hold at the horizon.
+
+    invariants(t), if given, returns clauses over the fluents of time t
+    that every state must satisfy, e.g. a capacity. exclusive lists
+    tuples of groups of action names; actions from different groups of
+    one tuple never share a step, which keeps parallel steps valid
+    under such invariants. Both are encoded with one extra atom per
+    group and step, not with pairs of actions.
+    """
+
+    def __init__(self, fluents, actions, init, goal, semantics='forall',
+                 name='strips', encoding='auto', invariants=None,
+                 exclusive=()):
+        if semantics not in step_semantics:
+            raise ValueError("unknown semantics %r" % semantics)
+        self.fluents = list(fluents)
+        self.actions = list(actions)
+        self.init = set(init)
+        self.goal_literals = list(goal)
+        self.semantics = semantics
+        self.name = name
+        self.encoding = encoding
+        self.invariants = invariants
+        self.exclusive = [tuple(list(g) for g in groups)
+                          for groups in exclusive]
+        known = set(self.fluents)
+        for a in self.actions:
+            if a.name in known:
+                raise ValueError("action %r is also a fluent" % a.name)
+            for f in ([p.lstrip('~') for p in a.pre] + a.add + a.delete):
+                if f not in known:
+                    raise ValueError("unknown fluent %r in action %r"
+                                     % (f, a.name))
+        self.disables = disabling(self.actions)
+        self.rank = self._order()
+        self.cliques = []
+        if self.semantics != 'sequential':
+            self.cliques = cliques(self.actions)
+        self.exclusions = self._exclusions()
+
+    def _order(self):
+        """Rank of every action in the order of exists-step plans."""
+        graph = [[] for _ in self.actions]
+        for i, j in self.disables:
+            graph[i].append(j)
+        # The component of j is numbered no later than that of i for an
+        # edge i -> j, so j comes first.
+        component = strongly_connected_components(graph)
+        order = sorted(range(len(self.actions)),
+                       key=lambda i: (component[i], i))
+        rank = [0] * len(order)
+        for r, i in enumerate(order):
+            rank[i] = r
+        return (rank)
+
+    def _exclusions(self):
+        """Pairs of action indices that must not share a step and are
+        not excluded by one of the cliques already."""
+        if self.semantics == 'sequential':
+            return (set())
+        rank = self.rank
+        member = {}
+        for k, clique in enumerate(self.cliques):
+            for i in clique:
+                member.setdefault(i, set()).add(k)
+        pairs = set()
+        for (i, j) in self.disables:
+            if self.semantics == 'exists' and rank[i] > rank[j]:
+                continue
+            if member.get(i, set()) & member.get(j, set()):
+                continue
+            pairs.add((min(i, j), max(i, j)))
+        return (pairs)
+
+    def movement_axioms(self, t):
+        """All movement axioms for time t."""
+        def now(f):
+            if f[0] == '~':
+                return ('~%s_%d' % (f[1:], t))
+            return ('%s_%d' % (f, t))
+
+        def act(a):
+            return ('%s_%d' % (a.name, t))
+        actions = []
+        added_by = dict((f, []) for f in self.fluents)
+        deleted_by = dict((f, []) for f in self.fluents)
+        for a in self.actions:
+            # Preconditions and effects
+            actions += [['~' + act(a), now(p)] for p in a.pre]
+            actions += [['~' + act(a), '%s_%d' % (f, t + 1)] for f in a.add]
+            actions += [['~' + act(a), '~%s_%d' % (f, t + 1)]
+                        for f in a.delete]
+            for f in a.add:
+                added_by[f].append(act(a))
+            for f in a.delete:
+                deleted_by[f].append(act(a))
+        # Fluents only change through actions
+        frame = []
+        for f in self.fluents:
+            frame += [['~%s_%d' % (f, t), '%s_%d' % (f, t + 1)]
+                      + deleted_by[f]]
+            frame += [['%s_%d' % (f, t), '~%s_%d' % (f, t + 1)]
+                      + added_by[f]]
+        if self.semantics == 'sequential':
+            steps = at_most_one([act(a) for a in self.actions],
+                                lambda i: 'step_aux%d_%d' % (i, t),
+                                self.encoding)
+        else:
+            steps = []
+            for k, clique in enumerate(self.cliques):
+                steps += at_most_one(
+                    [act(self.actions[i]) for i in clique],
+                    lambda i: 'clique%d_aux%d_%d' % (k, i, t), self.encoding)
+            steps += [['~' + act(self.actions[i]), '~' + act(self.actions[j])]
+                      for (i, j) in sorted(self.exclusions)]
+            for k, groups in enumerate(self.exclusive):
+                # Atom group<k>_aux<g>_t holds if an action of group g
+                # is taken; at most one group of a tuple is active.
+                active = ['group%d_aux%d_%d' % (k, g, t)
+                          for g in range(len(groups))]
+                for g, group in enumerate(groups):
+                    steps += [['~%s_%d' % (a, t), active[g]] for a in group]
+                steps += at_most_one(
+                    active, lambda i: 'exclusive%d_aux%d_%d' % (k, i, t),
+                    self.encoding)
+        invariants = []
+        if self.invariants is not None:
+            invariants = self.invariants(t)
+        return (actions + frame + steps + invariants)
+
+    def initial_state(self):
+        return ([['%s_0' % f] if f in self.init else ['~%s_0' % f]
+                 for f in self.fluents])
+
+    def goal(self, t):
+        return ([['~%s_%d' % (g[1:], t)] if g[0] == '~'
+                 else ['%s_%d' % (g, t)] for g in self.goal_literals])
+
+    def domain(self, reachability=True):
+        """Domain of the problem, pruned by its relaxed planning graph
+        unless reachability is False."""
+        return (Domain('%s_%s' % (self.name, self.semantics),
+                       self.movement_axioms, self.initial_state(), self.goal,
+                       [a.name for a in self.actions],
+                       reachability=(functools.partial(planning_graph, self)
+                                     if reachability else None),
+                       linearize=self.linearize))
+
+    def linearize(self, plan):
+        """The actions of a Plan as one sequence of action names."""
+        index = dict((a.name, i) for (i, a) in enumerate(self.actions))
+        rank = self.rank
+        sequence = []
+        for s in range(len(plan)):
+            step = sorted((index[a] for a in plan.actions_at(s)),
+                          key=lambda i: rank[i])
+            sequence += [self.actions[i].name for i in step]
+        return (sequence)
+
+    def simulate(self, sequence, check=None):
+        """Execute a sequence of action names from the initial state.
+
+        Returns the final state as a set of fluents, or raises
+        ValueError if a precondition does not hold or check(state) is
+        false for one of the states passed.
+        """
+        actions = dict((a.name, a) for a in self.actions)
+        state = set(self.init)
+        if check is not None and not check(state):
+            raise ValueError("initial state is invalid")
+        for name in sequence:
+            a = actions[name]
+            positive, negative = a.requires()
+            if (any(f not in state for f in positive)
+                    or any(f in state for f in negative)):
+                raise ValueError("%s is not applicable" % name)
+            state.difference_update(a.delete)
+            state.update(a.add)
+            if check is not None and not check(state):
+                raise ValueError("state after %s is invalid" % name)
+        return (state)
+
+    def achieves_goal(self, state):
+        return (all((g[1:] not in state) if g[0] == '~' else (g in state)
+                    for g in self.goal_literals))
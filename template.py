@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Integer clause templates for the time steps of a planning problem.
+
+The movement axioms of time t only differ from those of time 0 in the
+time index of their atoms. SliceTemplate generates the axioms for t = 0
+and t = 1 once, checks that they have the same structure and compiles
+them into integer clauses. Atom 'name_t' gets the variable
+
+    t * width + index(name) + 1
+
+so the clauses of time step t are obtained by shifting every variable
+of the template by t * width. No atom names are built for that; they are
+only produced again when a model is decoded.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def split_atom(name):
+    """Split 'name_t' into ('name', t)."""
+    base, _, t = name.rpartition('_')
+    if not base or not t.isdigit():
+        raise ValueError("atom %r has no time index" % name)
+    return (base, int(t))
+
+
+class SliceTemplate(object):
+    """Compiled movement axioms that can be instantiated for any t.
+
+    The template can be used in place of an AtomTable for atoms with a
+    time index. Atom names listed in extra are reserved as additional
+    atoms at every time step, e.g. for activation atoms.
+    """
+
+    def __init__(self, movement_axioms, extra=()):
+        slice_0 = movement_axioms(0)
+        slice_1 = movement_axioms(1)
+        if len(slice_0) != len(slice_1):
+            raise ValueError("movement axioms differ between time steps")
+        self.names = []
+        self.index = {}
+        parsed = []
+        for c0, c1 in zip(slice_0, slice_1):
+            if len(c0) != len(c1):
+                raise ValueError("movement axioms differ between time steps")
+            pc = []
+            for s0, s1 in zip(c0, c1):
+                sign = -1 if s0[0] == '~' else 1
+                base, step = split_atom(s0.lstrip('~'))
+                expected = '%s_%d' % (base, step + 1)
+                if sign < 0:
+                    expected = '~' + expected
+                if step > 1 or s1 != expected:
+                    raise ValueError("movement axioms differ between time "
+                                     "steps: %r and %r" % (s0, s1))
+                pc.append((sign, self._add(base), step))
+            parsed.append(pc)
+        for base in extra:
+            self._add(base)
+        self.width = len(self.names)
+        self.clauses = [[sign * (step * self.width + i + 1)
+                         for (sign, i, step) in pc] for pc in parsed]
+        self._bounds = []
+        start = 0
+        for c in self.clauses:
+            self._bounds.append((start, start + len(c)))
+            start += len(c)
+        self._ends = [b for (_, b) in self._bounds]
+        if numpy is not None:
+            flat = numpy.array([l for c in self.clauses for l in c],
+                               dtype=numpy.int64)
+            self._flat = flat
+            self._signs = numpy.sign(flat)
+            self._ends = numpy.array(self._ends, dtype=numpy.int64)
+
+    def _add(self, base):
+        i = self.index.get(base)
+        if i is None:
+            i = len(self.names)
+            self.names.append(base)
+            self.index[base] = i
+        return (i)
+
+    def instantiate(self, t):
+        """Return the integer clauses of the movement axioms of time t."""
+        shift = t * self.width
+        if numpy is not None:
+            flat = (self._flat + self._signs * shift).tolist()
+            return ([flat[a:b] for (a, b) in self._bounds])
+        return ([[l + shift if l > 0 else l - shift for l in c]
+                 for c in self.clauses])
+
+    def instantiate_into(self, cnf, t):
+        """Append the clauses of time t to a cnf.CNF."""
+        shift = t * self.width
+        if numpy is not None:
+            cnf.extend_flat(self._flat + self._signs * shift, self._ends)
+            return
+        cnf.extend_flat([l + shift if l > 0 else l - shift
+                         for c in self.clauses for l in c], self._ends)
+
+    def var(self, base, t):
+        """Variable of atom base at time t."""
+        return (t * self.width + self.index[base] + 1)
+
+    def number(self, name):
+        base, t = split_atom(name)
+        return (self.var(base, t))
+
+    def s2n(self, s):
+        """Convert string representation of atom to number."""
+        if (s[0] == '~'):
+            return (-self.number(s[1:]))
+        return (self.number(s))
+
+    def n2s(self, n):
+        """Convert numeric representation of atom to string."""
+        t, i = divmod(abs(n) - 1, self.width)
+        r = '%s_%d' % (self.names[i], t)
+        if (n < 0):
+            r = '~' + r
+        return (r)
+
+    def to_numbers(self, clauses):
+        return ([[self.s2n(s) for s in c] for c in clauses])
+
+    def to_names(self, literals):
+        return ([self.n2s(n) for n in literals])
@@ -3,50 +3,44 @@
 """A logical agent navigating the roboto delivery world."""
 
 from __future__ import print_function
+import functools
 import pycosat
 import sys
 
+import metrics
+from atoms import AtomTable
+from cardinality import at_most_one
+from costs import Costs
+from plan import format_plan
+from planner import Domain, find_plan
+from reachability import explore
+
 #################################################################
 #
 # Functions for interfacing PicoSAT
 #
 #################################################################
 
-atoms_list = []
+atoms = AtomTable()
 
 
 def s2n(s):
     """Convert string representation of atom to number."""
-    if (s[0] == '~'):
-        inv = -1
-        t = s[1:]
-    else:
-        inv = 1
-        t = s
-    try:
-        n = atoms_list.index(t)
-    except:
-        # Atom not in list. Add it.
-        atoms_list.append(t)
-        n = len(atoms_list) - 1
-    return ((n + 1) * inv)
+    return (atoms.s2n(s))
 
 
 def n2s(n):
     """Convert numeric representation of atom to string."""
-    r = atoms_list[abs(n) - 1]
-    if (n) < 0:
-        r = '~' + r
-    return (r)
+    return (atoms.n2s(n))
 
 
 def solve(axioms):
-    picosatInput = map(lambda c: map(lambda s: s2n(s), c), axioms)
+    picosatInput = atoms.to_numbers(axioms)
     picosatSolution = pycosat.solve(picosatInput)
     if (picosatSolution == 'UNSAT'):
         return (picosatSolution)
     else:
-        return (map(lambda atom: n2s(atom), picosatSolution))
+        return (atoms.to_names(picosatSolution))
 
 
 def get_name(index):
@@ -60,31 +54,12 @@ def get_name(index):
         return "Ferry"
 
 
-def change_state(state, a):
-    if a == "wolf_ab":
-        return "b" + state[1:3] + "b"
-    elif a == "goat_ab":
-        return state[:1] + "b" + state[2:3] + "b"
-    elif a == "cabbage_ab":
-        return state[:2] +"bb"
-    elif a == "ferry_ab":
-        return state[:3] + "b"
-    elif a == "wolf_ba":
-        return state[:0] + "a" + state[1:2] + "a"
-    elif a == "goat_ba":
-        return state[:1] + "a" + state[2:3]+"a"
-    elif a == "cabbage_ba":
-        return state[:2] +"aa"
-    elif a == "ferry_ba":
-        return state[:3] + "a"
-
-
-def pretty_print(action_trace, action_list):
-    state = "aaaa"
-    print_state(state)
-    for a in action_trace:
-        state = change_state(state, action_list[action_trace.index(a)])
-        print_state(state)
+def pretty_print(plan):
+    # Print the states the plan passes through.
+    for s in range(len(plan) + 1):
+        for f in plan.state_at(s):
+            if f.startswith('wgc_'):
+                print_state(f[4:])
 
 
 def print_state(state):
@@ -97,18 +72,11 @@ def print_state(state):
             b_list += get_name(index)
     print(a_list + "~~~~~~~~~~~~~~~~~" + b_list)
 
-def print_actions_in(clause):
-    # Print all positive actions in clause.
-    action_trace = []
-    action_list = []
-    for c in clause:
-        for a in actions:
-            if (c.find(a) == 0):
-                action_trace += [c]
-                action_list += [a]
-    for a in action_trace[:-1]:
-        print(a)
-    pretty_print(action_trace[:-1],action_list[:-1])
+def print_actions_in(plan):
+    # Print all actions of the plan.
+    for line in format_plan(plan):
+        print(line)
+    pretty_print(plan)
 
 
 #################################################################
@@ -120,48 +88,58 @@ def print_actions_in(clause):
 actions = ['wolf_ab', 'goat_ab', 'cabbage_ab', 'ferry_ab', 'wolf_ba', 'goat_ba', 'cabbage_ba', 'ferry_ba']
 
 
+# Encoding of the at-most-one constraints, see cardinality.py
+amo_encoding = 'auto'
+
+
+# Movement plan
+# Format: State,
+#         'wolf_ab', 'goat_ab', 'cabbage_ab', 'ferry_ab', 'wolf_ba', 'goat_ba', 'cabbage_ba', 'ferry_ba'
+states = [
+    ['wgc_abaa',
+     'wgc_bbab', 'wgc_abaa', 'wgc_abbb', 'wgc_abab', 'wgc_abaa', 'wgc_abaa', 'wgc_abaa', 'wgc_abaa']
+    #             keine Ziege a                       -> falsche Richtung
+    , ['wgc_abab',
+       'wgc_abab', 'wgc_abab', 'wgc_abab', 'wgc_abab', 'wgc_abab', 'wgc_aaaa', 'wgc_abab', 'wgc_abaa']
+    #                               <-  falsche Richtung, kein wolf b             kein kohl b
+    , ['wgc_bbab',
+       'wgc_bbab', 'wgc_bbab', 'wgc_bbab', 'wgc_bbab', 'wgc_abaa', 'wgc_baaa', 'wgc_bbab', 'wgc_bbab']
+    #                               <-falsche Richtung                         kein kohl b  Ziege weg
+    , ['wgc_abbb',
+       'wgc_abbb', 'wgc_abbb', 'wgc_abbb', 'wgc_abbb', 'wgc_abbb', 'wgc_aaba', 'wgc_abaa', 'wgc_abbb']
+    #                               <-falsche Richtung  kein wolf b                        Kohl weg
+    , ['wgc_aaba',
+       'wgc_babb', 'wgc_abbb', 'wgc_aaba', 'wgc_aaba', 'wgc_aaba', 'wgc_aaba', 'wgc_aaba', 'wgc_aaba']
+    #                           kein Kohl a  Ziege weg  ->falsche Richtung
+    , ['wgc_babb',
+       'wgc_babb', 'wgc_babb', 'wgc_babb', 'wgc_babb', 'wgc_aaba', 'wgc_babb', 'wgc_baaa', 'wgc_baba']
+    #                              <-falsche Richtung             keine ziege b
+    , ['wgc_baaa',
+       'wgc_baaa', 'wgc_bbab', 'wgc_babb', 'wgc_baaa', 'wgc_baaa', 'wgc_baaa', 'wgc_baaa', 'wgc_baaa']
+    # kein wolf a                          kohl weg   ->falsche Richtung
+    , ['wgc_baba',
+       'wgc_baba', 'wgc_bbbb', 'wgc_baba', 'wgc_babb', 'wgc_baba', 'wgc_baba', 'wgc_baba', 'wgc_baba']
+    #  kein wolf a             kein kohl a            ->falsche Richtung
+    , ['wgc_bbbb',
+       'wgc_bbbb', 'wgc_bbbb', 'wgc_bbbb', 'wgc_bbbb', 'wgc_bbbb', 'wgc_baba', 'wgc_bbbb', 'wgc_bbbb']
+    #                              <-falsche Richtung   kohl weg               ziege weg    ziege,kohl weg
+    , ['wgc_aaaa',
+       'wgc_aaaa', 'wgc_abab', 'wgc_aaaa', 'wgc_aaaa', 'wgc_aaaa', 'wgc_aaaa', 'wgc_aaaa', 'wgc_aaaa']
+    # kohl weg,              ziege weg    ziege,kohl weg  -> falsche Richtung
+]
+
+
 # Movement axioms
 
-def movement_axioms(t):
+def movement_axioms(t, encoding=None, lazy=False):
     #Verwendung von Templates
-    """All movmement axioms for time t."""
-    # Movement plan
-    # Format: State,
-    #         'wolf_ab', 'goat_ab', 'cabbage_ab', 'ferry_ab', 'wolf_ba', 'goat_ba', 'cabbage_ba', 'ferry_ba'
-    # Movement axioms
-    states = [
-        ['wgc_abaa',
-         'wgc_bbab', 'wgc_abaa', 'wgc_abbb', 'wgc_abab', 'wgc_abaa', 'wgc_abaa', 'wgc_abaa', 'wgc_abaa']
-        #             keine Ziege a                       -> falsche Richtung
-        , ['wgc_abab',
-           'wgc_abab', 'wgc_abab', 'wgc_abab', 'wgc_abab', 'wgc_abab', 'wgc_aaaa', 'wgc_abab', 'wgc_abaa']
-        #                               <-  falsche Richtung, kein wolf b             kein kohl b
-        , ['wgc_bbab',
-           'wgc_bbab', 'wgc_bbab', 'wgc_bbab', 'wgc_bbab', 'wgc_abaa', 'wgc_baaa', 'wgc_bbab', 'wgc_bbab']
-        #                               <-falsche Richtung                         kein kohl b  Ziege weg
-        , ['wgc_abbb',
-           'wgc_abbb', 'wgc_abbb', 'wgc_abbb', 'wgc_abbb', 'wgc_abbb', 'wgc_aaba', 'wgc_abaa', 'wgc_abbb']
-        #                               <-falsche Richtung  kein wolf b                        Kohl weg
-        , ['wgc_aaba',
-           'wgc_babb', 'wgc_abbb', 'wgc_aaba', 'wgc_aaba', 'wgc_aaba', 'wgc_aaba', 'wgc_aaba', 'wgc_aaba']
-        #                           kein Kohl a  Ziege weg  ->falsche Richtung
-        , ['wgc_babb',
-           'wgc_babb', 'wgc_babb', 'wgc_babb', 'wgc_babb', 'wgc_aaba', 'wgc_babb', 'wgc_baaa', 'wgc_baba']
-        #                              <-falsche Richtung             keine ziege b
-        , ['wgc_baaa',
-           'wgc_baaa', 'wgc_bbab', 'wgc_babb', 'wgc_baaa', 'wgc_baaa', 'wgc_baaa', 'wgc_baaa', 'wgc_baaa']
-        # kein wolf a                          kohl weg   ->falsche Richtung
-        , ['wgc_baba',
-           'wgc_baba', 'wgc_bbbb', 'wgc_baba', 'wgc_babb', 'wgc_baba', 'wgc_baba', 'wgc_baba', 'wgc_baba']
-        #  kein wolf a             kein kohl a            ->falsche Richtung
-        , ['wgc_bbbb',
-           'wgc_bbbb', 'wgc_bbbb', 'wgc_bbbb', 'wgc_bbbb', 'wgc_bbbb', 'wgc_baba', 'wgc_bbbb', 'wgc_bbbb']
-        #                              <-falsche Richtung   kohl weg               ziege weg    ziege,kohl weg
-        , ['wgc_aaaa',
-           'wgc_aaaa', 'wgc_abab', 'wgc_aaaa', 'wgc_aaaa', 'wgc_aaaa', 'wgc_aaaa', 'wgc_aaaa', 'wgc_aaaa']
-        # kohl weg,              ziege weg    ziege,kohl weg  -> falsche Richtung
-    ]
+    """All movmement axioms for time t.
 
+    With lazy=True the at-most-one constraints of mutexes(t) are left
+    out, see lazy.py.
+    """
+    if encoding is None:
+        encoding = amo_encoding
     diff_states = [l[0] for l in states]
     state_links = []
     # Movement axioms
@@ -196,10 +174,10 @@ def movement_axioms(t):
     # (¬ wgc_abaa_t ∨ ¬ wgc_bbbb_t) ∧
     # ...
     only_one_state = []
-    for l0 in range(len(diff_states)):
-        for l1 in range(l0 + 1, len(diff_states)):
-            only_one_state += [['~%s_%d' % (diff_states[l0], t),
-                                '~%s_%d' % (diff_states[l1], t), ]]
+    if not lazy:
+        only_one_state = at_most_one(
+            ['%s_%d' % (l, t) for l in diff_states],
+            lambda i: 'only_one_state_aux%d_%d' % (i, t), encoding)
 
     # Exactly one action at a time:
     one_action_a_time = []
@@ -207,11 +185,9 @@ def movement_axioms(t):
     # goat_ab_t ∨ goat_ba_t ...
     one_action_a_time += [['%s_%d' % (l, t) for l in actions]]
     # At most one action at a time
-    for a0 in range(len(actions)):
-        for a1 in range(a0 + 1, len(actions)):
-            if (a0 != a1):
-                one_action_a_time += [['~%s_%d' % (actions[a0], t),
-                                       '~%s_%d' % (actions[a1], t)]]
+    one_action_a_time += at_most_one(
+        ['%s_%d' % (l, t) for l in actions],
+        lambda i: 'one_action_aux%d_%d' % (i, t), encoding)
     return (state_links
             + only_one_state
             + no_move_no_location_change
@@ -225,19 +201,46 @@ def movement_axioms(t):
 #
 #################################################################
 
-t_max = 10
-axioms_up_to_time_t = []
-for t in range(0, t_max + 1):
-    axioms_up_to_time_t += movement_axioms(t)
-    axioms = (axioms_up_to_time_t +
-              [  # Start position of agent
-                  ['wgc_aaaa_0']
-                  # Target position for mail
-                  , ['wgc_bbbb_%d' % t]
-              ])
-    solution = solve(axioms)
-    if (solution != 'UNSAT'):
+def initial_state():
+    # Start position: everything on bank a
+    return ([['wgc_aaaa_0']])
+
+
+def goal(t):
+    # Target position: everything on bank b
+    return ([['wgc_bbbb_%d' % t]])
+
+
+def mutexes(t):
+    # Groups of atoms of which at most one holds at time t
+    return ([['%s_%d' % (l[0], t) for l in states]])
+
+
+def reachability():
+    # States reachable at every step, by breadth-first search over the
+    # states table
+    successors = dict((l[0], list(zip(actions, l[1:]))) for l in states)
+    return (explore('wgc_aaaa', lambda s: successors[s], successors,
+                    actions, holds=lambda s: [s]))
+
+
+# For costs.cheapest_plan: crossings with cargo cost 1, empty trips of
+# the ferry nothing
+loaded_crossings = Costs.per_action(
+    dict((a, 0 if a.startswith('ferry') else 1) for a in actions))
+
+domain = Domain('wolf_goat_cabbage', movement_axioms, initial_state(), goal,
+                actions, atoms, reachability,
+                functools.partial(movement_axioms, lazy=True), mutexes)
+
+if __name__ == "__main__":
+    t_max = 10
+    with metrics.from_argv(sys.argv[1:]) as recorder:
+        t, model = find_plan(domain, t_max, decode=False, recorder=recorder)
+        with recorder.phase('decode'):
+            plan = None if model == 'UNSAT' else domain.extract_plan(t, model)
+    if (plan is not None):
         print("Found a solution:")
-        print_actions_in(solution)
+        print_actions_in(plan)
         sys.exit(0)
-print("Not possible in up to %d steps. :-(" % t_max)
+    print("Not possible in up to %d steps. :-(" % t_max)